@@ -1,100 +1,190 @@
 import os
-from typing import List
+import asyncio
+from typing import Dict, List
 import logging
-import httpx
 from google.adk.agents import LlmAgent
-from google.adk.models.lite_llm import LiteLlm
 from google.adk.tools import FunctionTool
 from google.adk.tools.tool_context import ToolContext
 from a2a.types import (
     AgentCard,
     Message,
     Role,
+    DataPart,
     Part,
     TextPart,
     MessageSendParams,
+    Task,
+    TaskArtifactUpdateEvent,
+    TaskState,
+    TaskStatusUpdateEvent,
 )
+from a2a.utils import get_message_text
 import sys
 # Docker 환경에서는 현재 디렉토리를 PYTHONPATH에 추가
 sys.path.insert(0, '.')
-from utils.model_config import get_model_with_fallback
+from utils.model_config import get_tiered_model
+from utils.tool_shaping import fetch_tool_result
+from utils.adk_streaming import current_updater, text_part
+from remote_agent_connection import AgentBusyError, RemoteAgentPool
+from agent_card_cache import AgentCardCache
+from fast_path import FastPathRouter
+from skill_index import SkillIndex
+from utils.runtime_stats import register_stats
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
 # --- 1. AgentCard 로더 ---
 
-def load_agent_cards(tool_context) -> List[str]:
+# 레지스트리 카드 캐시 (TTL + ETag 재검증, 서버 시작 시 prewarm → readiness 점검)
+card_cache = AgentCardCache.from_env()
+
+# 카드 skill 로컬 벡터 인덱스 (카드 목록이 바뀔 때만 재생성)
+skill_index = SkillIndex.from_env(card_cache)
+
+
+async def load_agent_cards(tool_context, query: str = "") -> List[str]:
     """
-    레지스트리 서버에서 에이전트 카드 목록을 조회해서 state에 저장,
-    에이전트 이름 리스트 반환
+    레지스트리 에이전트 카드 목록(캐시)을 조회해서 에이전트 이름 리스트 반환
+    - query: 사용자 요청을 넣으면 관련도가 높은 후보 에이전트(top-k)만 관련도 순으로 반환
     """
-    url = "http://localhost:8000/agents"
-    resp = httpx.get(url)
-    resp.raise_for_status()
-    agents_data = resp.json()  # 레지스트리에서 내려주는 JSON 배열
-
-    cards = {}
-    for data in agents_data:
-        # ✅ dict → AgentCard 변환 (pydantic v1/v2 호환)
-        if hasattr(AgentCard, "model_validate"):   # pydantic v2
-            card = AgentCard.model_validate(data)
-        else:  # pydantic v1
-            card = AgentCard.parse_obj(data)
-
-        name = getattr(card, "name", None) or card.url or "unknown_agent"
-        cards[name] = card
-
-    # state에 저장
-    tool_context.state["cards"] = cards
+    if query:
+        candidates = await skill_index.search(query)
+        if candidates:
+            return [name for name, _ in candidates]
+    cards = await card_cache.get_cards()
     return list(cards.keys())
 
 
 # --- 2. Remote Agent 호출 ---
 
 import uuid
-import httpx
-from a2a.client import A2AClient
-from a2a.types import (
-    AgentCard,
-    Message,
-    TextPart,
-    Part,
-    Role,
-    MessageSendParams,
-    SendMessageRequest,
-)
 
+# 에이전트 카드별 장기 유지 클라이언트 (keep-alive 연결 재사용, 서버 종료 시 aclose)
+remote_agents = RemoteAgentPool.from_env()
 
-async def call_remote_agent(tool_context, agent_name: str, task: str):
+# call_remote_agent(s) 호출별 기본 제한 시간(초)
+FANOUT_TIMEOUT = float(os.getenv("A2A_FANOUT_TIMEOUT", "30"))
+
+# 하위 에이전트 스트림의 중간 이벤트를 상위 요청으로 중계할지 여부 (끄면 최종 결과만)
+STREAM_SUBAGENTS = os.getenv("A2A_STREAM_SUBAGENTS", "true").lower() == "true"
+
+# 하위 에이전트가 429로 거절했을 때 Retry-After가 이 값(초) 이하면 한 번 기다렸다 재시도
+BUSY_RETRY_MAX = float(os.getenv("A2A_BUSY_RETRY_MAX", "5"))
+
+
+async def _relay_update(agent_name: str, artifact_id: str, update) -> None:
+    """하위 에이전트 스트림 이벤트를 현재 요청의 Task로 중계 (스트리밍 요청이 아니면 무시)"""
+    updater = current_updater.get()
+    if updater is None:
+        return
+    if isinstance(update, TaskArtifactUpdateEvent):
+        # 에이전트별 아티팩트로 부분 응답 전달
+        await updater.add_artifact(
+            update.artifact.parts,
+            artifact_id=artifact_id,
+            name=agent_name,
+            append=update.append,
+            last_chunk=update.last_chunk,
+        )
+    elif isinstance(update, TaskStatusUpdateEvent) and update.status.state == TaskState.working:
+        text = get_message_text(update.status.message) if update.status.message else ""
+        if text:
+            await updater.update_status(
+                TaskState.working,
+                message=updater.new_agent_message([text_part(f"[{agent_name}] {text}")], metadata={"agent": agent_name}),
+            )
+
+
+async def _send_to_agent(agent_name: str, task: str, tool_call: dict | None = None) -> dict:
     """
-    A2A SDK 0.3.5 기준, 공식 튜토리얼 non-streaming 방식
+    A2A SDK 0.3.5 기준 (카드별 연결 재사용).
+    STREAM_SUBAGENTS면 SSE로 받으면서 중간 이벤트를 상위 요청으로 중계한다.
+    tool_call({"tool", "args"})이 있으면 자연어 대신 DataPart로 보내 하위 에이전트가 LLM 없이 툴을 바로 실행한다.
     """
 
     # 1. 에이전트 카드 조회
-    cards: dict[str, AgentCard] = tool_context.state.get("cards", {})
+    cards: dict[str, AgentCard] = await card_cache.get_cards()
     card = cards.get(agent_name)
     if not card:
         return {"error": f"Agent {agent_name} not found"}
 
-    # 2. 클라이언트 준비
-    async with httpx.AsyncClient(timeout=30.0) as httpx_client:
-        client = A2AClient(httpx_client=httpx_client, agent_card=card)
+    # 2. 재사용 클라이언트 조회
+    connection = remote_agents.get(card)
 
-        # 3. 요청 메시지 (messageId 필드명 주의)
-        message = Message(
-            role=Role.user,
-            parts=[Part(root=TextPart(text=task))],
-            messageId=uuid.uuid4().hex,  # ✅ message_id → messageId
-        )
-        send_params = MessageSendParams(message=message)
-        request = SendMessageRequest(id=str(uuid.uuid4()), params=send_params)
+    # 3. 요청 메시지 (messageId 필드명 주의)
+    part = DataPart(data=tool_call) if tool_call is not None else TextPart(text=task)
+    message = Message(
+        role=Role.user,
+        parts=[Part(root=part)],
+        messageId=uuid.uuid4().hex,  # ✅ message_id → messageId
+    )
 
-        # 4. 서버 호출
-        resp = await client.send_message(request)
+    # 4. 서버 호출
+    artifact_id = uuid.uuid4().hex
+    for attempt in range(2):
+        try:
+            result = await connection.send_message(
+                message,
+                stream=STREAM_SUBAGENTS,
+                on_update=lambda update: _relay_update(agent_name, artifact_id, update),
+            )
+            break
+        except AgentBusyError as e:
+            if attempt or e.retry_after > BUSY_RETRY_MAX:
+                return {"error": f"Agent {agent_name} is busy", "retry_after": e.retry_after}
+            logger.info(f"{agent_name} 과부하, {e.retry_after}초 후 재시도")
+            await asyncio.sleep(e.retry_after)
+    if result is None:
+        return {"error": f"Agent {agent_name} returned no response"}
+
+    # 5. 결과를 JSON으로 덤프 (스트리밍 중간 상태가 쌓인 history는 LLM 입력에서 제외)
+    if isinstance(result, Task):
+        return result.model_dump(mode="json", exclude_none=True, exclude={"history"})
+    return result.model_dump(mode="json", exclude_none=True)
 
-        # 5. 결과를 JSON으로 덤프
-        return resp.model_dump(mode="json", exclude_none=True)
+
+async def call_remote_agent(tool_context, agent_name: str, task: str):
+    """
+    에이전트 하나에 작업을 위임하고 응답을 반환
+    """
+    try:
+        # 스트리밍 호출에는 httpx 타임아웃이 걸리지 않으므로 여기서 제한 (시간 초과 시 상대 태스크도 취소됨)
+        return await asyncio.wait_for(_send_to_agent(agent_name, task), timeout=FANOUT_TIMEOUT)
+    except asyncio.TimeoutError:
+        return {"error": f"Agent {agent_name} did not respond within {FANOUT_TIMEOUT}s"}
+
+
+async def call_remote_agents(
+    tool_context, calls: List[Dict[str, str]], timeout_seconds: float = FANOUT_TIMEOUT
+) -> dict:
+    """
+    서로 독립적인 여러 에이전트 작업을 동시에 위임하고 결과를 한 번에 반환.
+    - calls: [{"agent_name": "Delivery Agent", "task": "ORD0042 배송 상태 알려줘"},
+              {"agent_name": "Vehicle Agent", "task": "V0012 차량 상태 알려줘"}, ...]
+    - timeout_seconds: 호출별 제한 시간(초). 시간 초과/실패한 호출이 있어도 나머지 결과는 반환된다.
+    - 반환: {"results": [{"agent_name", "task", "status": "success"|"error"|"timeout", "result"|"error"}],
+             "succeeded": 성공 수, "failed": 실패 수}
+    """
+
+    async def run_one(call: Dict[str, str]) -> dict:
+        agent_name = call.get("agent_name", "")
+        task = call.get("task", "")
+        entry = {"agent_name": agent_name, "task": task}
+        try:
+            result = await asyncio.wait_for(_send_to_agent(agent_name, task), timeout=timeout_seconds)
+        except asyncio.TimeoutError:
+            return {**entry, "status": "timeout", "error": f"{timeout_seconds}초 안에 응답하지 않았습니다."}
+        except Exception as e:
+            logger.exception(f"call_remote_agents: {agent_name} 호출 실패")
+            return {**entry, "status": "error", "error": str(e)}
+        if "error" in result:
+            return {**entry, "status": "error", "error": result["error"]}
+        return {**entry, "status": "success", "result": result}
+
+    results = await asyncio.gather(*(run_one(call) for call in calls))
+    succeeded = sum(1 for r in results if r["status"] == "success")
+    return {"results": list(results), "succeeded": succeeded, "failed": len(results) - succeeded}
 
 
 # --- 3. 응답 집계 ---
@@ -109,14 +199,19 @@ def return_result(tool_context: ToolContext, result: str) -> str:
     tool_context.state["final_result"] = result
     return result
 
+# --- 규칙 기반 fast path (단순 ID 조회는 LLM 없이 바로 위임, FAST_PATH_ENABLED=false 로 끔) ---
+fast_path = FastPathRouter.from_env(card_cache, _send_to_agent, skill_index)
+register_stats("fast_path", fast_path.stats)
+
 # --- Root Agent 정의 ---
-# Gemini 우선, 실패시 로컬 LLM 사용
+# Gemini 우선, 실패시 로컬 LLM 사용 (MODEL_TIER_* 설정 시 툴 선택/최종 답변에 다른 모델)
 try:
-    model = get_model_with_fallback()
+    model = get_tiered_model("orchestrator", planner_role="router")
     logger.info(f"모델 설정 완료: {type(model).__name__ if hasattr(model, '__class__') else model}")
 except Exception as e:
     logger.error(f"모델 설정 실패: {e}")
-    # 최후의 fallback
+    # 최후의 fallback (litellm 스택은 이 경우에만 로드)
+    from google.adk.models.lite_llm import LiteLlm
     ollama_host = os.getenv("OLLAMA_HOST", "localhost")
     model = LiteLlm(
         model="ollama_chat/gpt-oss:20b",
@@ -132,11 +227,21 @@ root_agent = LlmAgent(
         "너는 Root Orchestrator Agent야.\n"
         "너의 임무는 사용자 요청에 맞는 에이전트를 선택해서 작업을 위임하고 결과를 집계해서 사용자에게 반환하는 것이야.\n"
         "'load_agent_cards'는 에이전트 카드를 불러오는 도구이다\n"
+        "   (query에 사용자 요청을 넣으면 관련 있는 후보 에이전트만 반환한다)\n"
         "'call_remote_agent'는 에이전트를 호출하는 도구이다\n"
         "   (에이전트 카드에서 agent_name과 task를 파라미터로 넣어 호출해야 한다)\n"
+        "'call_remote_agents'는 여러 에이전트를 동시에 호출하는 도구이다\n"
+        "   (요청이 여러 도메인(배송/차량/품질/상품)에 걸쳐 있고 서로 결과를 기다릴 필요가 없으면\n"
+        "    call_remote_agent를 여러 번 부르지 말고 calls 리스트로 한 번에 호출해야 한다)\n"
         "'return_result'에는 너가 사용자에게 응답할 내용을 적고 사용자에게 반환해\n"
     ),
     description="LLM 기반 Root Orchestrator Agent (multi-agent coordination) - Gemini/Local LLM hybrid",
-    tools=[FunctionTool(load_agent_cards), FunctionTool(call_remote_agent), FunctionTool(return_result)],
+    tools=[
+        FunctionTool(load_agent_cards),
+        FunctionTool(call_remote_agent),
+        FunctionTool(call_remote_agents),
+        FunctionTool(return_result),
+        FunctionTool(fetch_tool_result),
+    ],
 )
 
@@ -0,0 +1,132 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import time
+
+import httpx
+
+from a2a.types import AgentCard
+
+from utils.inprocess import local_cards
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+# 하트비트마다 바뀌는 필드는 카드 변경 판단에서 제외
+_VOLATILE_FIELDS = ("last_heartbeat",)
+
+
+def _parse_card(data: dict) -> AgentCard:
+    # ✅ dict → AgentCard 변환 (pydantic v1/v2 호환)
+    if hasattr(AgentCard, "model_validate"):   # pydantic v2
+        return AgentCard.model_validate(data)
+    return AgentCard.parse_obj(data)  # pydantic v1
+
+
+class AgentCardCache:
+    """
+    레지스트리 에이전트 카드의 비동기 TTL 캐시.
+    - TTL 안에서는 메모리에서 바로 반환
+    - TTL이 지나면 ETag(If-None-Match)로 조건부 재검증 (304면 기존 카드 유지)
+    - 내용이 바뀌지 않은 카드는 pydantic 재검증 없이 재사용
+    - 레지스트리 장애 시 마지막으로 성공한 카드 목록으로 동작
+    """
+
+    def __init__(self, url: str, ttl: float = 30.0, timeout: float = 5.0, retry_after: float = 5.0):
+        self.url = url
+        self.ttl = ttl
+        self.retry_after = retry_after
+        self.version = 0  # 카드 목록이 바뀔 때마다 증가
+        self._timeout = timeout
+        self._client: httpx.AsyncClient | None = None
+        self._cards: dict[str, AgentCard] = {}
+        self._digests: dict[str, str] = {}
+        self._etag: str | None = None
+        self._expires_at = 0.0
+        self._lock = asyncio.Lock()
+
+    @classmethod
+    def from_env(cls) -> "AgentCardCache":
+        return cls(
+            url=os.getenv("AGENT_REGISTRY_URL", "http://localhost:8000/agents"),
+            ttl=float(os.getenv("AGENT_CARD_TTL", "30")),
+        )
+
+    def get(self, name: str) -> AgentCard | None:
+        """메모리에 있는 카드만 조회 (네트워크 호출 없음)"""
+        return self._cards.get(name)
+
+    async def get_cards(self, force: bool = False) -> dict[str, AgentCard]:
+        if not force and self._cards and time.monotonic() < self._expires_at:
+            return self._cards
+        async with self._lock:
+            # 대기하는 동안 다른 요청이 이미 갱신했으면 그대로 사용
+            if not force and self._cards and time.monotonic() < self._expires_at:
+                return self._cards
+            await self._revalidate()
+        return self._cards
+
+    async def prewarm(self) -> None:
+        """서버 시작 시 카드 목록을 미리 적재 (실패하면 예외 → readiness 점검 실패, 기동은 계속)"""
+        try:
+            cards = await self.get_cards(force=True)
+            logger.info(f"에이전트 카드 프리워밍 완료: {list(cards)}")
+        except Exception as e:
+            logger.warning(f"에이전트 카드 프리워밍 실패 (첫 요청에서 재시도): {e}")
+            raise
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    async def _revalidate(self) -> None:
+        if self._client is None:
+            self._client = httpx.AsyncClient(timeout=self._timeout)
+        headers = {"If-None-Match": self._etag} if self._etag and self._cards else {}
+        try:
+            resp = await self._client.get(self.url, headers=headers)
+            if resp.status_code == 304:
+                self._expires_at = time.monotonic() + self.ttl
+                return
+            resp.raise_for_status()
+            agents_data = resp.json()  # 레지스트리에서 내려주는 JSON 배열
+        except Exception as e:
+            if not self._cards and not local_cards():
+                raise
+            # 마지막 정상 카드 목록(없으면 같은 프로세스의 에이전트 카드)으로 계속 동작하고, 짧은 간격 후 다시 시도
+            logger.warning(f"레지스트리 조회 실패, 마지막 카드 목록 사용: {e}")
+            if not self._cards:
+                self._cards = dict(local_cards())
+                self.version += 1
+            self._expires_at = time.monotonic() + self.retry_after
+            return
+
+        cards: dict[str, AgentCard] = {}
+        digests: dict[str, str] = {}
+        for data in agents_data:
+            stable = {k: v for k, v in data.items() if k not in _VOLATILE_FIELDS}
+            digest = hashlib.sha1(json.dumps(stable, sort_keys=True).encode()).hexdigest()
+            name = data.get("name") or data.get("url") or "unknown_agent"
+            if self._digests.get(name) == digest:
+                card = self._cards[name]
+            else:
+                card = _parse_card(data)
+                name = getattr(card, "name", None) or card.url or "unknown_agent"
+            cards[name] = card
+            digests[name] = digest
+        # host_all.py: 레지스트리에 없는 같은 프로세스 에이전트도 라우팅 대상에 포함
+        for name, card in local_cards().items():
+            if name not in cards:
+                cards[name] = card
+                digests[name] = "local"
+
+        if digests != self._digests:
+            self.version += 1
+        self._cards = cards
+        self._digests = digests
+        self._etag = resp.headers.get("ETag")
+        self._expires_at = time.monotonic() + self.ttl
@@ -0,0 +1,85 @@
+from utils.runtime_stats import register_stats, stats_endpoint
+from utils.serving import bind_address, warmup_lifespan
+from utils.startup import Readiness, StartupProfile
+
+
+def create_app():
+    """uvicorn 워커마다 호출되는 앱 팩토리 (무거운 import/모델 생성을 단계별로 측정)"""
+    profile = StartupProfile("orchestrator")
+    with profile.phase("imports"):
+        from a2a.types import (
+            AgentCapabilities,
+            AgentCard,
+            AgentSkill,
+        )
+        from a2a.server.apps import A2AStarletteApplication
+        from a2a.server.request_handlers import DefaultRequestHandler
+        from agent_executor import ADKAgentExecutor
+        from utils.admission import add_admission_control
+        from utils.metrics import add_metrics
+        from utils.model_config import preload_model_clients, warm_model
+        from utils.redis_stores import make_task_store, warm_state_client
+    with profile.phase("agent"):
+        # 카드 캐시/원격 에이전트 풀/fast path + 모델 구성 + LlmAgent 생성
+        from agent import root_agent as orchestrator_agent, remote_agents, card_cache, fast_path
+    with profile.phase("llm_clients"):
+        # litellm import/genai 클라이언트 생성을 첫 요청 대신 기동 시에 (리스닝 전)
+        preload_model_clients(orchestrator_agent.model)
+
+    host, port = bind_address("127.0.0.1", 10000)
+    agent_card = AgentCard(
+        name='Orchestrator Agent',
+        description=orchestrator_agent.description,
+        url=f'http://{host}:{port}',
+        version="1.0.0",
+        defaultInputModes=["text", "text/plain"],
+        defaultOutputModes=["text", "text/plain"],
+        capabilities=AgentCapabilities(streaming=True),
+        skills=[
+            AgentSkill(
+                id="orchestrator_agent",
+                name="orchestrate other agents",
+                description="Orchestrate other agents by user requestment",
+                tags=["orchestrator"],
+                examples=[
+                    "What agent should I use to get delivery data for ORD1001",
+                ],
+            )
+        ],
+    )
+
+    request_handler = DefaultRequestHandler(
+        agent_executor=ADKAgentExecutor(
+            agent=orchestrator_agent,
+            pre_router=fast_path,
+        ),
+        task_store=make_task_store("orchestrator"),  # TASK_STORE_BACKEND=redis 면 워커 간 공유
+    )
+
+    server = A2AStarletteApplication(
+        agent_card=agent_card,
+        http_handler=request_handler,
+    )
+
+    async def warm_llm():
+        # LLM 백엔드 헬스 체크 (라우터 순서에도 반영)
+        await warm_model(orchestrator_agent.model)
+
+    # 워커마다 레지스트리 카드를 미리 적재(카드가 없으면 위임할 수 없으므로 필수 점검)하고,
+    # 종료 시 하위 에이전트 keep-alive 연결 정리
+    readiness = Readiness(required=[card_cache.prewarm, warm_state_client, warm_llm], profile=profile)
+    lifespan = warmup_lifespan(
+        startup=[readiness.start],
+        shutdown=[readiness.stop, remote_agents.aclose, card_cache.aclose],
+    )
+    app = server.build(lifespan=lifespan)
+    # liveness(/healthz) / readiness(/readyz) 분리
+    readiness.add_routes(app)
+    register_stats("startup", readiness.stats)
+    # fast path 적중률 등 런타임 통계
+    app.add_route("/stats", stats_endpoint, methods=["GET"])
+    # 동시 실행 제한 + 대기열, 넘치면 429 (X-Priority: interactive | batch)
+    add_admission_control(app, orchestrator_agent.name)
+    # Prometheus 지표 (GET /metrics), admission 바깥에서 대기 시간/429까지 측정
+    add_metrics(app, orchestrator_agent.name)
+    return app
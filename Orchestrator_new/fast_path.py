@@ -0,0 +1,262 @@
+import json
+import logging
+import os
+import re
+import time
+from collections import Counter
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+
+from a2a.types import AgentCard
+
+from agent_card_cache import AgentCardCache
+from skill_index import SkillIndex
+from utils.adk_streaming import RESPONSE_ARTIFACT
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+# 영숫자로 이어지지 않는 독립 ID만 매칭 (한글 조사/공백은 허용: "ORD0042상태", "V0012 차량")
+_ID = r"(?<![A-Za-z0-9]){}(?![A-Za-z0-9])"
+
+
+@dataclass(frozen=True)
+class DomainRule:
+    domain: str                 # 에이전트 카드 skill tag / id 와 매칭할 도메인
+    id_pattern: re.Pattern
+    keywords: tuple[str, ...]
+    lookup: tuple[str, str] | None = None   # ID 단건 조회 툴 (툴 이름, ID 인자 이름) → DataPart 직접 호출
+
+
+DOMAIN_RULES: tuple[DomainRule, ...] = (
+    DomainRule(
+        "delivery", re.compile(_ID.format(r"(?:ORD\d{3,}|D\d{3,})"), re.I), ("배송", "주문", "delivery", "order"),
+        ("get_delivery_data", "identifier"),
+    ),
+    DomainRule(
+        "vehicle", re.compile(_ID.format(r"V\d{3,}"), re.I), ("차량", "배차", "정비", "vehicle", "fleet"),
+        ("get_vehicle_status", "vehicle_id"),
+    ),
+    DomainRule(
+        "item", re.compile(_ID.format(r"(?:ITEM\d{3,}|I\d{3,})"), re.I), ("상품", "재고", "창고", "item", "inventory"),
+        ("get_item_details", "item_id"),
+    ),
+    DomainRule("quality", re.compile(_ID.format(r"Q\d{3,}"), re.I), ("품질", "검사", "반품", "리콜", "quality", "recall")),
+)
+
+# 원인/비교/분석처럼 여러 조회를 엮어야 하는 질의는 ID가 있어도 LLM에 맡김
+_COMPLEX = re.compile(r"왜|이유|원인|비교|분석|추천|예측|그리고|관계|차이|\bwhy\b|\bcompare\b|\bvs\b", re.I)
+# ID 하나의 상태/상세 조회 (변경 요청이 아니면 하위 에이전트 LLM 없이 툴을 바로 호출)
+_ID_LOOKUP = re.compile(r"상태|정보|상세|조회|어디|status|info|detail", re.I)
+# 변경 요청 (ID가 있어도 직접 툴 호출 대신 텍스트로 위임)
+_WRITE = re.compile(r"변경|바꿔|수정|배정|할당|해제|등록|삭제|취소|update|assign|release|delete|cancel", re.I)
+# ID 없이 키워드만 있을 때 바로 위임하는 단순 조회 형태 (목록/현황/개수)
+_SIMPLE_LOOKUP = re.compile(r"목록|리스트|현황|전체|모든|몇\s*(?:개|건|대)|개수|\blist\b|\ball\b|\bcount\b", re.I)
+
+
+@dataclass
+class RouteDecision:
+    agent_name: str | None
+    domain: str | None
+    reason: str
+    tool_call: dict | None = None   # {"tool", "args"} 이면 자연어 대신 DataPart로 전송
+
+
+def direct_result(result: dict) -> dict | None:
+    """_send_to_agent 결과에서 직접 툴 호출 응답 DataPart({"tool", "result"|"error"}) 추출"""
+    for part in result.get("parts") or []:
+        data = part.get("data")
+        if isinstance(data, dict) and "tool" in data:
+            return data
+    return None
+
+
+def extract_text(result: dict) -> str | None:
+    """_send_to_agent 결과(Message/Task JSON)에서 응답 텍스트 추출"""
+    def texts(parts):
+        # DataPart(직접 툴 호출 결과)는 JSON 문자열로
+        return [
+            p["text"] if p.get("text") else json.dumps(p["data"], ensure_ascii=False)
+            for p in parts or [] if p.get("text") or p.get("data") is not None
+        ]
+
+    if result.get("kind") == "message" or "parts" in result:
+        found = texts(result.get("parts"))
+    else:
+        state = (result.get("status") or {}).get("state")
+        if state in ("failed", "canceled", "rejected"):
+            return None
+        artifacts = result.get("artifacts") or []
+        # 스트리밍 응답이면 최종 답변은 "response" 아티팩트 (나머지는 중계된 하위 에이전트 부분 응답)
+        final = [a for a in artifacts if a.get("name") == RESPONSE_ARTIFACT] or artifacts
+        found = [t for artifact in final for t in texts(artifact.get("parts"))]
+        if not found:
+            found = texts(((result.get("status") or {}).get("message") or {}).get("parts"))
+        if not found:
+            agent_messages = [m for m in result.get("history") or [] if m.get("role") == "agent"]
+            found = texts(agent_messages[-1].get("parts")) if agent_messages else []
+    return "\n".join(found) or None
+
+
+def _card_domains(card: AgentCard) -> set[str]:
+    """카드 skill의 id/tags를 소문자 토큰 집합으로"""
+    tokens: set[str] = set()
+    for skill in card.skills or []:
+        tokens.update(t.lower() for t in (skill.tags or []))
+        tokens.update(re.split(r"[_\-\s]+", (skill.id or "").lower()))
+    return tokens
+
+
+class FastPathRouter:
+    """
+    오케스트레이터 LLM 앞단의 규칙 기반 라우터.
+    ID 패턴으로 단일 도메인이 확실하고(키워드만 있으면 목록/현황/개수 같은 단순 조회일 때만),
+    그 도메인 태그를 가진 에이전트 카드가 하나뿐이면 LLM 없이 바로 위임한다.
+    ID 하나의 상태/상세 조회면 자연어 대신 DataPart 툴 호출을 보내 하위 에이전트 LLM도 거치지 않는다
+    (툴 오류면 같은 에이전트에 자연어로 다시 위임).
+    원인/비교 같은 복합 질의는 LLM으로, 규칙으로 정하지 못한 질의는 skill 인덱스가 확신할 때만 위임한다.
+    조금이라도 애매하면 None을 반환해 LLM 경로로 넘긴다.
+    FAST_PATH_ENABLED=false 로 끌 수 있다.
+    """
+
+    def __init__(
+        self,
+        card_cache: AgentCardCache,
+        dispatch: Callable[..., Awaitable[dict]],   # (agent_name, text, tool_call=None) → 결과 JSON
+        skill_index: SkillIndex | None = None,
+        enabled: bool = True,
+        max_chars: int = 80,
+    ):
+        self.card_cache = card_cache
+        self.dispatch = dispatch
+        self.skill_index = skill_index
+        self.enabled = enabled
+        self.max_chars = max_chars
+        self.counters: Counter = Counter()
+        self.routed_by_agent: Counter = Counter()
+        self._latency_total = 0.0
+
+    @classmethod
+    def from_env(cls, card_cache: AgentCardCache, dispatch, skill_index: SkillIndex | None = None) -> "FastPathRouter":
+        return cls(
+            card_cache,
+            dispatch,
+            skill_index,
+            enabled=os.getenv("FAST_PATH_ENABLED", "true").lower() == "true",
+            max_chars=int(os.getenv("FAST_PATH_MAX_CHARS", "80")),
+        )
+
+    def classify(self, text: str, cards: dict[str, AgentCard]) -> RouteDecision:
+        text = text.strip()
+        if not text:
+            return RouteDecision(None, None, "empty")
+        if len(text) > self.max_chars:
+            return RouteDecision(None, None, "too_long")
+        if _COMPLEX.search(text):
+            return RouteDecision(None, None, "complex")
+
+        lowered = text.lower()
+        id_domains = {r.domain for r in DOMAIN_RULES if r.id_pattern.search(text)}
+        keyword_domains = {r.domain for r in DOMAIN_RULES if any(k in lowered for k in r.keywords)}
+
+        if len(id_domains) > 1:
+            return RouteDecision(None, None, "multi_domain")
+        tool_call = None
+        if id_domains:
+            domain = next(iter(id_domains))
+            # ID와 다른 도메인의 키워드가 섞여 있으면 (예: "ORD0042 배송 차량 정비 이력") LLM에 맡김
+            if keyword_domains - id_domains:
+                return RouteDecision(None, None, "multi_domain")
+            rule = next(r for r in DOMAIN_RULES if r.domain == domain)
+            ids = rule.id_pattern.findall(text)
+            if rule.lookup and len(ids) == 1 and _ID_LOOKUP.search(text) and not _WRITE.search(text):
+                tool, arg = rule.lookup
+                tool_call = {"tool": tool, "args": {arg: ids[0].upper()}}
+        elif len(keyword_domains) == 1:
+            # 키워드 하나만으로는 의도가 확실하지 않음 → 단순 조회 형태가 아니면 skill 인덱스/LLM
+            if not _SIMPLE_LOOKUP.search(text):
+                return RouteDecision(None, next(iter(keyword_domains)), "keyword_only")
+            domain = next(iter(keyword_domains))
+        else:
+            return RouteDecision(None, None, "no_match" if not keyword_domains else "multi_domain")
+
+        matches = [name for name, card in cards.items() if domain in _card_domains(card)]
+        if len(matches) != 1:
+            return RouteDecision(None, domain, "no_agent" if not matches else "ambiguous_agent")
+        if tool_call is not None:
+            return RouteDecision(matches[0], domain, "id_tool", tool_call)
+        return RouteDecision(matches[0], domain, "id" if id_domains else "keyword")
+
+    async def try_route(self, text: str) -> str | None:
+        """확실하면 하위 에이전트에 직접 위임한 응답 텍스트를, 아니면 None을 반환"""
+        self.counters["requests"] += 1
+        if not self.enabled:
+            self.counters["miss:disabled"] += 1
+            return None
+        try:
+            cards = await self.card_cache.get_cards()
+        except Exception as e:
+            logger.warning(f"fast path: 카드 조회 실패, LLM 경로 사용: {e}")
+            self.counters["miss:no_cards"] += 1
+            return None
+
+        decision = self.classify(text, cards)
+        if decision.reason in ("no_match", "keyword_only") and self.skill_index is not None:
+            name = await self.skill_index.confident_match(text)
+            if name is not None:
+                decision = RouteDecision(name, None, "index")
+        if decision.agent_name is None:
+            self.counters[f"miss:{decision.reason}"] += 1
+            logger.debug(f"fast path miss ({decision.reason}): {text!r}")
+            return None
+
+        started = time.perf_counter()
+        try:
+            answer = None
+            if decision.tool_call is not None:
+                answer = await self._call_tool(decision.agent_name, text, decision.tool_call)
+                if answer is None:
+                    decision.reason = "id"
+            if answer is None:
+                result = await self.dispatch(decision.agent_name, text)
+                answer = None if "error" in result else extract_text(result)
+        except Exception as e:
+            logger.warning(f"fast path: {decision.agent_name} 위임 실패, LLM 경로 사용: {e}")
+            self.counters["miss:dispatch_error"] += 1
+            return None
+        if answer is None:
+            self.counters["miss:dispatch_error"] += 1
+            return None
+
+        self._latency_total += time.perf_counter() - started
+        self.counters["hits"] += 1
+        self.counters[f"hit:{decision.reason}"] += 1
+        self.routed_by_agent[decision.agent_name] += 1
+        logger.info(f"fast path hit ({decision.reason}) → {decision.agent_name}: {text!r}")
+        return answer
+
+    async def _call_tool(self, agent_name: str, text: str, tool_call: dict) -> str | None:
+        """DataPart 툴 호출 결과를 JSON 텍스트로 (툴 오류/조회 실패면 None)"""
+        result = await self.dispatch(agent_name, text, tool_call)
+        data = None if "error" in result else direct_result(result)
+        value = (data or {}).get("result")
+        if data is None or "error" in data or (isinstance(value, dict) and value.get("status") == "error"):
+            self.counters["tool_fallback"] += 1
+            logger.debug(f"fast path: {tool_call['tool']} 직접 호출 실패, 자연어로 위임: {data}")
+            return None
+        return json.dumps(value, ensure_ascii=False)
+
+    def stats(self) -> dict:
+        requests = self.counters["requests"]
+        hits = self.counters["hits"]
+        return {
+            "enabled": self.enabled,
+            "requests": requests,
+            "hits": hits,
+            "hit_rate": round(hits / requests, 4) if requests else 0.0,
+            "avg_hit_latency_ms": round(self._latency_total / hits * 1000, 2) if hits else 0.0,
+            "by_reason": {k: v for k, v in self.counters.items() if ":" in k},
+            "tool_fallbacks": self.counters["tool_fallback"],
+            "by_agent": dict(self.routed_by_agent),
+        }
@@ -1,6 +1,8 @@
+import asyncio
 import logging
+import os
 
-from collections.abc import Callable
+from collections.abc import Awaitable, Callable
 
 import httpx
 
@@ -10,6 +12,7 @@ from a2a.types import (
     SendMessageRequest,
     SendMessageResponse,
     Task,
+    TaskIdParams,
     Message,
     TaskArtifactUpdateEvent,
     TaskStatusUpdateEvent,
@@ -17,40 +20,121 @@ from a2a.types import (
 )
 from dotenv import load_dotenv
 
+from utils.admission import PRIORITY_HEADER, AdmissionRejected, current_priority
+from utils.inprocess import LocalAgent, local_agent, make_local_client
+
 
 load_dotenv()
 
 TaskCallbackArg = Task | TaskStatusUpdateEvent | TaskArtifactUpdateEvent
 TaskUpdateCallback = Callable[[TaskCallbackArg, AgentCard], Task]
+# 스트리밍 중 받은 상태/아티팩트 이벤트를 중계하는 콜백
+StreamUpdateCallback = Callable[[TaskStatusUpdateEvent | TaskArtifactUpdateEvent], Awaitable[None]]
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
 
-from a2a.client import ClientFactory
+class AgentBusyError(Exception):
+    """하위 에이전트가 입장 제어로 요청을 거절함 (429)"""
+
+    def __init__(self, agent_url: str, retry_after: float):
+        super().__init__(f"{agent_url} busy, retry after {retry_after}s")
+        self.agent_url = agent_url
+        self.retry_after = retry_after
+
+
+async def _propagate_priority(request: httpx.Request) -> None:
+    # 사용자 요청의 lane(interactive/batch)을 하위 에이전트 호출에도 그대로 전달
+    request.headers.setdefault(PRIORITY_HEADER, current_priority.get())
+
+
+async def _raise_if_busy(response: httpx.Response) -> None:
+    # SSE 요청은 429 본문을 스트림으로 해석하다 실패하므로 상태 코드에서 바로 구분
+    if response.status_code == 429:
+        retry_after = float(response.headers.get("retry-after", "1") or 1)
+        raise AgentBusyError(str(response.request.url), retry_after)
+
+
+from a2a.client import ClientConfig, ClientFactory
 
 class RemoteAgentConnections:
     """A class to hold the connections to the remote agents."""
 
-    def __init__(self, client_factory: ClientFactory, agent_card: AgentCard):
+    def __init__(
+        self,
+        agent_card: AgentCard,
+        httpx_client: httpx.AsyncClient | None = None,
+        local: LocalAgent | None = None,
+    ):
         self.card: AgentCard = agent_card
-        # ✅ a2a-sdk 0.3.5에서는 이렇게 생성해야 함
-        self.agent_client = client_factory.create(agent_card)
+        self.is_local = local is not None
+        if local is not None:
+            # 같은 프로세스의 에이전트 (host_all.py): 요청 핸들러를 바로 호출
+            self.agent_client = make_local_client(local, streaming=False)
+            self.streaming_client = make_local_client(local, streaming=True)
+        else:
+            # ✅ a2a-sdk 0.3.5에서는 이렇게 생성해야 함
+            # streaming 여부는 ClientConfig로 정해지므로 같은 httpx 연결 위에 두 클라이언트를 둔다
+            self.agent_client = ClientFactory(ClientConfig(httpx_client=httpx_client, streaming=False)).create(agent_card)
+            self.streaming_client = ClientFactory(ClientConfig(httpx_client=httpx_client, streaming=True)).create(agent_card)
+        self.httpx_client = httpx_client
         self.pending_tasks = set()
 
     def get_agent(self) -> AgentCard:
         return self.card
 
-    async def send_message(self, message: Message) -> Task | Message | None:
+    async def close(self) -> None:
+        # 두 클라이언트가 같은 httpx 클라이언트를 공유 (httpx aclose는 여러 번 호출해도 안전)
+        await self.agent_client.close()
+        await self.streaming_client.close()
+        if self.httpx_client is not None:
+            await self.httpx_client.aclose()
+
+    async def send_message(
+        self,
+        message: Message,
+        stream: bool = False,
+        on_update: StreamUpdateCallback | None = None,
+    ) -> Task | Message | None:
+        """
+        메시지 전송 후 최종 Task/Message 반환.
+        상대 카드가 streaming을 지원하면 stream 값과 상관없이 SSE(message/stream)로 보낸다
+        - 첫 이벤트에서 태스크 ID를 알 수 있어 호출이 중단되면 tasks/cancel 가능
+        - 스트림이 끝날 때까지 상대의 입장 제어 자리를 차지 (blocking 호출과 같음)
+        stream=True 이면 중간 이벤트마다 on_update 호출 (False면 최종 결과만)
+        streaming 미지원 카드는 blocking message/send → 결과가 올 때까지 태스크 ID를 몰라 원격 취소 불가
+        """
         last_task: Task | None = None
-        async for event in self.agent_client.send_message(message,stream=False):
-            if isinstance(event, Message):
-                return event
-            if self.is_terminal_or_interrupted(event[0]):
-                return event[0]
-            last_task = event[0]
+        try:
+            async for event in self.streaming_client.send_message(message):
+                if isinstance(event, Message):
+                    return event
+                task, update = event
+                if stream and update is not None and on_update is not None:
+                    await on_update(update)
+                if self.is_terminal_or_interrupted(task):
+                    return task
+                last_task = task
+        except AdmissionRejected as e:
+            # 같은 프로세스 에이전트의 입장 제어 거절 (HTTP 429와 동일하게 처리)
+            raise AgentBusyError(self.card.name, e.retry_after) from e
+        except BaseException:
+            # 호출이 취소/시간 초과/실패로 끝났는데 상대 태스크가 아직 실행 중이면 취소 요청
+            # (태스크 ID는 스트리밍 첫 이벤트에서 알 수 있음)
+            if last_task is not None and not self.is_terminal_or_interrupted(last_task):
+                await asyncio.shield(self.cancel_task(last_task.id))
+            raise
         return last_task
 
+    async def cancel_task(self, task_id: str) -> None:
+        """상대 에이전트의 태스크 취소 (실패해도 무시, 상대 태스크는 TTL로 정리됨)"""
+        try:
+            await asyncio.wait_for(self.agent_client.cancel_task(TaskIdParams(id=task_id)), timeout=5.0)
+            logger.info(f"원격 태스크 취소: {self.card.name} {task_id}")
+        except Exception as e:
+            logger.warning(f"원격 태스크 취소 실패 ({self.card.name} {task_id}): {e}")
+
     def is_terminal_or_interrupted(self, task: Task) -> bool:
         return task.status.state in [
             TaskState.completed,
@@ -59,3 +143,80 @@ class RemoteAgentConnections:
             TaskState.input_required,
             TaskState.unknown,
         ]
+
+
+class RemoteAgentPool:
+    """
+    에이전트 카드별로 재사용하는 장기 유지 A2A 클라이언트 풀.
+    호출마다 httpx.AsyncClient/A2A 클라이언트를 새로 만들지 않고 keep-alive 연결을 재사용한다.
+    """
+
+    def __init__(
+        self,
+        timeout: float = 30.0,
+        max_connections: int = 20,
+        max_keepalive_connections: int = 10,
+        keepalive_expiry: float = 60.0,
+        http2: bool = False,
+    ):
+        self.timeout = timeout
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive_connections,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self.http2 = http2
+        self._connections: dict[str, RemoteAgentConnections] = {}
+        self._retired: list[RemoteAgentConnections] = []
+
+    @classmethod
+    def from_env(cls) -> "RemoteAgentPool":
+        return cls(
+            timeout=float(os.getenv("A2A_CLIENT_TIMEOUT", "30")),
+            max_connections=int(os.getenv("A2A_MAX_CONNECTIONS", "20")),
+            max_keepalive_connections=int(os.getenv("A2A_MAX_KEEPALIVE_CONNECTIONS", "10")),
+            keepalive_expiry=float(os.getenv("A2A_KEEPALIVE_EXPIRY", "60")),
+            http2=os.getenv("A2A_HTTP2", "false").lower() == "true",
+        )
+
+    def _new_httpx_client(self) -> httpx.AsyncClient:
+        event_hooks = {"request": [_propagate_priority], "response": [_raise_if_busy]}
+        if self.http2:
+            try:
+                return httpx.AsyncClient(
+                    timeout=self.timeout, limits=self.limits, http2=True, event_hooks=event_hooks
+                )
+            except ImportError:
+                logger.warning("h2 패키지가 없어 HTTP/1.1 keep-alive로 동작합니다. (pip install 'httpx[http2]')")
+                self.http2 = False
+        return httpx.AsyncClient(timeout=self.timeout, limits=self.limits, event_hooks=event_hooks)
+
+    def get(self, card: AgentCard) -> RemoteAgentConnections:
+        """카드 이름별 연결을 반환 (처음이거나 카드 URL이 바뀌었으면 새로 생성)"""
+        name = card.name or card.url
+        conn = self._connections.get(name)
+        if conn is not None and conn.card.url == card.url:
+            return conn
+        if conn is not None:
+            # URL이 바뀐 카드: 이전 연결은 진행 중인 호출이 있을 수 있으므로 종료 시 정리
+            self._retired.append(conn)
+        local = local_agent(card.name)
+        if local is not None:
+            conn = RemoteAgentConnections(card, local=local)
+            logger.info(f"A2A in-process 연결 생성: {name}")
+        else:
+            conn = RemoteAgentConnections(card, self._new_httpx_client())
+            logger.info(f"A2A 연결 생성: {name} ({card.url}, http2={self.http2})")
+        self._connections[name] = conn
+        return conn
+
+    async def aclose(self) -> None:
+        """서버 종료 시 모든 연결 정리"""
+        connections = [*self._connections.values(), *self._retired]
+        self._connections.clear()
+        self._retired.clear()
+        for conn in connections:
+            try:
+                await conn.close()
+            except Exception as e:
+                logger.warning(f"A2A 연결 종료 실패 ({conn.card.name}): {e}")
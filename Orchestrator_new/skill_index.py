@@ -0,0 +1,96 @@
+import logging
+import os
+import time
+
+from a2a.types import AgentCard
+
+from agent_card_cache import AgentCardCache
+from utils.text_vectors import HashingTfidfIndex
+
+
+logger = logging.getLogger(__name__)
+logger.setLevel(logging.DEBUG)
+
+
+def card_chunks(card: AgentCard) -> list[str]:
+    """카드 이름/설명 + skill 이름/설명/태그/예시 (각각 별도 문서로 색인)"""
+    chunks = [card.name or "", card.description or ""]
+    for skill in card.skills or []:
+        chunks.extend([skill.name or "", skill.description or ""])
+        chunks.extend(skill.tags or [])
+        chunks.extend(skill.examples or [])
+    return [c for c in chunks if c]
+
+
+class SkillIndex:
+    """
+    에이전트 카드 skill에 대한 로컬 벡터 인덱스 (해시 TF-IDF, CPU 전용).
+    설명/예시 문장을 따로 색인하고 에이전트 점수는 가장 가까운 문장의 점수로 한다
+    (긴 영어 설명 때문에 짧은 한글 질의 점수가 희석되지 않도록).
+    카드 캐시 version이 바뀔 때만 다시 만든다.
+    - search(): 질의와 가까운 top-k 에이전트 (LLM에게 후보만 보여줄 때)
+    - confident_match(): 1위 점수와 2위와의 차이가 모두 기준 이상일 때만 에이전트 이름 반환
+    """
+
+    def __init__(
+        self,
+        card_cache: AgentCardCache,
+        top_k: int = 3,
+        min_score: float = 0.25,
+        min_margin: float = 0.15,
+        exclude_tags: tuple[str, ...] = ("orchestrator",),
+    ):
+        self.card_cache = card_cache
+        self.top_k = top_k
+        self.min_score = min_score
+        self.min_margin = min_margin
+        self.exclude_tags = set(exclude_tags)
+        self._index = HashingTfidfIndex()
+        self._version: int | None = None
+
+    @classmethod
+    def from_env(cls, card_cache: AgentCardCache) -> "SkillIndex":
+        return cls(
+            card_cache,
+            top_k=int(os.getenv("SKILL_INDEX_TOP_K", "3")),
+            min_score=float(os.getenv("SKILL_INDEX_MIN_SCORE", "0.25")),
+            min_margin=float(os.getenv("SKILL_INDEX_MIN_MARGIN", "0.15")),
+        )
+
+    def _routable(self, card: AgentCard) -> bool:
+        tags = {t.lower() for skill in card.skills or [] for t in skill.tags or []}
+        return not tags & self.exclude_tags
+
+    async def _ensure_fresh(self) -> None:
+        cards = await self.card_cache.get_cards()
+        if self._version == self.card_cache.version and len(self._index):
+            return
+        started = time.perf_counter()
+        routable = {name: card for name, card in cards.items() if self._routable(card)}
+        self._index.fit({
+            (name, i): chunk for name, card in routable.items() for i, chunk in enumerate(card_chunks(card))
+        })
+        self._version = self.card_cache.version
+        logger.info(
+            f"스킬 인덱스 재생성: 에이전트 {len(routable)}개 / 문장 {len(self._index)}개, "
+            f"{(time.perf_counter() - started) * 1000:.1f}ms (card version {self._version})"
+        )
+
+    async def search(self, query: str, k: int | None = None) -> list[tuple[str, float]]:
+        await self._ensure_fresh()
+        best: dict[str, float] = {}
+        for (name, _), score in self._index.query(query, len(self._index)):
+            if score > best.get(name, 0.0):
+                best[name] = score
+        ranked = sorted(best.items(), key=lambda item: item[1], reverse=True)
+        return ranked[: k or self.top_k]
+
+    async def confident_match(self, query: str) -> str | None:
+        ranked = await self.search(query, 2)
+        if not ranked:
+            return None
+        best_name, best = ranked[0]
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        if best >= self.min_score and best - runner_up >= self.min_margin:
+            return best_name
+        return None
@@ -9,6 +9,7 @@ Features:
 - POST /agents/{id}/heartbeat : update agent liveness
 - PUT  /agents/{id}     : update agent (simple owner-less update)
 - DELETE /agents/{id}   : delete agent
+- GET  /metrics         : Prometheus metrics
 
 Storage: SQLite with JSON extension (scalable NoSQL-like storage with SQL performance)
 Run: pip install -r requirements.txt
@@ -18,11 +19,12 @@ Run: pip install -r requirements.txt
 
 import os
 import json
+import hashlib
 from typing import Optional, Dict, Any
 from uuid import uuid4
 from datetime import datetime, timezone
 
-from fastapi import FastAPI, HTTPException, Query, Path, status, Request
+from fastapi import FastAPI, HTTPException, Query, Path, status, Request, Response
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel, Field, HttpUrl
 from database import AgentDatabase
@@ -30,6 +32,7 @@ from jsonschema import ValidationError
 import logging as logger
 from agent_card_validator import AgentCardValidator
 from agent_card_models import AgentCreate, AgentUpdate
+from metrics import add_metrics
 
 from dotenv import load_dotenv
 
@@ -62,10 +65,24 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# Prometheus request metrics (GET /metrics)
+add_metrics(app)
+
 # -----------------------------
 # Helpers
 # -----------------------------
 
+# Fields that change without the card changing (excluded from list ETags)
+VOLATILE_FIELDS = ("last_heartbeat",)
+
+
+def list_etag(agents: list) -> str:
+    """ETag over the agent list without volatile fields, so heartbeats keep it stable"""
+    stable = [{k: v for k, v in agent.items() if k not in VOLATILE_FIELDS} for agent in agents]
+    body = json.dumps(stable, default=str, ensure_ascii=False, sort_keys=True)
+    return f'"{hashlib.sha1(body.encode("utf-8")).hexdigest()}"'
+
+
 def fetch_agent(agent_id: str) -> Dict[str, Any]:
     result = db.get_agent(agent_id)
     if not result:
@@ -114,6 +131,7 @@ async def register_agent(request: Request):
 
 @app.get("/agents")
 def list_agents(
+    request: Request,
     skill: Optional[str] = Query(None),
     name: Optional[str] = Query(None),
     owner: Optional[str] = Query(None),
@@ -129,6 +147,11 @@ def list_agents(
     - state_transition_history: expects capabilities['stateTransitionHistory'] == True
     - only_alive: filters agents whose last_heartbeat is within 5 minutes
     - capabilities: comma-separated list, e.g. "streaming,push_notifications"
+
+    The response carries an ETag; clients that send it back in If-None-Match
+    get 304 Not Modified when the result has not changed. Heartbeats alone do
+    not change the ETag (last_heartbeat is left out of the hash), so a 304
+    response may carry older last_heartbeat values.
     """
     # Parse capabilities string into boolean flags
     capabilities_list = []
@@ -140,7 +163,7 @@ def list_agents(
     state_transition_history = "state_transition_history" in capabilities_list or "stateTransitionHistory" in capabilities_list
 
     # Use database method with efficient WHERE conditions
-    return db.list_agents(
+    agents = db.list_agents(
         skill=skill,
         name=name,
         owner=owner,
@@ -150,6 +173,12 @@ def list_agents(
         only_alive=only_alive
     )
 
+    body = json.dumps(agents, default=str, ensure_ascii=False)
+    etag = list_etag(agents)
+    if request.headers.get("if-none-match") == etag:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+    return Response(content=body, media_type="application/json", headers={"ETag": etag})
+
 @app.get("/agents/{agent_id}")
 def get_agent(agent_id: str = Path(...)):
     return fetch_agent(agent_id)
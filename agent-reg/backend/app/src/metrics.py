@@ -0,0 +1,66 @@
+"""
+Prometheus metrics for the registry (GET /metrics)
+
+- agent_registry_http_requests_total{method, route, status}
+- agent_registry_http_request_duration_seconds{method, route}
+- agent_registry_http_requests_in_flight
+
+Routes are labelled by their template (/agents/{agent_id}) so agent ids do not
+create new series; unmatched paths are grouped under "other".
+"""
+
+import time
+
+from fastapi import FastAPI, Request, Response
+from prometheus_client import CONTENT_TYPE_LATEST, Counter, Gauge, Histogram, generate_latest
+
+HTTP_REQUESTS = Counter(
+    "agent_registry_http_requests_total", "HTTP requests handled", ["method", "route", "status"]
+)
+HTTP_LATENCY = Histogram(
+    "agent_registry_http_request_duration_seconds",
+    "HTTP request latency",
+    ["method", "route"],
+    buckets=(0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5),
+)
+HTTP_IN_FLIGHT = Gauge("agent_registry_http_requests_in_flight", "HTTP requests being handled")
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware (keeps streaming responses intact, unlike BaseHTTPMiddleware)"""
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        HTTP_IN_FLIGHT.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            # The router writes the matched route into the shared scope
+            route = getattr(scope.get("route"), "path", "other")
+            HTTP_LATENCY.labels(scope["method"], route).observe(time.perf_counter() - started)
+            HTTP_REQUESTS.labels(scope["method"], route, str(status["code"])).inc()
+
+
+async def metrics_endpoint(request: Request) -> Response:
+    return Response(generate_latest(), media_type=CONTENT_TYPE_LATEST)
+
+
+def add_metrics(app: FastAPI) -> None:
+    """Expose /metrics and record request metrics for every route"""
+    app.add_api_route("/metrics", metrics_endpoint, methods=["GET"], include_in_schema=False)
+    app.add_middleware(MetricsMiddleware)
@@ -1,7 +1,13 @@
+import os
+import sys
 import redis
 from datetime import datetime, timedelta
 import random
 
+# 프로젝트 루트의 utils 패키지 사용
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.redis_query import INDEX_SPECS, rebuild_indexes
+
 # Redis 연결
 redis_client = redis.Redis(host="localhost", port=6379, db=0, decode_responses=True)
 
@@ -70,6 +76,10 @@ def seed_large_data(n=800):
             "delivery_id": delivery_id
         })
 
+    # 조회 툴이 사용하는 보조 인덱스(상태/용량/창고/시간) 구축
+    for entity in INDEX_SPECS:
+        rebuild_indexes(redis_client, entity)
+
     print(f"✅ {n}개의 데이터 입력 완료")
 
 if __name__ == "__main__":
@@ -0,0 +1,295 @@
+"""
+물류 데이터셋(Redis) → Parquet 컬럼형 export
+
+- 엔티티별로 파이프라인 SCAN 해서 Arrow RecordBatch 단위로 스트리밍 기록
+- 시간 필드가 있는 엔티티(delivery, quality)는 date=YYYY-MM-DD 로 파티셔닝하고,
+  --incremental 이면 timestamp 인덱스(idx:{entity}:timestamp)로 지난 export 이후 변경분만 내보냄
+  (워터마크 = 마지막 timestamp 점수 + 그 점수에서 내보낸 id 목록 → 같은 timestamp로 나중에 들어온 행도 빠지지 않음)
+- 시간 필드가 없는 엔티티(vehicle, item)는 snapshot=<run_id> 파티션으로 전체 스냅샷
+
+사용법 (프로젝트 루트에서):
+    python agentDB/export_parquet.py --out exports
+    python agentDB/export_parquet.py --out exports --incremental --entities delivery,quality
+"""
+import argparse
+import json
+import logging
+import os
+import sys
+from datetime import datetime, timezone
+from typing import Any, Dict, Iterator, List, Optional, Set, Tuple
+
+import redis
+
+# 프로젝트 루트의 utils 패키지 사용
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from utils.redis_query import entity_id, to_score, index_registry_key, zset_index_key
+from utils.redis_scan import fetch_hashes, scan_items
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # export 전용 의존성이라 에이전트 이미지에는 설치하지 않음
+    pa = None
+    pq = None
+
+logger = logging.getLogger("export_parquet")
+
+# 엔티티별 컬럼 타입 (정의되지 않은 필드는 _extra 컬럼에 JSON으로 보관)
+ENTITY_COLUMNS: Dict[str, Dict[str, str]] = {
+    "delivery": {"id": "string", "status": "string", "quality_id": "string", "timestamp": "timestamp"},
+    "quality": {
+        "id": "string", "inspection": "string", "qc_result": "string",
+        "defects": "int", "timestamp": "timestamp",
+    },
+    "vehicle": {
+        "id": "string", "vehicle_no": "string", "status": "string", "driver": "string",
+        "capacity": "int", "delivery_id": "string", "recall_id": "string",
+    },
+    "item": {
+        "id": "string", "name": "string", "quantity": "int",
+        "warehouse_id": "string", "vehicle_id": "string",
+    },
+}
+TIME_FIELD = "timestamp"
+STATE_FILE = "_export_state.json"
+ZRANGE_PAGE = 5000
+
+
+def _arrow_schema(entity: str):
+    types = {"string": pa.string(), "int": pa.int64(), "timestamp": pa.timestamp("us")}
+    columns = [pa.field(name, types[kind]) for name, kind in ENTITY_COLUMNS[entity].items()]
+    columns.append(pa.field("_extra", pa.string()))
+    return pa.schema(columns)
+
+
+def _convert(value: Optional[str], kind: str) -> Any:
+    if value is None or value == "":
+        return None
+    try:
+        if kind == "int":
+            return int(value)
+        if kind == "timestamp":
+            return datetime.fromisoformat(value)
+    except ValueError:
+        return None
+    return value
+
+
+def _to_row(entity: str, data: Dict[str, str]) -> Dict[str, Any]:
+    columns = ENTITY_COLUMNS[entity]
+    row = {name: _convert(data.get(name), kind) for name, kind in columns.items()}
+    extra = {k: v for k, v in data.items() if k not in columns}
+    row["_extra"] = json.dumps(extra, ensure_ascii=False) if extra else None
+    return row
+
+
+def _partition_of(entity: str, data: Dict[str, str], run_id: str) -> str:
+    if TIME_FIELD in ENTITY_COLUMNS[entity]:
+        ts = data.get(TIME_FIELD, "")
+        return f"date={ts[:10]}" if len(ts) >= 10 else "date=unknown"
+    return f"snapshot={run_id}"
+
+
+# ---------- 소스 ----------
+
+def _iter_full(client: redis.Redis, entity: str) -> Iterator[Tuple[str, Dict[str, str]]]:
+    return scan_items(client, f"{entity}:*", key_filter=lambda key: entity_id(key) is not None)
+
+
+def _iter_since(
+    client: redis.Redis, entity: str, since: float, seen: Optional[Set[str]] = None
+) -> Iterator[Tuple[str, Dict[str, str]]]:
+    """
+    timestamp 인덱스로 since 이후 엔티티만 순서대로 읽는다 (인덱스가 없으면 스캔+필터)
+    seen: 지난 export에서 점수가 정확히 since였던 id → since 점수는 다시 읽되 이 id만 건너뜀
+          (None이면 이전 형식의 상태 파일 → since 초과만)
+    """
+    def is_new(ident: str, score: Optional[float]) -> bool:
+        if score is None:
+            return False
+        if seen is None:
+            return score > since
+        return score > since or (score == since and ident not in seen)
+
+    if not client.sismember(index_registry_key(entity), TIME_FIELD):
+        logger.warning(f"{entity}: timestamp 인덱스가 없어 전체 스캔 후 필터링합니다.")
+        for key, data in scan_items(
+            client,
+            f"{entity}:*",
+            predicate=lambda data: (to_score(data.get(TIME_FIELD)) or 0) >= since,
+            key_filter=lambda key: entity_id(key) is not None,
+        ):
+            if is_new(entity_id(key), to_score(data.get(TIME_FIELD))):
+                yield key, data
+        return
+
+    low = since if seen is not None else f"({since}"
+    offset = 0
+    while True:
+        page = client.zrangebyscore(
+            zset_index_key(entity, TIME_FIELD), low, "+inf", start=offset, num=ZRANGE_PAGE, withscores=True
+        )
+        if not page:
+            return
+        ids = [ident for ident, score in page if is_new(ident, score)]
+        yield from fetch_hashes(client, (f"{entity}:{ident}" for ident in ids))
+        offset += len(page)
+
+
+# ---------- 싱크 ----------
+
+class PartitionedParquetSink:
+    """파티션별 ParquetWriter를 열어두고 batch_size 단위 RecordBatch로 기록"""
+
+    def __init__(self, out_dir: str, entity: str, run_id: str, batch_size: int):
+        self.out_dir = out_dir
+        self.entity = entity
+        self.run_id = run_id
+        self.batch_size = batch_size
+        self.schema = _arrow_schema(entity)
+        self.buffers: Dict[str, List[Dict[str, Any]]] = {}
+        self.writers: Dict[str, Any] = {}
+        self.rows = 0
+
+    def add(self, partition: str, row: Dict[str, Any]) -> None:
+        buf = self.buffers.setdefault(partition, [])
+        buf.append(row)
+        if len(buf) >= self.batch_size:
+            self._flush(partition)
+
+    def _flush(self, partition: str) -> None:
+        rows = self.buffers.get(partition)
+        if not rows:
+            return
+        writer = self.writers.get(partition)
+        if writer is None:
+            path = os.path.join(self.out_dir, f"entity={self.entity}", partition)
+            os.makedirs(path, exist_ok=True)
+            writer = pq.ParquetWriter(
+                os.path.join(path, f"part-{self.run_id}.parquet"), self.schema, compression="zstd"
+            )
+            self.writers[partition] = writer
+        writer.write_batch(pa.RecordBatch.from_pylist(rows, schema=self.schema))
+        self.rows += len(rows)
+        self.buffers[partition] = []
+
+    def close(self) -> None:
+        for partition in list(self.buffers):
+            self._flush(partition)
+        for writer in self.writers.values():
+            writer.close()
+
+
+# ---------- export ----------
+
+def _load_state(out_dir: str) -> Dict[str, Dict[str, Any]]:
+    """엔티티 → {"score": 마지막 timestamp 점수, "ids": 그 점수에서 내보낸 id} (이전 형식은 점수만, ids=None)"""
+    path = os.path.join(out_dir, STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        state = json.load(f)
+    return {
+        entity: value if isinstance(value, dict) else {"score": value, "ids": None}
+        for entity, value in state.items()
+    }
+
+
+def _save_state(out_dir: str, state: Dict[str, Dict[str, Any]]) -> None:
+    path = os.path.join(out_dir, STATE_FILE)
+    tmp = f"{path}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(state, f, indent=2)
+    os.replace(tmp, path)
+
+
+def export_entity(
+    client: redis.Redis,
+    entity: str,
+    out_dir: str,
+    run_id: str,
+    since: Optional[Dict[str, Any]] = None,
+    batch_size: int = 5000,
+) -> Dict[str, Any]:
+    """엔티티 하나를 export 하고 {rows, partitions, watermark}를 반환 (watermark: {"score", "ids"})"""
+    sink = PartitionedParquetSink(out_dir, entity, run_id, batch_size)
+    if since is None:
+        source = _iter_full(client, entity)
+        score_max, ids_at_max = None, set()
+    else:
+        seen = set(since["ids"]) if since.get("ids") is not None else None
+        source = _iter_since(client, entity, since["score"], seen)
+        # 이전 형식 상태(ids 없음)는 새 행이 들어올 때까지 그대로 유지
+        score_max, ids_at_max = since["score"], set(seen) if seen is not None else None
+    try:
+        for key, data in source:
+            sink.add(_partition_of(entity, data, run_id), _to_row(entity, data))
+            score = to_score(data.get(TIME_FIELD))
+            if score is None:
+                continue
+            if score_max is None or score > score_max:
+                score_max, ids_at_max = score, set()
+            if score == score_max:
+                ids_at_max.add(entity_id(key))
+    finally:
+        sink.close()
+    watermark = None if score_max is None else {
+        "score": score_max, "ids": sorted(ids_at_max) if ids_at_max is not None else None,
+    }
+    return {"rows": sink.rows, "partitions": len(sink.writers), "watermark": watermark}
+
+
+def run_export(
+    client: redis.Redis,
+    out_dir: str,
+    entities: List[str],
+    incremental: bool = False,
+    batch_size: int = 5000,
+) -> Dict[str, Any]:
+    if pa is None:
+        raise RuntimeError("pyarrow가 설치되어 있지 않습니다. `pip install pyarrow` 후 다시 실행하세요.")
+    os.makedirs(out_dir, exist_ok=True)
+    run_id = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+    state = _load_state(out_dir)
+    summary = {}
+    for entity in entities:
+        time_based = TIME_FIELD in ENTITY_COLUMNS[entity]
+        since = state.get(entity) if incremental and time_based else None
+        if incremental and not time_based:
+            logger.info(f"{entity}: 시간 필드가 없어 전체 스냅샷으로 export 합니다.")
+        result = export_entity(client, entity, out_dir, run_id, since, batch_size)
+        if time_based and result["watermark"] is not None:
+            state[entity] = result["watermark"]
+        summary[entity] = result
+        logger.info(f"{entity}: {result['rows']}건, 파티션 {result['partitions']}개")
+    _save_state(out_dir, state)
+    return {"run_id": run_id, "entities": summary}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Redis 물류 데이터를 Parquet으로 export")
+    parser.add_argument("--out", default="exports", help="출력 디렉토리")
+    parser.add_argument("--entities", default=",".join(ENTITY_COLUMNS), help="쉼표로 구분한 엔티티 목록")
+    parser.add_argument("--incremental", action="store_true", help="지난 export 이후 변경분만 (timestamp 기준)")
+    parser.add_argument("--batch-size", type=int, default=5000, help="RecordBatch 크기")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    entities = [e.strip() for e in args.entities.split(",") if e.strip()]
+    unknown = [e for e in entities if e not in ENTITY_COLUMNS]
+    if unknown:
+        parser.error(f"알 수 없는 엔티티: {', '.join(unknown)}")
+
+    client = redis.Redis(
+        host=os.getenv("REDIS_HOST", "localhost"),
+        port=int(os.getenv("REDIS_PORT", "6379")),
+        db=0,
+        decode_responses=True,
+    )
+    summary = run_export(client, args.out, entities, args.incremental, args.batch_size)
+    print(json.dumps(summary, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -9,9 +9,9 @@ from dotenv import load_dotenv
 from google.adk.agents import LlmAgent
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
-from google.adk.models.lite_llm import LiteLlm
 from google.genai import types
-from utils.model_config import get_model_with_fallback
+from utils.model_config import get_tiered_model
+from utils.tool_shaping import fetch_tool_result
 from google.adk.tools import FunctionTool
 
 # 현재 폴더의 .env 파일 로드
@@ -20,19 +20,21 @@ from tools.redis_delivery_tools import (
     get_delivery_data,
     get_all_deliveries,
     get_completed_deliveries,
+    query_deliveries,
 )
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
 # --- 1. Agent 정의 ---
-# Gemini 우선, 실패시 로컬 LLM 사용
+# Gemini 우선, 실패시 로컬 LLM 사용 (MODEL_TIER_* 설정 시 툴 선택/최종 답변에 다른 모델)
 try:
-    model = get_model_with_fallback()
+    model = get_tiered_model("delivery")
     logger.info(f"DeliveryAgent 모델 설정 완료: {type(model).__name__ if hasattr(model, '__class__') else model}")
 except Exception as e:
     logger.error(f"DeliveryAgent 모델 설정 실패: {e}")
-    # 최후의 fallback
+    # 최후의 fallback (litellm 스택은 이 경우에만 로드)
+    from google.adk.models.lite_llm import LiteLlm
     ollama_host = os.getenv("OLLAMA_HOST", "localhost")
     model = LiteLlm(
         model="ollama_chat/gpt-oss:20b",
@@ -48,11 +50,14 @@ root_agent = LlmAgent(
     - 사용자가 주문번호를 말하면 반드시 get_delivery_data 툴을 호출해야 한다.
     - '모든 배송 데이터'를 원하면 get_all_deliveries 툴을 호출해야 한다.
     - '완료된 배송 수'를 물어보면 get_completed_deliveries 툴을 호출해야 한다.
+    - 상태·기간 등 조건으로 배송을 찾거나 정렬/상위 N개가 필요하면 query_deliveries 툴을 한 번 호출해서 처리하라.
     """,
         tools=[
         FunctionTool(get_delivery_data),
         FunctionTool(get_all_deliveries),
         FunctionTool(get_completed_deliveries),
+        FunctionTool(query_deliveries),
+        FunctionTool(fetch_tool_result),
     ],
 )
 
@@ -1,10 +1,13 @@
 # /home/agents/tools/redis_delivery_tools.py
 import os
-import redis
 from typing import Dict, Any, Optional, List, Tuple
 
-# Redis 연결
-redis_client = redis.Redis(
+from utils.metrics import InstrumentedRedis
+from utils.redis_query import run_query
+from utils.redis_scan import field_equals, scan_first, scan_hashes
+
+# Redis 연결 (명령 수를 툴별로 /metrics에 집계)
+redis_client = InstrumentedRedis(
     host=os.getenv("REDIS_HOST", "localhost"),
     port=int(os.getenv("REDIS_PORT", "6379")),
     db=0,
@@ -25,22 +28,13 @@ def _scan_first(prefix: str, field: str, value: str) -> Optional[Dict[str, str]]
     """
     지정 prefix:*, field==value 인 해시 1개를 찾아 반환 (없으면 None).
     """
-    for key in redis_client.scan_iter(f"{prefix}:*"):
-        data = redis_client.hgetall(key)
-        if data.get(field) == value:
-            return data
-    return None
+    return scan_first(redis_client, f"{prefix}:*", field_equals(field, value))
 
 def _scan_all(prefix: str, field: str, value: str) -> List[Dict[str, str]]:
     """
     지정 prefix:*, field==value 인 해시 전부를 리스트로 반환.
     """
-    out = []
-    for key in redis_client.scan_iter(f"{prefix}:*"):
-        data = redis_client.hgetall(key)
-        if data.get(field) == value:
-            out.append(data)
-    return out
+    return list(scan_hashes(redis_client, f"{prefix}:*", field_equals(field, value)))
 
 def _infer_type_and_load(ident: str) -> Tuple[Optional[str], Optional[Dict[str, str]]]:
     """
@@ -169,20 +163,34 @@ def get_all_deliveries() -> dict:
     """
     모든 배송 해시 반환 (delivery:*)
     """
-    deliveries = []
-    for key in redis_client.scan_iter("delivery:*"):
-        data = redis_client.hgetall(key)
-        if data:
-            deliveries.append(data)
+    deliveries = list(scan_hashes(redis_client, "delivery:*"))
     return {"status": "success", "count": len(deliveries), "data": deliveries}
 
 def get_completed_deliveries() -> dict:
     """
     상태가 delivered 인 배송 건수/목록
     """
-    completed = []
-    for key in redis_client.scan_iter("delivery:*"):
-        data = redis_client.hgetall(key)
-        if data.get("status") == "delivered":
-            completed.append(data)
+    completed = list(scan_hashes(redis_client, "delivery:*", field_equals("status", "delivered")))
     return {"status": "success", "completed_count": len(completed), "data": completed}
+
+def query_deliveries(
+    filters: Optional[List[Dict[str, Any]]] = None,
+    sort_by: Optional[str] = None,
+    descending: bool = False,
+    limit: int = 50,
+    fields: Optional[List[str]] = None,
+) -> dict:
+    """
+    배송 구조화 조회 (조건/정렬/개수 제한/필드 선택을 한 번에 처리)
+    - filters: [{"field": 필드명, "op": 연산자, "value": 값}, ...] 모두 AND 결합
+      * 연산자: ==, !=, >, >=, <, <=, in(value는 리스트), contains
+      * 필드: id, status(delivered/in_transit/ready), quality_id, timestamp(ISO 8601)
+    - sort_by: 정렬 필드 (예: "timestamp"), descending: 내림차순 여부
+    - limit: 최대 반환 건수 (기본 50, 최대 500)
+    - fields: 반환할 필드 목록 (생략하면 전체)
+    예) 9월 26일 이후 배송 중인 건 최신순 10개:
+        filters=[{"field": "status", "op": "==", "value": "in_transit"},
+                 {"field": "timestamp", "op": ">=", "value": "2025-09-26T00:00:00"}],
+        sort_by="timestamp", descending=True, limit=10
+    """
+    return run_query(redis_client, "delivery", filters, sort_by, descending, limit, fields)
@@ -8,9 +8,9 @@ from dotenv import load_dotenv
 from google.adk.agents import LlmAgent
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
-from google.adk.models.lite_llm import LiteLlm
 from google.genai import types
-from utils.model_config import get_model_with_fallback
+from utils.model_config import get_tiered_model
+from utils.tool_shaping import fetch_tool_result
 from google.adk.tools import FunctionTool
 
 
@@ -22,6 +22,7 @@ from tools.redis_item_tools import (
     get_item_details,
     track_item_inventory,
     get_all_warehouse_inventories_for_item,
+    query_items,
     # update_item_status,
 )
 
@@ -29,13 +30,14 @@ logger = logging.getLogger("item_agent")
 logger.setLevel(logging.DEBUG)
 
 # --- 1. Agent 정의 ---
-# Gemini 우선, 실패시 로컬 LLM 사용
+# Gemini 우선, 실패시 로컬 LLM 사용 (MODEL_TIER_* 설정 시 툴 선택/최종 답변에 다른 모델)
 try:
-    model = get_model_with_fallback()
+    model = get_tiered_model("item")
     logger.info(f"ItemAgent 모델 설정 완료: {type(model).__name__ if hasattr(model, '__class__') else model}")
 except Exception as e:
     logger.error(f"ItemAgent 모델 설정 실패: {e}")
-    # 최후의 fallback
+    # 최후의 fallback (litellm 스택은 이 경우에만 로드)
+    from google.adk.models.lite_llm import LiteLlm
     ollama_host = os.getenv("OLLAMA_HOST", "localhost")
     model = LiteLlm(
         model="ollama_chat/gpt-oss:20b",
@@ -51,11 +53,14 @@ root_agent = LlmAgent(
     - 사용자가 상품 ID를 말하면 반드시 get_item_details 툴을 호출해야 한다.
     - '재고 수량'을 물어보면 track_item_inventory 툴을 호출해야 한다.
     - 만약 지정한 warehouse_id에 상품이 없으면, get_all_warehouse_inventories_for_item을 호출해서 다른 창고에 있는지 확인하라.
+    - 창고·수량·상품명 등 조건으로 여러 상품을 찾을 때는 query_items 툴을 한 번 호출해서 처리하라.
     """,
     tools=[
         FunctionTool(get_item_details),
         FunctionTool(track_item_inventory),
         FunctionTool(get_all_warehouse_inventories_for_item),
+        FunctionTool(query_items),
+        FunctionTool(fetch_tool_result),
     ],
 )
 
@@ -1,74 +1,150 @@
+import asyncio
 import logging
 from uuid import uuid4
 from a2a.server.agent_execution import AgentExecutor, RequestContext
 from a2a.server.events import EventQueue
-from a2a.types import Message, TextPart, Part, Role
+from a2a.server.tasks import TaskUpdater
+from a2a.types import Message, TextPart, DataPart, Part, Role
+from a2a.utils import new_task
 from google.adk.runners import Runner
-from google.adk.sessions import InMemorySessionService
 from google.genai import types
+from utils.direct_tools import ToolCallError, build_tool_registry, parse_tool_call, run_tool_call
+from utils.adk_streaming import ResponseStreamer, run_config, text_part
+from utils.session_pool import SessionPool
+from utils.redis_stores import make_session_service
+from utils.history_compaction import HistoryCompactionPlugin
+from utils.llm_cache import LlmCachePlugin
+from utils.tool_shaping import ToolOutputShaper
+from utils.runtime_stats import register_stats
+from utils.cancellation import TaskCancellation
+from utils.llm_limiter import current_agent
+from utils.metrics import MetricsPlugin, track_task
 
 logger = logging.getLogger(__name__)
 
 
 class ADKAgentExecutor(AgentExecutor):
-    def __init__(self, agent, app_name="orchestrator_app", user_id="user1", session_id="sess1"):
+    def __init__(self, agent, app_name="orchestrator_app", user_id="user1"):
         self.agent = agent
         self.app_name = app_name
         self.user_id = user_id
-        self.session_id = session_id
-        self.session_service = InMemorySessionService()
-        self.runner = Runner(agent=self.agent, app_name=self.app_name, session_service=self.session_service)
+        # SESSION_BACKEND=redis 면 워커/컨테이너 간 공유되는 Redis 세션
+        self.session_service = make_session_service(agent.name)
+        # LLM 호출 전 오래된 큰 툴 결과를 요약해서 프롬프트 크기를 일정하게 유지
+        self.compaction = HistoryCompactionPlugin.from_env()
+        # 압축된 요청 기준으로 같은 LLM 요청은 캐시된 응답 재사용 (데이터 변경 시 무효화)
+        self.llm_cache = LlmCachePlugin.from_env()
+        # 큰 툴 결과는 개수/집계/샘플/handle로 줄여서 LLM에 전달
+        self.tool_shaping = ToolOutputShaper.from_env()
+        # LLM/툴 호출 지연·토큰·오류를 Prometheus 지표로 기록 (/metrics)
+        self.metrics = MetricsPlugin()
+        self.runner = Runner(
+            agent=self.agent,
+            app_name=self.app_name,
+            session_service=self.session_service,
+            plugins=[self.compaction, self.llm_cache, self.metrics, self.tool_shaping],
+        )
+        # 대화(context_id)별 세션, 개수/유휴 시간 제한
+        self.sessions = SessionPool.from_env(self.session_service, self.app_name)
+        register_stats("sessions", self.sessions.stats)
+        register_stats("history_compaction", self.compaction.stats)
+        register_stats("llm_cache", self.llm_cache.stats)
+        register_stats("tool_output_shaping", self.tool_shaping.stats)
+        # DataPart 직접 호출용 툴 레지스트리
+        self.tools = build_tool_registry(agent)
+        # 실행 중인 태스크 (tasks/cancel 시 바로 중단)
+        self.cancellation = TaskCancellation.from_env(agent.name)
+        register_stats("cancellation", self.cancellation.stats)
 
     async def execute(self, context: RequestContext, event_queue: EventQueue) -> None:
-        try:
-            # 세션 보장
-            await self.session_service.create_session(
-                app_name=self.app_name, user_id=self.user_id, session_id=self.session_id
-            )
+        updater = None
+        # LLM 호출 제한의 공정 큐 단위 (한 프로세스에 여러 에이전트가 있어도 구분)
+        current_agent.set(self.agent.name)
+        with self.cancellation.track(context.task_id), track_task(self.agent.name):
+            try:
+                # 구조화된 툴 호출(DataPart)이면 LLM 루프 없이 바로 실행
+                tool_call = parse_tool_call(context.message.parts if context.message else [])
+                if tool_call is not None:
+                    await event_queue.enqueue_event(await self._run_direct(*tool_call))
+                    return
 
-            # 사용자 입력 추출
-            user_input = ""
-            if context.message and context.message.parts:
-                user_input = " ".join(
-                    getattr(p.root, "text", "")
-                    for p in context.message.parts
-                    if hasattr(p.root, "text")
-                )
+                # 사용자 입력 추출
+                user_input = ""
+                if context.message and context.message.parts:
+                    user_input = " ".join(
+                        getattr(p.root, "text", "")
+                        for p in context.message.parts
+                        if hasattr(p.root, "text")
+                    )
 
-            user_message = types.Content(role="user", parts=[types.Part(text=user_input)])
+                # Task 생성 후 진행 상황(LLM 부분 응답, 툴 호출)을 스트리밍
+                updater = await self._start_task(context, event_queue)
+                streamer = ResponseStreamer(updater)
 
-            final_response = None
+                user_message = types.Content(role="user", parts=[types.Part(text=user_input)])
 
-            # Runner 실행 → 이벤트 스트림 수집
-            async for event in self.runner.run_async(
-                user_id=self.user_id,
-                session_id=self.session_id,
-                new_message=user_message,
-            ):
-                if event.content and event.content.parts:
-                    for part in event.content.parts:
-                        if getattr(part, "text", None):
-                            final_response = part.text
+                # A2A 대화(context_id) 단위 세션에서 Runner 실행 → 이벤트를 A2A 상태/아티팩트 이벤트로 중계
+                async with self.sessions.session(self.user_id, context.context_id or uuid4().hex) as lease:
+                    final_response = await streamer.relay(
+                        self.runner.run_async(
+                            user_id=self.user_id,
+                            session_id=lease.session_id,
+                            new_message=user_message,
+                            run_config=run_config(),
+                        )
+                    )
+                    lease.record(streamer.events)
+                await streamer.finish(final_response or "응답 없음")
 
-            if not final_response:
-                final_response = "응답 없음"
+            except asyncio.CancelledError:
+                # tasks/cancel → 진행 중인 LLM 호출/툴 실행이 여기서 중단됨.
+                # 워커 종료나 요청 핸들러 자체의 취소는 그대로 전파
+                origin = self.cancellation.requested(context.task_id)
+                if origin is None:
+                    raise
+                # tasks/cancel이면 소비해서 이벤트 큐가 정상 종료되도록 함.
+                # canceled 상태는 cancel()이 보내고, 다른 워커에서 전달된 취소만 이 요청의 큐에 여기서 보냄
+                logger.info(f"태스크 취소됨: {context.task_id} ({origin})")
+                if origin == "remote" and updater is not None:
+                    await updater.cancel()
+            except Exception as e:
+                logger.exception("ADKAgentExecutor.execute 오류")
+                if updater is not None:
+                    await updater.failed(message=updater.new_agent_message([text_part(f"[Error] {str(e)}")]))
+                    return
+                error_msg = Message(
+                    role=Role.agent,
+                    parts=[Part(root=TextPart(text=f"[Error] {str(e)}"))],
+                    messageId=uuid4().hex,
+                )
+                await event_queue.enqueue_event(error_msg)
 
-            # 결과 Message 반환 (messageId 필수)
-            msg = Message(
-                role=Role.agent,
-                parts=[Part(root=TextPart(text=final_response))],
-                messageId=uuid4().hex,
-            )
-            await event_queue.enqueue_event(msg)
+    async def _start_task(self, context: RequestContext, event_queue: EventQueue) -> TaskUpdater:
+        task = context.current_task
+        if task is None:
+            task = new_task(context.message)
+            await event_queue.enqueue_event(task)
+        updater = TaskUpdater(event_queue, task.id, task.context_id)
+        await updater.start_work()
+        return updater
 
+    async def _run_direct(self, name: str, args: dict) -> Message:
+        try:
+            data = {"tool": name, "result": await run_tool_call(self.tools, name, args)}
+        except ToolCallError as e:
+            data = {"tool": name, "error": str(e)}
         except Exception as e:
-            logger.exception("ADKAgentExecutor.execute 오류")
-            error_msg = Message(
-                role=Role.agent,
-                parts=[Part(root=TextPart(text=f"[Error] {str(e)}"))],
-                messageId=uuid4().hex,
-            )
-            await event_queue.enqueue_event(error_msg)
+            logger.exception(f"직접 툴 호출 오류: {name}")
+            data = {"tool": name, "error": str(e)}
+        return Message(
+            role=Role.agent,
+            parts=[Part(root=DataPart(data=data))],
+            messageId=uuid4().hex,
+        )
 
     async def cancel(self, context: RequestContext, event_queue: EventQueue) -> None:
-        return
+        # 종료 상태(canceled)는 여기서 한 번만 보냄 (execute는 취소를 소비만 함)
+        updater = TaskUpdater(event_queue, context.task_id, context.context_id)
+        await updater.cancel()
+        # 같은 워커에서 실행 중이면 바로 중단, 아니면 다른 워커로 전달 (TASK_STORE_BACKEND=redis)
+        await self.cancellation.cancel(context.task_id)
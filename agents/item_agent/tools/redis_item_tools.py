@@ -1,10 +1,12 @@
 # /home/agents/tools/redis_item_tools.py
-import redis
 import os
-from typing import Optional
+from typing import Any, Dict, List, Optional
 
-# Redis 연결
-redis_client = redis.Redis(
+from utils.metrics import InstrumentedRedis
+from utils.redis_query import run_query
+
+# Redis 연결 (명령 수를 툴별로 /metrics에 집계)
+redis_client = InstrumentedRedis(
     host=os.getenv("REDIS_HOST", "localhost"),
     port=int(os.getenv("REDIS_PORT", "6379")),
     db=0,
@@ -69,3 +71,24 @@ def get_all_warehouse_inventories_for_item(item_id: str) -> dict:
         return {"status": "error", "message": f"No item found for {item_id}"}
     return {"status": "success", "item_id": item_id, "data": data}
 
+
+def query_items(
+    filters: Optional[List[Dict[str, Any]]] = None,
+    sort_by: Optional[str] = None,
+    descending: bool = False,
+    limit: int = 50,
+    fields: Optional[List[str]] = None,
+) -> dict:
+    """
+    아이템 구조화 조회 (조건/정렬/개수 제한/필드 선택을 한 번에 처리)
+    - filters: [{"field": 필드명, "op": 연산자, "value": 값}, ...] 모두 AND 결합
+      * 연산자: ==, !=, >, >=, <, <=, in(value는 리스트), contains
+      * 필드: id, name, quantity, warehouse_id(WH1~WH5), vehicle_id
+    - sort_by: 정렬 필드 (예: "quantity"), descending: 내림차순 여부
+    - limit: 최대 반환 건수 (기본 50, 최대 500)
+    - fields: 반환할 필드 목록 (생략하면 전체)
+    예) WH2 창고에서 수량 100 미만인 아이템:
+        filters=[{"field": "warehouse_id", "op": "==", "value": "WH2"},
+                 {"field": "quantity", "op": "<", "value": 100}]
+    """
+    return run_query(redis_client, "item", filters, sort_by, descending, limit, fields)
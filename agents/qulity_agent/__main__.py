@@ -1,57 +1,14 @@
-import click
-import uvicorn
+from dotenv import load_dotenv
 
-from a2a.types import (
-    AgentCapabilities,
-    AgentCard,
-    AgentSkill,
-)
-from a2a.server.apps import A2AStarletteApplication
-from a2a.server.request_handlers import DefaultRequestHandler
-from a2a.server.tasks import InMemoryTaskStore
-from agent import root_agent as quality_agent
-from agent_executor import ADKAgentExecutor
+from utils.serving import serve
 
+# AGENT_WORKERS 등 서버 설정도 .env 에서 읽음
+load_dotenv()
 
-def main(inhost, inport):
-    # Agent card (metadata)
-    agent_card = AgentCard(
-        name='Quality Agent',
-        description=quality_agent.description,
-        url=f'http://{inhost}:{inport}',
-        version="1.0.0",
-        defaultInputModes=["text", "text/plain"],
-        defaultOutputModes=["text", "text/plain"],
-        capabilities=AgentCapabilities(streaming=True),
-        skills=[
-            AgentSkill(
-                id="quality_agent",
-                name="manage quality control",
-                description="Handle quality inspections, return item processing, and recall management",
-                tags=["quality", "inspection", "recall", "returns"],
-                examples=[
-                    "Get items for return quality control",
-                    "Check return item disposition",
-                    "Get recall items list",
-                    "Process quality inspection results"
-                ],
-            )
-        ],
-    )
-
-    request_handler = DefaultRequestHandler(
-        agent_executor=ADKAgentExecutor(
-            agent=quality_agent,
-        ),
-        task_store=InMemoryTaskStore(),
-    )
 
-    server = A2AStarletteApplication(
-        agent_card=agent_card,
-        http_handler=request_handler,
-    )
-
-    uvicorn.run(server.build(), host=inhost, port=inport)
+def main(inhost, inport):
+    # 앱은 워커마다 app.create_app() 으로 생성 (AGENT_WORKERS 참고)
+    serve("app:create_app", inhost, inport)
 
 
 if __name__ == "__main__":
@@ -8,9 +8,9 @@ from dotenv import load_dotenv
 from google.adk.agents import LlmAgent
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
-from google.adk.models.lite_llm import LiteLlm
 from google.genai import types
-from utils.model_config import get_model_with_fallback
+from utils.model_config import get_tiered_model
+from utils.tool_shaping import fetch_tool_result
 from google.adk.tools import FunctionTool
 
 # 현재 폴더의 .env 파일 로드
@@ -21,19 +21,21 @@ from tools.redis_quality_tools import (
     get_items_for_return_qc,
     get_return_item_disposition,
     get_recall_items_list,
+    query_quality_checks,
 )
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)   
 
 # --- 1. Agent 정의 ---
-# Gemini 우선, 실패시 로컬 LLM 사용
+# Gemini 우선, 실패시 로컬 LLM 사용 (MODEL_TIER_* 설정 시 툴 선택/최종 답변에 다른 모델)
 try:
-    model = get_model_with_fallback()
+    model = get_tiered_model("quality")
     logger.info(f"QualityAgent 모델 설정 완료: {type(model).__name__ if hasattr(model, '__class__') else model}")
 except Exception as e:
     logger.error(f"QualityAgent 모델 설정 실패: {e}")
-    # 최후의 fallback
+    # 최후의 fallback (litellm 스택은 이 경우에만 로드)
+    from google.adk.models.lite_llm import LiteLlm
     ollama_host = os.getenv("OLLAMA_HOST", "localhost")
     model = LiteLlm(
         model="ollama_chat/gpt-oss:20b",
@@ -51,12 +53,15 @@ root_agent = LlmAgent(
     instruction="""너는 품질 관리 에이전트다.\
     - '품질 검사가 필요한 반품 상품'을 요청하면 get_items_for_return_qc 툴을 호출해야 한다.\
     - '반품 상품의 최종 처분'을 조회하려면 get_return_item_disposition 툴을 호출해야 한다.\
-    - '특정 제품 ID의 리콜 대상 상품 리스트'를 요청하면 get_recall_items_list 툴을 호출해야 한다.
+    - '특정 제품 ID의 리콜 대상 상품 리스트'를 요청하면 get_recall_items_list 툴을 호출해야 한다.\
+    - 검사 결과·결함 수·기간 등 조건으로 품질 검사를 찾을 때는 query_quality_checks 툴을 한 번 호출해서 처리하라.
     """,
     tools=[
         FunctionTool(get_items_for_return_qc),
         FunctionTool(get_return_item_disposition),
         FunctionTool(get_recall_items_list),
+        FunctionTool(query_quality_checks),
+        FunctionTool(fetch_tool_result),
     ],
 )
 
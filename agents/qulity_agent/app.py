@@ -0,0 +1,92 @@
+import asyncio
+
+from utils.runtime_stats import register_stats, stats_endpoint
+from utils.serving import bind_address, warmup_lifespan
+from utils.startup import Readiness, StartupProfile
+
+
+def create_app():
+    """uvicorn 워커마다 호출되는 앱 팩토리 (무거운 import/모델 생성을 단계별로 측정)"""
+    profile = StartupProfile("quality_agent")
+    with profile.phase("imports"):
+        from a2a.types import (
+            AgentCapabilities,
+            AgentCard,
+            AgentSkill,
+        )
+        from a2a.server.apps import A2AStarletteApplication
+        from a2a.server.request_handlers import DefaultRequestHandler
+        from agent_executor import ADKAgentExecutor
+        from tools.redis_quality_tools import redis_client
+        from utils.admission import add_admission_control
+        from utils.inprocess import register_local_agent
+        from utils.metrics import add_metrics
+        from utils.model_config import preload_model_clients, warm_model
+        from utils.redis_stores import make_task_store, warm_state_client
+    with profile.phase("agent"):
+        # 툴 모듈 + 모델 구성 + LlmAgent 생성
+        from agent import root_agent as quality_agent
+    with profile.phase("llm_clients"):
+        # litellm import/genai 클라이언트 생성을 첫 요청 대신 기동 시에 (리스닝 전)
+        preload_model_clients(quality_agent.model)
+
+    host, port = bind_address("0.0.0.0", 10003)
+    agent_card = AgentCard(
+        name='Quality Agent',
+        description=quality_agent.description,
+        url=f'http://{host}:{port}',
+        version="1.0.0",
+        defaultInputModes=["text", "text/plain", "application/json"],  # application/json: DataPart 직접 툴 호출
+        defaultOutputModes=["text", "text/plain", "application/json"],
+        capabilities=AgentCapabilities(streaming=True),
+        skills=[
+            AgentSkill(
+                id="quality_agent",
+                name="manage quality control",
+                description="Handle quality inspections, return item processing, and recall management",
+                tags=["quality", "inspection", "recall", "returns"],
+                examples=[
+                    "Get items for return quality control",
+                    "Check return item disposition",
+                    "Get recall items list",
+                    "Process quality inspection results"
+                ],
+            )
+        ],
+    )
+
+    request_handler = DefaultRequestHandler(
+        agent_executor=ADKAgentExecutor(
+            agent=quality_agent,
+        ),
+        task_store=make_task_store("quality_agent"),  # TASK_STORE_BACKEND=redis 면 워커 간 공유
+    )
+
+    server = A2AStarletteApplication(
+        agent_card=agent_card,
+        http_handler=request_handler,
+    )
+
+    async def warm_redis():
+        # 워커마다 Redis 연결을 미리 열어 첫 요청 지연을 없앰
+        await asyncio.to_thread(redis_client.ping)
+
+    async def warm_llm():
+        # LLM 백엔드 헬스 체크 (라우터 순서에도 반영)
+        await warm_model(quality_agent.model)
+
+    # warm-up은 백그라운드로 돌고, 끝나서 필수 점검이 통과하면 /readyz 가 200
+    readiness = Readiness(required=[warm_redis, warm_state_client, warm_llm], profile=profile)
+    app = server.build(lifespan=warmup_lifespan(startup=[readiness.start], shutdown=[readiness.stop]))
+    # liveness(/healthz) / readiness(/readyz) 분리
+    readiness.add_routes(app)
+    register_stats("startup", readiness.stats)
+    # 세션 메모리 등 런타임 통계
+    app.add_route("/stats", stats_endpoint, methods=["GET"])
+    # 동시 실행 제한 + 대기열, 넘치면 429 (X-Priority: interactive | batch)
+    admission = add_admission_control(app, quality_agent.name)
+    # Prometheus 지표 (GET /metrics), admission 바깥에서 대기 시간/429까지 측정
+    add_metrics(app, quality_agent.name)
+    # host_all.py 로 한 프로세스에 띄우면 오케스트레이터가 HTTP 없이 바로 호출
+    register_local_agent(agent_card, request_handler, admission)
+    return app
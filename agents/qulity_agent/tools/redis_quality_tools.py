@@ -1,9 +1,14 @@
 # /home/agents/tools/redis_quality_tools.py
-import redis
 import os
+from typing import Any, Dict, List, Optional
 
-# Redis 연결
-redis_client = redis.Redis(
+from utils.change_events import emit_change
+from utils.metrics import InstrumentedRedis
+from utils.redis_query import run_query, update_indexes
+from utils.redis_scan import SCAN_COUNT, field_equals, scan_hashes, scan_items
+
+# Redis 연결 (명령 수를 툴별로 /metrics에 집계)
+redis_client = InstrumentedRedis(
     host=os.getenv("REDIS_HOST", "localhost"),
     port=int(os.getenv("REDIS_PORT", "6379")),
     db=0,
@@ -20,49 +25,51 @@ def get_quality_data(quality_id: str) -> dict:
 
 def get_all_quality_checks() -> dict:
     """모든 품질 검사 결과 조회"""
-    results = []
-    for key in redis_client.scan_iter("quality:*"):
-        data = redis_client.hgetall(key)
-        if data:
-            results.append(data)
+    results = list(scan_hashes(redis_client, "quality:*"))
     return {"status": "success", "count": len(results), "data": results}
 
 def get_failed_quality_checks() -> dict:
     """불합격(inspection=failed) 품질 검사 건수 및 목록"""
-    results = []
-    for key in redis_client.scan_iter("quality:*"):
-        data = redis_client.hgetall(key)
-        if data.get("inspection") == "failed":
-            results.append(data)
+    results = list(scan_hashes(redis_client, "quality:*", field_equals("inspection", "failed")))
     return {"status": "success", "failed_count": len(results), "data": results}
 
 def update_quality_result(quality_id: str, inspection: str, defects: int) -> dict:
     """품질 검사 결과 업데이트"""
     key = f"quality:{quality_id}"
-    if not redis_client.exists(key):
+    old_inspection = redis_client.hget(key, "inspection")
+    if old_inspection is None and not redis_client.exists(key):
         return {"status": "error", "message": f"Quality {quality_id} does not exist."}
-    redis_client.hset(key, mapping={
+    changed = {
         "inspection": inspection,
         "defects": defects
-    })
+    }
+    pipe = redis_client.pipeline()
+    pipe.hset(key, mapping=changed)
+    emit_change(pipe, "quality", quality_id, changed)
+    pipe.execute()
+    update_indexes(redis_client, "quality", quality_id, {"inspection": old_inspection}, {"inspection": inspection})
     return {"status": "success", "quality_id": quality_id, "inspection": inspection, "defects": defects}
 
 def record_defect_details(quality_id: str, defect_code: str, metric_value: str) -> dict:
     """품질 검사 항목에 결함 코드 및 측정값 기록"""
     key = f"quality:defects:{quality_id}"
-    redis_client.hset(key, mapping={
+    changed = {
         "defect_code": defect_code,
         "metric_value": metric_value
-    })
+    }
+    pipe = redis_client.pipeline()
+    pipe.hset(key, mapping=changed)
+    emit_change(pipe, "quality", quality_id, changed, key=key)
+    pipe.execute()
     return {"status": "success", "quality_id": quality_id, "defect_code": defect_code, "metric_value": metric_value}
 
 def get_items_for_return_qc() -> dict:
     """품질 검사가 필요한 반품 상품 ID 리스트 조회"""
     items = []
-    for key in redis_client.scan_iter("quality:*"):
-        data = redis_client.hgetall(key)
-        if data.get("qc_result") == "pending":
-            items.append(data.get("id", key.split(":")[-1]))
+    for key, data in scan_items(
+        redis_client, "quality:*", field_equals("qc_result", "pending"), fields=("id", "qc_result")
+    ):
+        items.append(data.get("id", key.split(":")[-1]))
     return {"status": "success", "count": len(items), "items": items}
 
 def get_return_item_disposition(item_id: str) -> dict:
@@ -76,7 +83,28 @@ def get_return_item_disposition(item_id: str) -> dict:
 def get_recall_items_list(product_id: str) -> dict:
     """특정 product_id에 대한 리콜 대상 아이템 리스트 조회"""
     items = []
-    for key in redis_client.scan_iter(f"quality:recall:{product_id}:*"):
+    for key in redis_client.scan_iter(f"quality:recall:{product_id}:*", count=SCAN_COUNT):
         item_id = key.split(":")[-1]
         items.append(item_id)
-    return {"status": "success", "product_id": product_id, "recall_items": items}
\ No newline at end of file
+    return {"status": "success", "product_id": product_id, "recall_items": items}
+
+def query_quality_checks(
+    filters: Optional[List[Dict[str, Any]]] = None,
+    sort_by: Optional[str] = None,
+    descending: bool = False,
+    limit: int = 50,
+    fields: Optional[List[str]] = None,
+) -> dict:
+    """
+    품질 검사 구조화 조회 (조건/정렬/개수 제한/필드 선택을 한 번에 처리)
+    - filters: [{"field": 필드명, "op": 연산자, "value": 값}, ...] 모두 AND 결합
+      * 연산자: ==, !=, >, >=, <, <=, in(value는 리스트), contains
+      * 필드: id, inspection(passed/failed), qc_result(pending/done), defects, timestamp(ISO 8601)
+    - sort_by: 정렬 필드 (예: "defects"), descending: 내림차순 여부
+    - limit: 최대 반환 건수 (기본 50, 최대 500)
+    - fields: 반환할 필드 목록 (생략하면 전체)
+    예) 결함 3개 이상인 불합격 검사 결과:
+        filters=[{"field": "inspection", "op": "==", "value": "failed"},
+                 {"field": "defects", "op": ">=", "value": 3}]
+    """
+    return run_query(redis_client, "quality", filters, sort_by, descending, limit, fields)
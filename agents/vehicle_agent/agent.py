@@ -8,9 +8,9 @@ from dotenv import load_dotenv
 from google.adk.agents import LlmAgent
 from google.adk.runners import Runner
 from google.adk.sessions import InMemorySessionService
-from google.adk.models.lite_llm import LiteLlm
 from google.genai import types
-from utils.model_config import get_model_with_fallback
+from utils.model_config import get_tiered_model
+from utils.tool_shaping import fetch_tool_result
 from google.adk.tools import FunctionTool
 
 # 현재 폴더의 .env 파일 로드
@@ -25,19 +25,21 @@ from tools.redis_vehicle_tools import (
     get_assigned_recall_vehicles,
     get_vehicle_capacity,
     recommend_optimal_vehicles,
+    query_vehicles,
 )
 
 logger = logging.getLogger(__name__)
 logger.setLevel(logging.DEBUG)
 
 # --- 1. Agent 정의 ---
-# Gemini 우선, 실패시 로컬 LLM 사용
+# Gemini 우선, 실패시 로컬 LLM 사용 (MODEL_TIER_* 설정 시 툴 선택/최종 답변에 다른 모델)
 try:
-    model = get_model_with_fallback()
+    model = get_tiered_model("vehicle")
     logger.info(f"VehicleAgent 모델 설정 완료: {type(model).__name__ if hasattr(model, '__class__') else model}")
 except Exception as e:
     logger.error(f"VehicleAgent 모델 설정 실패: {e}")
-    # 최후의 fallback
+    # 최후의 fallback (litellm 스택은 이 경우에만 로드)
+    from google.adk.models.lite_llm import LiteLlm
     ollama_host = os.getenv("OLLAMA_HOST", "localhost")
     model = LiteLlm(
         model="ollama_chat/gpt-oss:20b",
@@ -59,7 +61,8 @@ root_agent = LlmAgent(
     - '현재 정비 중인 차량'을 요청하면 get_vehicles_on_maintenance 툴을 호출해야 한다.\
     - '리콜에 배정된 차량 리스트'를 요청하면 get_assigned_recall_vehicles 툴을 호출해야 한다.\
     - '차량 적재 용량'을 조회하려면 get_vehicle_capacity 툴을 호출해야 한다.\
-    - '최적 차량 추천'을 요청하면 recommend_optimal_vehicles 툴을 호출해야 한다.
+    - '최적 차량 추천'을 요청하면 recommend_optimal_vehicles 툴을 호출해야 한다.\
+    - 위 툴로 바로 답할 수 없는 조건 조회(상태·용량·기사 등 복합 조건, 정렬, 상위 N개)는 query_vehicles 툴을 한 번 호출해서 처리하라.
     """,
     tools=[
         FunctionTool(get_fleet_availability),
@@ -69,6 +72,8 @@ root_agent = LlmAgent(
         FunctionTool(get_assigned_recall_vehicles),
         FunctionTool(get_vehicle_capacity),
         FunctionTool(recommend_optimal_vehicles),
+        FunctionTool(query_vehicles),
+        FunctionTool(fetch_tool_result),
     ],
 
 )
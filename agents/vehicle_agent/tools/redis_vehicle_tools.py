@@ -1,8 +1,13 @@
-import redis
 import os
+from typing import Any, Dict, List, Optional
 
-# Redis 연결
-redis_client = redis.Redis(
+from utils.change_events import emit_change
+from utils.metrics import InstrumentedRedis
+from utils.redis_query import run_query, update_indexes
+from utils.redis_scan import field_equals, scan_hashes, scan_items
+
+# Redis 연결 (명령 수를 툴별로 /metrics에 집계)
+redis_client = InstrumentedRedis(
     host=os.getenv("REDIS_HOST", "localhost"),
     port=int(os.getenv("REDIS_PORT", "6379")),
     db=0,
@@ -31,21 +36,17 @@ def filter_available_vehicles() -> dict:
 
 def get_vehicles_on_maintenance() -> dict:
     """현재 정비 중인 차량 리스트 조회"""
-    vehicles = []
-    for key in redis_client.scan_iter("vehicle:*"):
-        data = redis_client.hgetall(key)
-        if data.get("status") == "maintenance":
-            vehicles.append(data)
+    vehicles = list(scan_hashes(redis_client, "vehicle:*", field_equals("status", "maintenance")))
     return {"status": "success", "count": len(vehicles), "vehicles": vehicles}
 
 
 def get_assigned_recall_vehicles(recall_id: str) -> dict:
     """특정 recall_id에 배정된 차량 리스트 조회"""
-    vehicles = []
-    for key in redis_client.scan_iter("vehicle:*"):
-        data = redis_client.hgetall(key)
-        if data.get("status") == "assigned_for_recall" and data.get("recall_id") == recall_id:
-            vehicles.append(data)
+    vehicles = list(scan_hashes(
+        redis_client,
+        "vehicle:*",
+        lambda data: data.get("status") == "assigned_for_recall" and data.get("recall_id") == recall_id,
+    ))
     return {"status": "success", "recall_id": recall_id, "vehicles": vehicles}
 
 
@@ -61,22 +62,23 @@ def get_vehicle_capacity(vehicle_id: str) -> dict:
 def recommend_optimal_vehicles(origin: str, destination: str, required_capacity: int) -> dict:
     """출발지/목적지/필요 용량 기반 차량 추천 (간단 버전)"""
     candidates = []
-    for key in redis_client.scan_iter("vehicle:*"):
-        data = redis_client.hgetall(key)
-        if data.get("status") == "available":
-            try:
-                capacity = int(data.get("capacity", 0))
-            except ValueError:
-                continue
-            if capacity >= required_capacity:
-                vehicle_id = key.split(":")[-1]
-                # 간단한 distance 계산 (placeholder)
-                distance = abs(hash(origin) - hash(destination)) % 1000
-                candidates.append({
-                    "vehicle_id": vehicle_id,
-                    "capacity": capacity,
-                    "distance_to_destination": distance
-                })
+    # 필요한 필드(status, capacity)만 HMGET으로 읽음
+    for key, data in scan_items(
+        redis_client, "vehicle:*", field_equals("status", "available"), fields=("status", "capacity")
+    ):
+        try:
+            capacity = int(data.get("capacity", 0))
+        except ValueError:
+            continue
+        if capacity >= required_capacity:
+            vehicle_id = key.split(":")[-1]
+            # 간단한 distance 계산 (placeholder)
+            distance = abs(hash(origin) - hash(destination)) % 1000
+            candidates.append({
+                "vehicle_id": vehicle_id,
+                "capacity": capacity,
+                "distance_to_destination": distance
+            })
     candidates.sort(key=lambda x: x["distance_to_destination"])
     return {
         "status": "success",
@@ -86,59 +88,85 @@ def recommend_optimal_vehicles(origin: str, destination: str, required_capacity:
         "recommended_vehicles": candidates
     }
 
+def query_vehicles(
+    filters: Optional[List[Dict[str, Any]]] = None,
+    sort_by: Optional[str] = None,
+    descending: bool = False,
+    limit: int = 50,
+    fields: Optional[List[str]] = None,
+) -> dict:
+    """
+    차량 구조화 조회 (조건/정렬/개수 제한/필드 선택을 한 번에 처리)
+    - filters: [{"field": 필드명, "op": 연산자, "value": 값}, ...] 모두 AND 결합
+      * 연산자: ==, !=, >, >=, <, <=, in(value는 리스트), contains
+      * 필드: id, vehicle_no, status(available/on_delivery/maintenance/out_of_service),
+        driver, capacity, delivery_id, recall_id
+    - sort_by: 정렬 필드 (예: "capacity"), descending: 내림차순 여부
+    - limit: 최대 반환 건수 (기본 50, 최대 500)
+    - fields: 반환할 필드 목록 (생략하면 전체)
+    예) 기사 김철수의 가용 차량 중 용량 500 이상:
+        filters=[{"field": "status", "op": "==", "value": "available"},
+                 {"field": "capacity", "op": ">=", "value": 500},
+                 {"field": "driver", "op": "==", "value": "김철수"}]
+    """
+    return run_query(redis_client, "vehicle", filters, sort_by, descending, limit, fields)
+
 # === 기존 함수들 유지 ===
 
 def get_all_vehicles() -> dict:
     """Redis에 저장된 모든 차량 조회"""
-    vehicles = []
-    for key in redis_client.scan_iter("vehicle:*"):
-        data = redis_client.hgetall(key)
-        if data:
-            vehicles.append(data)
+    vehicles = list(scan_hashes(redis_client, "vehicle:*"))
     return {"status": "success", "count": len(vehicles), "data": vehicles}
 
 def get_vehicles_by_delivery(delivery_id: str) -> dict:
     """특정 배송에 할당된 차량 조회"""
-    vehicles = []
-    for key in redis_client.scan_iter("vehicle:*"):
-        data = redis_client.hgetall(key)
-        if data.get("delivery_id") == delivery_id:
-            vehicles.append(data)
+    vehicles = list(scan_hashes(redis_client, "vehicle:*", field_equals("delivery_id", delivery_id)))
     return {"status": "success", "delivery_id": delivery_id, "vehicles": vehicles}
 
 def update_vehicle_status(vehicle_id: str, new_status: str) -> dict:
     """차량 상태 업데이트"""
     key = f"vehicle:{vehicle_id}"
-    if not redis_client.exists(key):
+    old_status = redis_client.hget(key, "status")
+    if old_status is None and not redis_client.exists(key):
         return {"status": "error", "message": f"Vehicle {vehicle_id} does not exist."}
-    redis_client.hset(key, "status", new_status)
+    pipe = redis_client.pipeline()
+    pipe.hset(key, "status", new_status)
+    emit_change(pipe, "vehicle", vehicle_id, {"status": new_status})
+    pipe.execute()
+    update_indexes(redis_client, "vehicle", vehicle_id, {"status": old_status}, {"status": new_status})
     return {"status": "success", "vehicle_id": vehicle_id, "new_status": new_status}
 
 def assign_vehicle_to_delivery(vehicle_id: str, delivery_id: str) -> dict:
     """차량을 특정 배송에 배정"""
     key = f"vehicle:{vehicle_id}"
-    if not redis_client.exists(key):
+    old_status = redis_client.hget(key, "status")
+    if old_status is None and not redis_client.exists(key):
         return {"status": "error", "message": f"Vehicle {vehicle_id} does not exist."}
-    redis_client.hset(key, "delivery_id", delivery_id)
-    redis_client.hset(key, "status", "on_delivery")
+    changed = {"delivery_id": delivery_id, "status": "on_delivery"}
+    pipe = redis_client.pipeline()
+    pipe.hset(key, mapping=changed)
+    emit_change(pipe, "vehicle", vehicle_id, changed)
+    pipe.execute()
+    update_indexes(redis_client, "vehicle", vehicle_id, {"status": old_status}, {"status": "on_delivery"})
     return {"status": "success", "vehicle_id": vehicle_id, "assigned_delivery_id": delivery_id}
 
 def release_vehicle(vehicle_id: str) -> dict:
     """배송 종료 후 차량 배정 해제"""
     key = f"vehicle:{vehicle_id}"
-    if not redis_client.exists(key):
+    old_status = redis_client.hget(key, "status")
+    if old_status is None and not redis_client.exists(key):
         return {"status": "error", "message": f"Vehicle {vehicle_id} does not exist."}
-    redis_client.hdel(key, "delivery_id")
-    redis_client.hset(key, "status", "available")
+    pipe = redis_client.pipeline()
+    pipe.hdel(key, "delivery_id")
+    pipe.hset(key, "status", "available")
+    emit_change(pipe, "vehicle", vehicle_id, {"delivery_id": None, "status": "available"})
+    pipe.execute()
+    update_indexes(redis_client, "vehicle", vehicle_id, {"status": old_status}, {"status": "available"})
     return {"status": "success", "vehicle_id": vehicle_id, "new_status": "available"}
 
 def get_available_vehicles() -> dict:
     """가용 상태 차량 조회"""
-    available = []
-    for key in redis_client.scan_iter("vehicle:*"):
-        data = redis_client.hgetall(key)
-        if data.get("status") == "available":
-            available.append(data)
+    available = list(scan_hashes(redis_client, "vehicle:*", field_equals("status", "available")))
     return {"status": "success", "count": len(available), "vehicles": available}
 
 def get_fleet_availability() -> dict:
@@ -149,8 +177,7 @@ def get_fleet_availability() -> dict:
         "maintenance": 0,
         "out_of_service": 0
     }
-    for key in redis_client.scan_iter("vehicle:*"):
-        data = redis_client.hgetall(key)
+    for data in scan_hashes(redis_client, "vehicle:*", fields=("status",)):
         status = data.get("status")
         if status in status_summary:
             status_summary[status] += 1
@@ -0,0 +1,88 @@
+"""
+에이전트 호출 1회(hop) 지연 비교: localhost HTTP vs in-process 전송 계층
+
+- host_all.py와 같은 방식으로 에이전트 하나를 이 프로세스에 올리고 같은 포트로 HTTP 서버도 띄운 뒤,
+  같은 DataPart 직접 툴 호출(LLM 생략)을 두 경로로 보내 p50/p95 지연을 비교한다
+- 툴이 Redis를 읽으므로 agentDB 데이터가 적재된 Redis가 필요하다
+
+사용법 (프로젝트 루트에서):
+    python benchmarks/hop_latency.py --agent vehicle --tool get_vehicle_status --args '{"vehicle_id": "V001"}'
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+import httpx
+import uvicorn
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+from host_all import AGENTS, load_agent  # noqa: E402
+from a2a.client import ClientConfig, ClientFactory  # noqa: E402
+from a2a.types import DataPart, Message, Part, Role  # noqa: E402
+from utils.inprocess import local_agent, local_cards, make_local_client  # noqa: E402
+
+
+def percentile(values: List[float], q: float) -> float:
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))] if ordered else 0.0
+
+
+async def measure(client: Any, tool: str, args: Dict[str, Any], count: int) -> Dict[str, float]:
+    latencies = []
+    for _ in range(count):
+        message = Message(
+            role=Role.user,
+            parts=[Part(root=DataPart(data={"tool": tool, "args": args}))],
+            messageId=uuid4().hex,
+        )
+        started = time.perf_counter()
+        async for _event in client.send_message(message):
+            pass
+        latencies.append((time.perf_counter() - started) * 1000)
+    return {"p50_ms": round(percentile(latencies, 0.5), 2), "p95_ms": round(percentile(latencies, 0.95), 2)}
+
+
+async def run(args: argparse.Namespace) -> None:
+    directory, _, port = AGENTS[args.agent]
+    app = load_agent(args.agent, directory, "127.0.0.1", args.port or port)
+    local = local_agent(next(iter(local_cards())))
+    tool_args = json.loads(args.args)
+
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=args.port or port, log_level="warning"))
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    async with httpx.AsyncClient(timeout=60.0) as http:
+        http_client = ClientFactory(ClientConfig(httpx_client=http, streaming=False)).create(local.card)
+        in_process = make_local_client(local, streaming=False)
+        for client in (http_client, in_process):  # warm-up
+            await measure(client, args.tool, tool_args, 5)
+        results = {
+            "http": await measure(http_client, args.tool, tool_args, args.requests),
+            "in_process": await measure(in_process, args.tool, tool_args, args.requests),
+        }
+    server.should_exit = True
+    await serving
+    print(json.dumps(results, ensure_ascii=False, indent=2))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="HTTP vs in-process 에이전트 호출 지연 비교")
+    parser.add_argument("--agent", default="vehicle", choices=[n for n in AGENTS if n != "orchestrator"])
+    parser.add_argument("--port", type=int, default=0, help="HTTP 측정용 포트 (기본: 에이전트 기본 포트)")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--tool", default="get_vehicle_status")
+    parser.add_argument("--args", default='{"vehicle_id": "V001"}', help="툴 인자 (JSON)")
+    asyncio.run(run(parser.parse_args(argv)))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
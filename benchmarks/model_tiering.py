@@ -0,0 +1,137 @@
+"""
+모델 티어 벤치마크: 단일 모델 vs 역할별 모델(작은 모델로 툴 선택, 큰 모델로 최종 답변)
+
+- 같은 에이전트를 두 설정으로 차례로 띄우고, 같은 자연어 질문들을 message/send로 보내 end-to-end 지연을 잰다
+  · single: MODEL_TIER_* 없이 기본 모델 하나로 모든 LLM 호출
+  · tiered: --planner/--synthesizer 로 지정한 모델 (planner 역할은 에이전트에 따라 router 또는 tool_caller)
+- 반복 질문이 캐시로 빠지지 않도록 LLM_CACHE_ENABLED=false 로 띄운다
+- 실제 LLM(Gemini 키 또는 Ollama)과 agentDB 데이터가 적재된 Redis가 필요하다
+
+사용법 (프로젝트 루트에서):
+    python benchmarks/model_tiering.py --agent agents/vehicle_agent --planner ollama_chat/qwen2.5:3b
+    python benchmarks/model_tiering.py --agent Orchestrator_new --planner gemini-2.0-flash-lite --queries queries.txt
+"""
+import argparse
+import asyncio
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from serving_throughput import percentile, start_server, stop_server, wait_ready  # noqa: E402
+
+DEFAULT_QUERIES = [
+    "V001 차량 상태 알려줘",
+    "지금 배차 가능한 차량 목록 보여줘",
+    "정비 중인 차량이 몇 대야?",
+    "V003 차량의 적재 용량과 현재 위치는?",
+]
+
+TIER_ROLES = ("ROUTER", "TOOL_CALLER", "SYNTHESIZER")
+
+
+def text_payload(text: str) -> Dict[str, Any]:
+    return {
+        "jsonrpc": "2.0",
+        "id": uuid4().hex,
+        "method": "message/send",
+        "params": {
+            "message": {
+                "role": "user",
+                "messageId": uuid4().hex,
+                "parts": [{"kind": "text", "text": text}],
+            }
+        },
+    }
+
+
+def is_failed(body: Dict[str, Any]) -> bool:
+    if "error" in body:
+        return True
+    status = (body.get("result") or {}).get("status") or {}
+    return status.get("state") in ("failed", "rejected", "canceled")
+
+
+async def run_queries(url: str, queries: List[str], rounds: int) -> Dict[str, Any]:
+    """질문을 순서대로 하나씩 보냄 (동시 요청 없이 순수 지연만 측정)"""
+    latencies: List[float] = []
+    errors = 0
+    async with httpx.AsyncClient(timeout=300.0) as client:
+        for _ in range(rounds):
+            for query in queries:
+                started = time.perf_counter()
+                try:
+                    response = await client.post(url, json=text_payload(query))
+                    if response.status_code != 200 or is_failed(response.json()):
+                        errors += 1
+                except httpx.HTTPError:
+                    errors += 1
+                latencies.append(time.perf_counter() - started)
+        stats = (await client.get(f"{url}/stats")).json()
+    return {
+        "requests": len(latencies),
+        "errors": errors,
+        "mean_ms": round(sum(latencies) / len(latencies) * 1000, 1) if latencies else 0.0,
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+        "model_tiers": stats.get("model_tiers"),
+    }
+
+
+def tier_env(planner: str, synthesizer: str) -> Dict[str, str]:
+    env = {"LLM_CACHE_ENABLED": "false"}
+    # 셸에 남아 있는 에이전트별 설정(MODEL_TIER_{AGENT}_{ROLE})이 섞이지 않도록 지움
+    for key in os.environ:
+        if key.startswith("MODEL_TIER_") and key != "MODEL_TIER_ESCALATE_TEXT":
+            env[key] = "default"
+    for role in TIER_ROLES:
+        env[f"MODEL_TIER_{role}"] = synthesizer if role == "SYNTHESIZER" else planner
+    return env
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="단일 모델 vs 역할별 모델 end-to-end 지연 비교")
+    parser.add_argument("--agent", default="agents/vehicle_agent", help="벤치마크할 에이전트 디렉토리")
+    parser.add_argument("--port", type=int, default=10104)
+    parser.add_argument("--planner", required=True, help="router/tool_caller 역할 모델 (예: ollama_chat/qwen2.5:3b)")
+    parser.add_argument("--synthesizer", default="default", help="최종 답변 모델 (기본: get_model_with_fallback)")
+    parser.add_argument("--queries", help="질문 파일 (한 줄에 하나, 기본: 차량 에이전트 예시 질문)")
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args(argv)
+
+    queries = DEFAULT_QUERIES
+    if args.queries:
+        with open(args.queries, encoding="utf-8") as f:
+            queries = [line.strip() for line in f if line.strip()]
+
+    url = f"http://127.0.0.1:{args.port}"
+    configs = {
+        "single": tier_env("default", "default"),
+        "tiered": tier_env(args.planner, args.synthesizer),
+    }
+    results = {}
+    for name, env in configs.items():
+        proc = start_server(args.agent, args.port, 1, env)
+        try:
+            wait_ready(url)
+            asyncio.run(run_queries(url, queries[:1], 1))  # 모델 연결 warm-up
+            results[name] = asyncio.run(run_queries(url, queries, args.rounds))
+        finally:
+            stop_server(proc)
+
+    print(f"{'config':>8} {'mean ms':>9} {'p50 ms':>9} {'p95 ms':>9} {'errors':>7}")
+    for name, r in results.items():
+        print(f"{name:>8} {r['mean_ms']:>9} {r['p50_ms']:>9} {r['p95_ms']:>9} {r['errors']:>7}")
+    base = results["single"]["mean_ms"] or 1.0
+    print(f"tiered / single (mean): {results['tiered']['mean_ms'] / base:.2f}x")
+    print(json.dumps(results["tiered"]["model_tiers"], ensure_ascii=False, indent=2))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
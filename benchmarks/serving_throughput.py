@@ -0,0 +1,174 @@
+"""
+에이전트 서버 처리량 벤치마크 (워커 수별)
+
+- 에이전트를 AGENT_WORKERS=N 으로 띄우고, DataPart 직접 툴 호출(LLM 생략)을 동시에 보내 req/s, p50/p95 지연을 잰다
+- 워커 수를 바꿔가며 반복해 코어 수에 따라 처리량이 늘어나는지 확인 (speedup = 워커 1개 대비)
+- 툴이 Redis를 읽으므로 agentDB 데이터가 적재된 Redis가 필요하다
+
+사용법 (프로젝트 루트에서):
+    python benchmarks/serving_throughput.py --agent agents/vehicle_agent --workers 1,2,4
+    python benchmarks/serving_throughput.py --url http://localhost:10004 --requests 2000   # 이미 떠 있는 서버
+"""
+import argparse
+import asyncio
+import json
+import os
+import signal
+import subprocess
+import sys
+import time
+from typing import Any, Dict, List, Optional
+from uuid import uuid4
+
+import httpx
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def tool_call_payload(tool: str, args: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "jsonrpc": "2.0",
+        "id": uuid4().hex,
+        "method": "message/send",
+        "params": {
+            "message": {
+                "role": "user",
+                "messageId": uuid4().hex,
+                "parts": [{"kind": "data", "data": {"tool": tool, "args": args}}],
+            }
+        },
+    }
+
+
+def is_error(body: Dict[str, Any]) -> bool:
+    """JSON-RPC 에러 또는 툴 실행 에러(DataPart {"tool", "error"})"""
+    if "error" in body:
+        return True
+    parts = (body.get("result") or {}).get("parts") or []
+    return any("error" in (part.get("data") or {}) for part in parts)
+
+
+def percentile(values: List[float], q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+async def run_load(url: str, tool: str, args: Dict[str, Any], total: int, concurrency: int) -> Dict[str, Any]:
+    latencies: List[float] = []
+    errors = 0
+    remaining = iter(range(total))
+
+    async def worker(client: httpx.AsyncClient) -> None:
+        nonlocal errors
+        for _ in remaining:
+            started = time.perf_counter()
+            try:
+                response = await client.post(url, json=tool_call_payload(tool, args))
+                body = response.json()
+                if response.status_code != 200 or is_error(body):
+                    errors += 1
+            except httpx.HTTPError:
+                errors += 1
+            latencies.append(time.perf_counter() - started)
+
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    async with httpx.AsyncClient(timeout=60.0, limits=limits) as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(worker(client) for _ in range(concurrency)))
+        elapsed = time.perf_counter() - started
+
+    return {
+        "requests": total,
+        "errors": errors,
+        "seconds": round(elapsed, 2),
+        "rps": round(total / elapsed, 1),
+        "p50_ms": round(percentile(latencies, 0.50) * 1000, 1),
+        "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+    }
+
+
+def start_server(
+    agent_dir: str, port: int, workers: int, extra_env: Optional[Dict[str, str]] = None
+) -> subprocess.Popen:
+    env = dict(os.environ)
+    env.update(extra_env or {})
+    env.update({
+        "AGENT_PORT": str(port),
+        "AGENT_WORKERS": str(workers),
+        "PYTHONPATH": os.pathsep.join(filter(None, [ROOT, env.get("PYTHONPATH")])),
+    })
+    return subprocess.Popen(
+        [sys.executable, "__main__.py"],
+        cwd=os.path.join(ROOT, agent_dir),
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+
+
+def wait_ready(url: str, timeout: float = 60.0) -> None:
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(f"{url}/.well-known/agent-card.json", timeout=2.0).status_code == 200:
+                return
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.5)
+    raise TimeoutError(f"서버가 {timeout:.0f}초 안에 뜨지 않음: {url}")
+
+
+def stop_server(proc: subprocess.Popen) -> None:
+    # SIGINT → uvicorn graceful shutdown (워커 정리 후 종료)
+    proc.send_signal(signal.SIGINT)
+    try:
+        proc.wait(timeout=30)
+    except subprocess.TimeoutExpired:
+        proc.kill()
+
+
+def bench(url: str, args: argparse.Namespace, tool_args: Dict[str, Any]) -> Dict[str, Any]:
+    # 연결/캐시 warm-up 후 측정
+    asyncio.run(run_load(url, args.tool, tool_args, min(args.requests, args.concurrency * 2), args.concurrency))
+    return asyncio.run(run_load(url, args.tool, tool_args, args.requests, args.concurrency))
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="에이전트 서버 워커 수별 처리량 측정")
+    parser.add_argument("--agent", default="agents/vehicle_agent", help="벤치마크할 에이전트 디렉토리")
+    parser.add_argument("--url", help="이미 실행 중인 서버 주소 (지정하면 서버를 띄우지 않음)")
+    parser.add_argument("--port", type=int, default=10104)
+    parser.add_argument("--workers", default=f"1,{os.cpu_count() or 1}", help="쉼표로 구분한 워커 수 목록")
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--tool", default="get_fleet_availability")
+    parser.add_argument("--args", default="{}", help="툴 인자 (JSON)")
+    args = parser.parse_args(argv)
+    tool_args = json.loads(args.args)
+
+    if args.url:
+        print(json.dumps(bench(args.url, args, tool_args), ensure_ascii=False))
+        return 0
+
+    url = f"http://127.0.0.1:{args.port}"
+    results = []
+    for workers in sorted({int(w) for w in args.workers.split(",")}):
+        proc = start_server(args.agent, args.port, workers)
+        try:
+            wait_ready(url)
+            result = bench(url, args, tool_args)
+        finally:
+            stop_server(proc)
+        results.append({"workers": workers, **result})
+
+    base = results[0]["rps"] or 1.0
+    print(f"{'workers':>7} {'req/s':>9} {'speedup':>8} {'p50 ms':>8} {'p95 ms':>8} {'errors':>7}")
+    for r in results:
+        print(f"{r['workers']:>7} {r['rps']:>9} {r['rps'] / base:>7.2f}x {r['p50_ms']:>8} {r['p95_ms']:>8} {r['errors']:>7}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
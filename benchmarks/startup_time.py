@@ -0,0 +1,80 @@
+"""
+에이전트 기동 시간 벤치마크 (cold start)
+
+- 에이전트를 여러 번 새로 띄우면서 /healthz(liveness), /readyz(readiness)가 처음 200이 될 때까지의 시간을 잰다
+- 워커가 기록한 기동 프로파일(/stats의 startup: imports/agent/llm_clients/warmup 단계별 ms)을 함께 출력
+- Redis/LLM 백엔드가 없으면 /readyz는 503으로 남으므로 ready 시간은 빈칸, 프로파일과 실패한 점검만 출력
+
+사용법 (프로젝트 루트에서):
+    python benchmarks/startup_time.py --agent agents/vehicle_agent --runs 3
+    python -X importtime -c "import litellm" 2>&1 | sort -t'|' -k2 -n | tail   # 무거운 import 확인
+"""
+import argparse
+import json
+import os
+import sys
+import time
+from typing import Any, Dict, List, Optional
+
+import httpx
+
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+from serving_throughput import start_server, stop_server  # noqa: E402
+
+
+def wait_status(url: str, deadline: float) -> Optional[float]:
+    """url이 200을 돌려줄 때까지 기다린 시간(초), deadline까지 안 되면 None"""
+    started = time.monotonic()
+    while time.monotonic() < deadline:
+        try:
+            if httpx.get(url, timeout=2.0).status_code == 200:
+                return time.monotonic() - started
+        except httpx.HTTPError:
+            pass
+        time.sleep(0.1)
+    return None
+
+
+def measure(agent_dir: str, port: int, timeout: float) -> Dict[str, Any]:
+    url = f"http://127.0.0.1:{port}"
+    started = time.monotonic()
+    proc = start_server(agent_dir, port, 1)
+    try:
+        deadline = started + timeout
+        live = wait_status(f"{url}/healthz", deadline)
+        ready = wait_status(f"{url}/readyz", deadline) if live is not None else None
+        startup = httpx.get(f"{url}/stats", timeout=5.0).json().get("startup", {}) if live is not None else {}
+    finally:
+        stop_server(proc)
+    return {
+        "live_s": round(live, 2) if live is not None else None,
+        "ready_s": round(live + ready, 2) if ready is not None else None,
+        "phases_ms": startup.get("phases_ms", {}),
+        "failed_checks": [name for name, r in startup.get("checks", {}).items() if not r.get("ok")],
+    }
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description="에이전트 cold start 시간 (liveness / readiness / 단계별 프로파일)")
+    parser.add_argument("--agent", default="agents/vehicle_agent", help="벤치마크할 에이전트 디렉토리")
+    parser.add_argument("--port", type=int, default=10105)
+    parser.add_argument("--runs", type=int, default=3)
+    parser.add_argument("--timeout", type=float, default=120.0, help="한 번 기동을 기다리는 최대 시간(초)")
+    args = parser.parse_args(argv)
+
+    results = [measure(args.agent, args.port, args.timeout) for _ in range(args.runs)]
+    phases = sorted({name for r in results for name in r["phases_ms"]})
+    print(f"{'run':>4} {'live s':>8} {'ready s':>8} " + " ".join(f"{p:>12}" for p in phases))
+    for i, r in enumerate(results, 1):
+        print(
+            f"{i:>4} {str(r['live_s']):>8} {str(r['ready_s']):>8} "
+            + " ".join(f"{str(r['phases_ms'].get(p, '')):>12}" for p in phases)
+        )
+    failed = sorted({name for r in results for name in r["failed_checks"]})
+    if failed:
+        print(json.dumps({"failed_checks": failed}, ensure_ascii=False))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+모든 에이전트를 한 프로세스/한 이벤트 루프에서 실행 (소규모·엣지 배포용)
+
+- 에이전트마다 app.create_app()으로 만든 앱을 기존과 같은 포트에 띄우므로 외부 클라이언트는 그대로 사용
+- google-adk/a2a/litellm 스택을 한 번만 로드 → 프로세스 5개보다 메모리 사용량이 작음
+- 오케스트레이터 → 같은 프로세스 에이전트 호출은 HTTP 대신 utils.inprocess 전송 계층으로 바로 전달
+  (레지스트리에 없거나 다른 호스트에 있는 에이전트는 기존처럼 HTTP)
+- 에이전트 폴더마다 agent.py / agent_executor.py / app.py / tools 같은 모듈 이름이 겹치므로,
+  하나씩 import 한 뒤 sys.modules에서 별도 이름으로 옮겨 다음 에이전트와 섞이지 않게 한다
+
+사용법 (프로젝트 루트에서):
+    python host_all.py
+    HOST_AGENTS=orchestrator,vehicle,delivery python host_all.py   # 일부만
+"""
+import asyncio
+import importlib
+import logging
+import os
+import resource
+import signal
+import sys
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Set, Tuple
+
+import uvicorn
+from dotenv import load_dotenv
+
+from utils.runtime_stats import stats_scope
+
+logger = logging.getLogger("host_all")
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# 이름: (폴더, 기본 주소, 기본 포트) — 오케스트레이터는 하위 에이전트를 모두 등록한 뒤 마지막에 로드
+AGENTS: Dict[str, Tuple[str, str, int]] = {
+    "delivery": ("agents/delivery_agent", "0.0.0.0", 10001),
+    "item": ("agents/item_agent", "0.0.0.0", 10002),
+    "quality": ("agents/qulity_agent", "0.0.0.0", 10003),
+    "vehicle": ("agents/vehicle_agent", "0.0.0.0", 10004),
+    "orchestrator": ("Orchestrator_new", "127.0.0.1", 10000),
+}
+
+
+def _local_module_names(path: str) -> Set[str]:
+    """에이전트 폴더 안의 최상위 모듈/패키지 이름 (다른 에이전트와 겹칠 수 있는 이름들)"""
+    names = set()
+    for entry in os.listdir(path):
+        full = os.path.join(path, entry)
+        if entry.endswith(".py") and entry not in ("__init__.py", "__main__.py"):
+            names.add(entry[:-3])
+        elif os.path.isdir(full) and os.path.exists(os.path.join(full, "__init__.py")):
+            names.add(entry)
+    return names
+
+
+@contextmanager
+def _isolated_import(name: str, path: str):
+    """path를 import 경로 맨 앞에 두고, 끝나면 그 폴더의 모듈을 _hosted_{name}.* 로 옮김"""
+    local = _local_module_names(path)
+    sys.path.insert(0, path)
+    try:
+        yield
+    finally:
+        sys.path.remove(path)
+        for module in list(sys.modules):
+            if module.split(".")[0] in local:
+                sys.modules[f"_hosted_{name}.{module}"] = sys.modules.pop(module)
+
+
+def load_agent(name: str, directory: str, host: str, port: int):
+    """에이전트 폴더의 app.create_app()으로 앱 생성 (카드 URL용 주소는 AGENT_HOST/PORT로 전달)"""
+    os.environ["AGENT_HOST"], os.environ["AGENT_PORT"] = host, str(port)
+    with _isolated_import(name, os.path.join(ROOT, directory)), stats_scope(name):
+        return importlib.import_module("app").create_app()
+
+
+def _rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # Linux: KB 단위
+
+
+class _HostedServer(uvicorn.Server):
+    @contextmanager
+    def capture_signals(self):
+        # 신호는 host_all이 한 번에 받아 모든 서버를 종료시킴 (서버마다 핸들러를 덮어쓰지 않도록)
+        yield
+
+
+async def serve_all(apps: List[Tuple[str, object, str, int]]) -> None:
+    servers = [
+        _HostedServer(uvicorn.Config(
+            app, host=host, port=port,
+            timeout_graceful_shutdown=int(os.getenv("AGENT_GRACEFUL_TIMEOUT", "30")),
+        ))
+        for _, app, host, port in apps
+    ]
+
+    def shutdown() -> None:
+        for server in servers:
+            server.should_exit = True
+
+    loop = asyncio.get_running_loop()
+    for sig in (signal.SIGINT, signal.SIGTERM):
+        loop.add_signal_handler(sig, shutdown)
+    await asyncio.gather(*(server.serve() for server in servers))
+
+
+def main() -> None:
+    load_dotenv()
+    logging.basicConfig(level=logging.INFO)
+    selected = [n.strip() for n in os.getenv("HOST_AGENTS", ",".join(AGENTS)).split(",") if n.strip()]
+    unknown = set(selected) - set(AGENTS)
+    if unknown:
+        raise SystemExit(f"알 수 없는 에이전트: {', '.join(sorted(unknown))} (가능: {', '.join(AGENTS)})")
+
+    apps = []
+    for name, (directory, default_host, default_port) in AGENTS.items():
+        if name not in selected:
+            continue
+        host = os.getenv("AGENT_BIND_HOST", default_host)
+        started = time.perf_counter()
+        apps.append((name, load_agent(name, directory, host, default_port), host, default_port))
+        logger.info(f"{name} 로드 ({(time.perf_counter() - started) * 1000:.0f}ms, RSS {_rss_mb():.0f}MB)")
+
+    logger.info(f"에이전트 {len(apps)}개를 한 프로세스에서 실행: " + ", ".join(f"{n}:{p}" for n, _, _, p in apps))
+    asyncio.run(serve_all(apps))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,5 @@
+# 프로젝트 루트의 utils/ 패키지를 import 할 수 있도록 경로 추가 (pytest tests/)
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,146 @@
+"""tasks/cancel 처리: canceled 상태는 한 번만, 다른 이유의 취소는 execute() 밖으로 전파"""
+import asyncio
+import importlib.util
+import os
+import uuid
+
+import pytest
+from a2a.server.agent_execution import RequestContext
+from a2a.server.events import EventQueue
+from a2a.types import Message, MessageSendParams, Part, Role, TaskState, TaskStatusUpdateEvent, TextPart
+from google.adk.agents import LlmAgent
+from google.adk.models.base_llm import BaseLlm
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _load_executor():
+    spec = importlib.util.spec_from_file_location(
+        "vehicle_executor_cancel_test", os.path.join(ROOT, "agents/vehicle_agent/agent_executor.py")
+    )
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module.ADKAgentExecutor
+
+
+class SlowLlm(BaseLlm):
+    async def generate_content_async(self, llm_request, stream=False):
+        await asyncio.sleep(60)
+        yield
+
+
+def _context() -> RequestContext:
+    message = Message(role=Role.user, parts=[Part(root=TextPart(text="V0012 상태"))], message_id=uuid.uuid4().hex)
+    return RequestContext(
+        request=MessageSendParams(message=message), task_id=uuid.uuid4().hex, context_id=uuid.uuid4().hex,
+    )
+
+
+async def _drain(queue: EventQueue) -> list:
+    events = []
+    while not queue.queue.empty():
+        events.append(await queue.dequeue_event(no_wait=True))
+    return events
+
+
+@pytest.fixture
+def executor():
+    agent = LlmAgent(name="VehicleAgent", model=SlowLlm(model="slow"))
+    return _load_executor()(agent)
+
+
+async def _started(executor, context, queue) -> asyncio.Task:
+    running = asyncio.create_task(executor.execute(context, queue))
+    for _ in range(100):
+        await asyncio.sleep(0.01)
+        if context.task_id in executor.cancellation._running:
+            break
+    return running
+
+
+@pytest.mark.asyncio
+async def test_cancel_emits_single_canceled_status(executor):
+    context, queue = _context(), EventQueue()
+    running = await _started(executor, context, queue)
+
+    await executor.cancel(context, queue)
+    await asyncio.wait_for(running, timeout=5)
+
+    canceled = [
+        e for e in await _drain(queue)
+        if isinstance(e, TaskStatusUpdateEvent) and e.status.state == TaskState.canceled
+    ]
+    assert len(canceled) == 1
+
+
+@pytest.mark.asyncio
+async def test_other_cancellation_propagates(executor):
+    context, queue = _context(), EventQueue()
+    running = await _started(executor, context, queue)
+
+    running.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await asyncio.wait_for(running, timeout=5)
+
+
+def _connection(executor, admission=None):
+    import sys
+
+    from a2a.server.request_handlers import DefaultRequestHandler
+    from a2a.server.tasks import InMemoryTaskStore
+    from a2a.types import AgentCapabilities, AgentCard, AgentSkill
+
+    from utils.inprocess import LocalAgent
+
+    sys.path.insert(0, os.path.join(ROOT, "Orchestrator_new"))
+    from remote_agent_connection import RemoteAgentConnections
+
+    store = InMemoryTaskStore()
+    card = AgentCard(
+        name="Vehicle Agent", description="차량", url="http://localhost:10004", version="1.0",
+        capabilities=AgentCapabilities(streaming=True), default_input_modes=["text"], default_output_modes=["text"],
+        skills=[AgentSkill(id="manage_fleet", name="fleet", description="차량 관리", tags=["vehicle"])],
+    )
+    local = LocalAgent(card, DefaultRequestHandler(executor, store), admission)
+    return RemoteAgentConnections(card, local=local), store
+
+
+def _message() -> Message:
+    return Message(role=Role.user, parts=[Part(root=TextPart(text="V0012 상태"))], message_id=uuid.uuid4().hex)
+
+
+@pytest.mark.asyncio
+async def test_cancelled_non_streaming_call_cancels_remote_task(executor):
+    connection, store = _connection(executor)
+
+    with pytest.raises(asyncio.TimeoutError):
+        await asyncio.wait_for(connection.send_message(_message(), stream=False), timeout=0.5)
+
+    tasks = list(store.tasks.values())
+    assert len(tasks) == 1 and tasks[0].status.state == TaskState.canceled
+
+
+@pytest.mark.asyncio
+async def test_non_streaming_call_holds_admission_slot_until_task_ends(executor):
+    from utils.admission import AdmissionController
+
+    admission = AdmissionController(max_concurrent=1)
+    connection, store = _connection(executor, admission)
+    call = asyncio.create_task(connection.send_message(_message(), stream=False))
+    for _ in range(100):
+        await asyncio.sleep(0.01)
+        if store.tasks:
+            break
+
+    # 태스크가 실행 중인 동안 자리를 계속 차지 → 다음 요청은 대기열로
+    await asyncio.sleep(0.2)
+    [task] = store.tasks.values()
+    assert task.status.state == TaskState.working
+    assert admission.in_flight == 1
+
+    call.cancel()
+    with pytest.raises(asyncio.CancelledError):
+        await call
+    assert admission.in_flight == 0
+    [task] = store.tasks.values()
+    assert task.status.state == TaskState.canceled
@@ -0,0 +1,41 @@
+"""utils.change_events ChangeConsumer (처리할 수 없는 이벤트 → dead-letter)"""
+import threading
+
+import fakeredis
+
+from utils.change_events import ChangeConsumer, dead_letter_key, emit_change, stream_key
+
+
+def test_poison_event_moves_to_dead_letter():
+    client = fakeredis.FakeRedis(decode_responses=True)
+    consumer = ChangeConsumer(client, "cache", "c1", ["vehicle"], start_id="0", max_deliveries=3)
+    emit_change(client, "vehicle", "V0001", {"status": "broken"})
+    emit_change(client, "vehicle", "V0002", {"status": "idle"})
+
+    stop = threading.Event()
+    attempts, handled = [], []
+
+    def handler(event):
+        if event.id == "V0001":
+            attempts.append(event.event_id)
+            if len(attempts) == 3:
+                # 이번 실패에서 dead-letter로 옮겨지고 루프가 끝남
+                stop.set()
+            raise ValueError("cannot apply")
+        handled.append(event.id)
+
+    consumer.run(handler, block_ms=10, stop=stop, retry_delay=0)
+
+    assert len(attempts) == 3
+    assert handled == ["V0002"]
+    assert client.xpending(stream_key("vehicle"), "cache")["pending"] == 0
+    [(_, fields)] = client.xrange(dead_letter_key("vehicle"))
+    assert fields["id"] == "V0001"
+    assert fields["event_id"] == attempts[0]
+    assert "cannot apply" in fields["error"]
+
+    # 뒤에 들어온 이벤트는 막히지 않고 처리됨
+    emit_change(client, "vehicle", "V0003", {"status": "idle"})
+    stop.clear()
+    consumer.run(lambda event: (handled.append(event.id), stop.set()), block_ms=10, stop=stop)
+    assert handled == ["V0002", "V0003"]
@@ -0,0 +1,71 @@
+"""오케스트레이터 fast path → 하위 에이전트 DataPart 직접 툴 호출 (양쪽 LLM 없이, in-process 전송)"""
+import importlib.util
+import json
+import os
+import sys
+
+import fakeredis
+import pytest
+from a2a.server.request_handlers import DefaultRequestHandler
+from a2a.server.tasks import InMemoryTaskStore
+from a2a.types import AgentCapabilities, AgentCard, AgentSkill
+from google.adk.agents import LlmAgent
+from google.adk.models.base_llm import BaseLlm
+from google.adk.tools import FunctionTool
+
+from utils.inprocess import register_local_agent
+from utils.metrics import InstrumentedRedis
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "Orchestrator_new"))
+
+
+def _load(name: str, path: str):
+    spec = importlib.util.spec_from_file_location(name, os.path.join(ROOT, path))
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+class NoLlm(BaseLlm):
+    """호출되면 실패하는 모델 (LLM을 거치지 않았는지 확인용)"""
+
+    async def generate_content_async(self, llm_request, stream=False):
+        raise AssertionError("LLM이 호출되면 안 됩니다")
+        yield
+
+
+@pytest.fixture
+def vehicle_card(monkeypatch):
+    tools = _load("vehicle_tools_under_test", "agents/vehicle_agent/tools/redis_vehicle_tools.py")
+    client = InstrumentedRedis(connection_pool=fakeredis.FakeRedis(decode_responses=True).connection_pool)
+    client.hset("vehicle:V0012", mapping={"vehicle_id": "V0012", "status": "idle", "capacity": "1200"})
+    monkeypatch.setattr(tools, "redis_client", client)
+
+    executor_module = _load("vehicle_executor_under_test", "agents/vehicle_agent/agent_executor.py")
+    agent = LlmAgent(name="VehicleAgent", model=NoLlm(model="none"), tools=[FunctionTool(tools.get_vehicle_status)])
+    handler = DefaultRequestHandler(executor_module.ADKAgentExecutor(agent), InMemoryTaskStore())
+    card = AgentCard(
+        name="Vehicle Agent", description="차량", url="http://localhost:10004", version="1.0",
+        capabilities=AgentCapabilities(streaming=True), default_input_modes=["text"], default_output_modes=["text"],
+        skills=[AgentSkill(id="manage_fleet", name="fleet", description="차량 관리", tags=["vehicle"])],
+    )
+    register_local_agent(card, handler)
+    return card
+
+
+@pytest.mark.asyncio
+async def test_fast_path_sends_tool_call_without_llm(vehicle_card, monkeypatch):
+    orchestrator = _load("orchestrator_agent_under_test", "Orchestrator_new/agent.py")
+
+    async def get_cards():
+        return {vehicle_card.name: vehicle_card}
+
+    monkeypatch.setattr(orchestrator.card_cache, "get_cards", get_cards)
+    answer = await orchestrator.fast_path.try_route("V0012 차량 상태 알려줘")
+
+    assert json.loads(answer) == {
+        "status": "success", "data": {"vehicle_id": "V0012", "status": "idle", "capacity": "1200"},
+    }
+    assert orchestrator.fast_path.counters["hit:id_tool"] == 1
+    await orchestrator.remote_agents.aclose()
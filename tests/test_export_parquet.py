@@ -0,0 +1,70 @@
+"""agentDB/export_parquet.py incremental export 워터마크 (같은 timestamp로 나중에 들어온 행)"""
+import importlib.util
+import os
+
+import fakeredis
+import pytest
+
+from utils.redis_query import rebuild_indexes
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+spec = importlib.util.spec_from_file_location("export_parquet", os.path.join(ROOT, "agentDB", "export_parquet.py"))
+export_parquet = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(export_parquet)
+
+
+class RecordingSink:
+    """pyarrow 없이 내보낸 행만 기록"""
+
+    def __init__(self, out_dir, entity, run_id, batch_size):
+        self.exported = []
+        self.rows = 0
+        self.writers = {}
+
+    def add(self, partition, row):
+        self.exported.append(row["id"])
+        self.rows += 1
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def sinks(monkeypatch):
+    created = []
+
+    def make(*args):
+        sink = RecordingSink(*args)
+        created.append(sink)
+        return sink
+
+    monkeypatch.setattr(export_parquet, "PartitionedParquetSink", make)
+    return created
+
+
+def _add(client, ident, ts):
+    client.hset(f"delivery:{ident}", mapping={"id": ident, "status": "배송중", "timestamp": ts})
+
+
+@pytest.mark.parametrize("indexed", [True, False])
+def test_rows_with_same_timestamp_as_watermark_are_exported(sinks, indexed):
+    client = fakeredis.FakeRedis(decode_responses=True)
+    _add(client, "ORD0001", "2024-05-01T09:00:00")
+    _add(client, "ORD0002", "2024-05-01T10:00:00")
+    if indexed:
+        rebuild_indexes(client, "delivery")
+    first = export_parquet.export_entity(client, "delivery", "out", "r1", since={"score": 0, "ids": []})
+
+    # 마지막으로 내보낸 행과 같은 timestamp로 나중에 기록된 행
+    _add(client, "ORD0003", "2024-05-01T10:00:00")
+    if indexed:
+        rebuild_indexes(client, "delivery")
+    second = export_parquet.export_entity(client, "delivery", "out", "r2", since=first["watermark"])
+
+    assert sorted(sinks[0].exported) == ["ORD0001", "ORD0002"]
+    assert sinks[1].exported == ["ORD0003"]
+    assert second["watermark"]["ids"] == ["ORD0002", "ORD0003"]
+
+    third = export_parquet.export_entity(client, "delivery", "out", "r3", since=second["watermark"])
+    assert third["rows"] == 0
+    assert third["watermark"] == second["watermark"]
@@ -0,0 +1,59 @@
+"""오케스트레이터 fast path 규칙 분류 (LLM 우회 여부)"""
+import os
+import sys
+
+import pytest
+from a2a.types import AgentCapabilities, AgentCard, AgentSkill
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "Orchestrator_new"))
+from fast_path import FastPathRouter  # noqa: E402
+
+
+def _card(name: str, domain: str) -> AgentCard:
+    return AgentCard(
+        name=name, description=name, url=f"http://localhost/{domain}", version="1.0",
+        capabilities=AgentCapabilities(), default_input_modes=["text"], default_output_modes=["text"],
+        skills=[AgentSkill(id=f"manage_{domain}", name=domain, description=domain, tags=[domain])],
+    )
+
+
+CARDS = {
+    "Delivery Agent": _card("Delivery Agent", "delivery"),
+    "Vehicle Agent": _card("Vehicle Agent", "vehicle"),
+    "Item Agent": _card("Item Agent", "item"),
+    "Quality Agent": _card("Quality Agent", "quality"),
+}
+
+
+@pytest.fixture
+def router():
+    return FastPathRouter(card_cache=None, dispatch=None)
+
+
+@pytest.mark.parametrize("text, agent, reason", [
+    ("ORD0042 상태 알려줘", "Delivery Agent", "id_tool"),
+    ("V0012 차량 상태", "Vehicle Agent", "id_tool"),
+    ("V0012 차량 상태를 정비중으로 바꿔줘", "Vehicle Agent", "id"),
+    ("전체 재고 목록 보여줘", "Item Agent", "keyword"),
+    ("완료된 배송 몇 건이야?", "Delivery Agent", "keyword"),
+])
+def test_confident_requests_bypass_llm(router, text, agent, reason):
+    decision = router.classify(text, CARDS)
+    assert (decision.agent_name, decision.reason) == (agent, reason)
+
+
+@pytest.mark.parametrize("text", [
+    "배송이 왜 늦어졌는지 차량 기사와 비교해줘",
+    "배송이 왜 늦어졌어?",
+    "ORD0042 배송이 늦어진 이유",
+    "V0012 정비 이력 분석해줘",
+    "배송 기사한테 연락해줘",
+    "창고 옮기는 방법 알려줘",
+])
+def test_ambiguous_requests_fall_back(router, text):
+    assert router.classify(text, CARDS).agent_name is None
+
+
+def test_id_lookup_builds_tool_call(router):
+    decision = router.classify("v0012 상태 알려줘", CARDS)
+    assert decision.tool_call == {"tool": "get_vehicle_status", "args": {"vehicle_id": "V0012"}}
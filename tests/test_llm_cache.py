@@ -0,0 +1,45 @@
+"""utils.llm_cache LLM 응답 캐시 (CDC 위치를 읽지 못할 때)"""
+from types import SimpleNamespace
+
+import pytest
+import redis.asyncio as aioredis
+from redis.asyncio.retry import Retry
+from redis.backoff import NoBackoff
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from utils.llm_cache import LlmCachePlugin
+
+
+def _request(text: str, tool_result: bool = False) -> LlmRequest:
+    contents = [types.Content(role="user", parts=[types.Part(text=text)])]
+    if tool_result:
+        contents.append(types.Content(role="user", parts=[types.Part(
+            function_response=types.FunctionResponse(name="get_x", response={"status": "success"}),
+        )]))
+    return LlmRequest(model="m", contents=contents)
+
+
+async def _call(plugin: LlmCachePlugin, request: LlmRequest, invocation: str):
+    context = SimpleNamespace(invocation_id=invocation)
+    cached = await plugin.before_model_callback(callback_context=context, llm_request=request)
+    if cached is None:
+        response = LlmResponse(content=types.Content(role="model", parts=[types.Part(text="답변")]))
+        await plugin.after_model_callback(callback_context=context, llm_response=response)
+    return cached
+
+
+@pytest.mark.asyncio
+async def test_unreachable_redis_skips_only_data_dependent_answers(caplog):
+    plugin = LlmCachePlugin(redis_client=aioredis.Redis(port=1, retry=Retry(NoBackoff(), 0)), epoch_interval=0)
+
+    assert await _call(plugin, _request("안녕"), "i1") is None
+    assert await _call(plugin, _request("안녕"), "i2") is None
+    assert plugin.counters["skipped_no_epoch"] == 2
+    assert plugin.counters["invalidated"] == 0
+    assert sum("캐시하지 않습니다" in r.message for r in caplog.records) == 1
+
+    # 툴 결과가 키에 들어간 답변은 CDC 위치와 무관하므로 계속 캐시
+    assert await _call(plugin, _request("V0012", tool_result=True), "i3") is None
+    assert await _call(plugin, _request("V0012", tool_result=True), "i4") is not None
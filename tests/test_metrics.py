@@ -0,0 +1,27 @@
+"""utils.metrics MetricsPlugin 툴 콜백 (current_tool 복원)"""
+from types import SimpleNamespace
+
+import pytest
+
+from utils.metrics import MetricsPlugin, current_tool
+
+
+def _context(call_id: str):
+    return SimpleNamespace(function_call_id=call_id, agent_name="TestAgent")
+
+
+@pytest.mark.asyncio
+async def test_tool_callbacks_restore_previous_tool():
+    plugin = MetricsPlugin()
+    outer, inner = SimpleNamespace(name="outer_tool"), SimpleNamespace(name="inner_tool")
+
+    await plugin.before_tool_callback(tool=outer, tool_args={}, tool_context=_context("c1"))
+    await plugin.before_tool_callback(tool=inner, tool_args={}, tool_context=_context("c2"))
+    assert current_tool.get() == "inner_tool"
+
+    await plugin.on_tool_error_callback(tool=inner, tool_args={}, tool_context=_context("c2"), error=RuntimeError())
+    assert current_tool.get() == "outer_tool"
+
+    await plugin.after_tool_callback(tool=outer, tool_args={}, tool_context=_context("c1"), result={"status": "success"})
+    assert current_tool.get() == "none"
+    assert plugin._tool_started == {}
@@ -0,0 +1,74 @@
+"""utils.model_tiers 티어 폴백 (스트리밍 도중 planner 실패)"""
+import pytest
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from google.genai import types
+
+from utils.model_tiers import TieredLlm
+
+
+def _text(text: str) -> LlmResponse:
+    return LlmResponse(content=types.Content(role="model", parts=[types.Part(text=text)]), partial=True)
+
+
+class FailingStream(BaseLlm):
+    """첫 청크를 내보낸 뒤 실패하는 모델"""
+
+    async def generate_content_async(self, llm_request, stream=False):
+        yield _text("부분 ")
+        raise RuntimeError("stream broken")
+
+
+class FailingBeforeOutput(BaseLlm):
+    async def generate_content_async(self, llm_request, stream=False):
+        raise RuntimeError("unavailable")
+        yield  # pragma: no cover
+
+
+class Echo(BaseLlm):
+    async def generate_content_async(self, llm_request, stream=False):
+        yield _text("전체 답변")
+
+
+def _request() -> LlmRequest:
+    return LlmRequest(contents=[types.Content(role="user", parts=[types.Part(text="안녕")])])
+
+
+async def _collect(llm: TieredLlm) -> list:
+    return [r.content.parts[0].text async for r in llm.generate_content_async(_request(), stream=True)]
+
+
+@pytest.mark.asyncio
+async def test_no_fallback_after_partial_chunks():
+    llm = TieredLlm(model="tiered", planner=FailingStream(model="small"), synthesizer=Echo(model="big"), escalate_text=False)
+    chunks = []
+    with pytest.raises(RuntimeError):
+        async for response in llm.generate_content_async(_request(), stream=True):
+            chunks.append(response.content.parts[0].text)
+    assert chunks == ["부분 "]
+    assert "synthesizer" not in llm.stats()["roles"]
+
+
+@pytest.mark.asyncio
+async def test_fallback_before_any_output():
+    llm = TieredLlm(model="tiered", planner=FailingBeforeOutput(model="small"), synthesizer=Echo(model="big"), escalate_text=False)
+    assert await _collect(llm) == ["전체 답변"]
+    assert llm.stats()["roles"]["tool_caller"]["failures"] == 1
+
+
+def test_other_litellm_provider_spec_uses_shared_limiter(monkeypatch):
+    from utils import llm_limiter
+    from utils.llm_limiter import RateLimitedLlm
+    from utils.model_config import _llm_from_spec
+
+    monkeypatch.setattr(llm_limiter, "_limiters", {})
+    monkeypatch.setenv("LLM_LIMIT_ENABLED", "true")
+    monkeypatch.setenv("LLM_LIMIT_BACKEND", "local")
+    monkeypatch.setenv("LLM_LIMIT_OPENAI_CONCURRENCY", "2")
+
+    llm = _llm_from_spec("openai/gpt-4o-mini", None)
+
+    assert isinstance(llm, RateLimitedLlm)
+    assert llm.model == "openai/gpt-4o-mini"
+    assert llm.limiter.backend == "openai" and llm.limiter.max_concurrent == 2
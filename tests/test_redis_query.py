@@ -0,0 +1,56 @@
+"""utils.redis_query 구조화 질의 (fakeredis)"""
+import fakeredis
+import pytest
+
+from utils.redis_query import rebuild_indexes, run_query
+
+
+@pytest.fixture
+def client():
+    client = fakeredis.FakeRedis(decode_responses=True)
+    for i in range(20):
+        client.hset(f"vehicle:V{i:04d}", mapping={"vehicle_id": f"V{i:04d}", "capacity": str(100 * i), "status": "idle"})
+    rebuild_indexes(client, "vehicle")
+    return client
+
+
+def test_pushdown_reports_more_rows_than_limit(client):
+    result = run_query(
+        client, "vehicle", filters=[{"field": "capacity", "op": ">=", "value": 500}],
+        sort_by="capacity", descending=True, limit=3,
+    )
+    assert result["plan"]["pushdown"] is True
+    assert result["count"] == 3
+    assert result["has_more"] is True
+    assert result["total_matched"] == 15
+    assert [row["capacity"] for row in result["data"]] == ["1900", "1800", "1700"]
+
+
+def test_pushdown_without_more_rows(client):
+    result = run_query(
+        client, "vehicle", filters=[{"field": "capacity", "op": ">=", "value": 1700}],
+        sort_by="capacity", limit=3,
+    )
+    assert result["plan"]["pushdown"] is True
+    assert result["has_more"] is False
+    assert result["total_matched"] == 3
+
+
+def test_in_filter_on_sort_field_disables_pushdown(client):
+    result = run_query(
+        client, "vehicle",
+        filters=[
+            {"field": "capacity", "op": ">=", "value": 500},
+            {"field": "capacity", "op": "in", "value": [600, 800, 1000]},
+        ],
+        sort_by="capacity", limit=2,
+    )
+    assert result["plan"]["pushdown"] is False
+    assert result["count"] == 2
+    assert result["has_more"] is True
+    assert result["total_matched"] == 3
+
+
+def test_non_numeric_limit_is_an_error(client):
+    result = run_query(client, "vehicle", limit="many")
+    assert result["status"] == "error"
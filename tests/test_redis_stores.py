@@ -0,0 +1,56 @@
+"""utils.redis_stores Redis 세션 서비스 (fakeredis)"""
+import pytest
+from fakeredis import aioredis
+from google.adk.events import Event
+from google.genai import types
+
+from utils.redis_stores import RedisSessionService
+
+
+@pytest.mark.asyncio
+async def test_list_sessions_without_user_keeps_colon_user_ids():
+    service = RedisSessionService(aioredis.FakeRedis(), namespace="TestAgent")
+    await service.create_session(app_name="app", user_id="mailto:kim@example.com", session_id="s1")
+    await service.create_session(app_name="app", user_id="urn:user:42", session_id="s2")
+    await service.create_session(app_name="other", user_id="u3", session_id="s3")
+
+    response = await service.list_sessions(app_name="app")
+
+    assert sorted((s.user_id, s.id) for s in response.sessions) == [
+        ("mailto:kim@example.com", "s1"), ("urn:user:42", "s2"),
+    ]
+
+
+@pytest.mark.asyncio
+async def test_append_event_refreshes_user_index_ttl():
+    client = aioredis.FakeRedis()
+    service = RedisSessionService(client, namespace="TestAgent", ttl=3600)
+    session = await service.create_session(app_name="app", user_id="urn:user:42", session_id="s1")
+    users_key = service._users_key("app")
+    # create_session 이후 시간이 흘러 만료가 가까워진 상태
+    await client.expire(users_key, 5)
+
+    await service.append_event(session, Event(author="user", invocation_id="i1", content=types.Content(
+        role="user", parts=[types.Part(text="안녕")],
+    )))
+
+    assert await client.ttl(users_key) > 5
+    response = await service.list_sessions(app_name="app")
+    assert [s.user_id for s in response.sessions] == ["urn:user:42"]
+
+
+@pytest.mark.asyncio
+async def test_delete_last_session_removes_user_from_index():
+    client = aioredis.FakeRedis()
+    service = RedisSessionService(client, namespace="TestAgent")
+    await service.create_session(app_name="app", user_id="u1", session_id="s1")
+    await service.create_session(app_name="app", user_id="u1", session_id="s2")
+    await service.create_session(app_name="app", user_id="u2", session_id="s3")
+
+    await service.delete_session(app_name="app", user_id="u1", session_id="s1")
+    assert await client.smembers(service._users_key("app")) == {b"u1", b"u2"}
+
+    await service.delete_session(app_name="app", user_id="u1", session_id="s2")
+    assert await client.smembers(service._users_key("app")) == {b"u2"}
+    response = await service.list_sessions(app_name="app")
+    assert [(s.user_id, s.id) for s in response.sessions] == [("u2", "s3")]
@@ -0,0 +1,60 @@
+"""utils.session_pool 세션 풀 (느린 세션 서비스가 다른 대화를 막지 않는지)"""
+import asyncio
+
+import pytest
+from google.adk.sessions import InMemorySessionService
+
+from utils.session_pool import SessionPool
+
+
+class SlowSessionService(InMemorySessionService):
+    """지정한 세션 조회만 release될 때까지 멈추는 세션 서비스"""
+
+    def __init__(self, slow_session_id: str):
+        super().__init__()
+        self.slow_session_id = slow_session_id
+        self.release = asyncio.Event()
+        self.deleted = []
+
+    async def get_session(self, *, app_name, user_id, session_id, config=None):
+        if session_id == self.slow_session_id:
+            await self.release.wait()
+        return await super().get_session(app_name=app_name, user_id=user_id, session_id=session_id, config=config)
+
+    async def delete_session(self, *, app_name, user_id, session_id):
+        self.deleted.append(session_id)
+        await super().delete_session(app_name=app_name, user_id=user_id, session_id=session_id)
+
+
+@pytest.mark.asyncio
+async def test_slow_session_lookup_does_not_block_other_contexts():
+    service = SlowSessionService("slow")
+    pool = SessionPool(service, "app")
+
+    async def use(session_id):
+        async with pool.session("user", session_id) as lease:
+            return lease.session_id
+
+    slow = asyncio.create_task(use("slow"))
+    await asyncio.sleep(0)
+    assert await asyncio.wait_for(use("fast"), timeout=1) == "fast"
+    assert not slow.done()
+
+    service.release.set()
+    assert await slow == "slow"
+    assert pool.counters["created"] == 2
+
+
+@pytest.mark.asyncio
+async def test_evicted_session_is_deleted_before_it_is_reloaded():
+    service = SlowSessionService("never")
+    pool = SessionPool(service, "app", max_sessions=1)
+
+    for session_id in ("a", "b", "a"):
+        async with pool.session("user", session_id):
+            pass
+
+    assert service.deleted == ["a", "b"]
+    assert pool.counters["evicted_lru"] == 2
+    assert pool.counters["created"] == 3
+    assert pool._deleting == {}
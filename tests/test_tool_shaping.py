@@ -0,0 +1,43 @@
+"""utils.tool_shaping 원본 보관 (SESSION_BACKEND=redis, 워커 여러 개)"""
+from types import SimpleNamespace
+
+import fakeredis
+import pytest
+from fakeredis import aioredis
+
+from utils import tool_shaping
+from utils.tool_shaping import RedisShapedResultStore, ToolOutputShaper, fetch_tool_result
+
+ITEMS = [{"delivery_id": f"ORD{i:04d}", "status": "배송중", "weight": i} for i in range(40)]
+
+
+@pytest.mark.asyncio
+async def test_handle_from_one_worker_is_fetched_by_another(monkeypatch):
+    server = fakeredis.FakeServer()
+    worker_a = RedisShapedResultStore(aioredis.FakeRedis(server=server), ttl=60)
+    worker_b = RedisShapedResultStore(aioredis.FakeRedis(server=server), ttl=60)
+    shaper = ToolOutputShaper(budget=50, top_k=5, store=worker_a)
+
+    shaped = await shaper.after_tool_callback(
+        tool=SimpleNamespace(name="get_all_deliveries"), tool_args={}, tool_context=None, result={"items": ITEMS},
+    )
+    handle = shaped["items"]["handle"]
+    assert shaped["items"]["count"] == 40
+
+    # fetch 요청은 다른 워커가 받음
+    monkeypatch.setattr(tool_shaping, "_store", worker_b)
+    page = await fetch_tool_result(handle, offset=35, limit=10)
+    assert page["status"] == "success"
+    assert page["items"] == ITEMS[35:]
+    assert page["next_offset"] is None
+    assert await worker_b.client.ttl(f"tool:result:{handle}") > 0
+
+
+@pytest.mark.asyncio
+async def test_select_store_by_session_backend(monkeypatch):
+    monkeypatch.setattr(tool_shaping, "_store", None)
+    monkeypatch.setenv("SESSION_BACKEND", "redis")
+    assert tool_shaping.get_result_store().backend == "redis"
+    monkeypatch.setattr(tool_shaping, "_store", None)
+    monkeypatch.setenv("SESSION_BACKEND", "memory")
+    assert tool_shaping.get_result_store().backend == "memory"
@@ -0,0 +1,95 @@
+"""
+ADK Runner 이벤트 → A2A 스트리밍 이벤트 변환
+
+- LLM 부분 응답(partial) → "response" 아티팩트에 청크로 append (TaskArtifactUpdateEvent)
+- 툴 호출/툴 완료 → working 상태 메시지 (TaskStatusUpdateEvent)
+- 최종 응답 → "response" 아티팩트를 최종 텍스트로 교체 (last_chunk)
+오케스트레이터는 current_updater 컨텍스트 변수로 하위 에이전트 스트림을 상위로 중계한다.
+"""
+import os
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Optional
+from uuid import uuid4
+
+from a2a.server.tasks import TaskUpdater
+from a2a.types import Part, TaskState, TextPart
+from google.adk.agents.run_config import RunConfig, StreamingMode
+
+STREAMING_ENABLED = os.getenv("ADK_STREAMING", "true").lower() == "true"
+RESPONSE_ARTIFACT = "response"
+
+# 현재 요청의 TaskUpdater (오케스트레이터 툴에서 하위 에이전트 이벤트를 중계할 때 사용)
+current_updater: ContextVar[Optional[TaskUpdater]] = ContextVar("current_updater", default=None)
+
+
+def run_config() -> RunConfig:
+    """ADK_STREAMING=true 면 LLM 토큰을 SSE 부분 이벤트로 받는다"""
+    return RunConfig(streaming_mode=StreamingMode.SSE if STREAMING_ENABLED else StreamingMode.NONE)
+
+
+def _text_of(event: Any) -> str:
+    if not event.content or not event.content.parts:
+        return ""
+    return "".join(part.text for part in event.content.parts if getattr(part, "text", None))
+
+
+def text_part(text: str) -> Part:
+    return Part(root=TextPart(text=text))
+
+
+class ResponseStreamer:
+    """한 요청의 응답 아티팩트/상태 이벤트를 발행"""
+
+    def __init__(self, updater: TaskUpdater):
+        self.updater = updater
+        self.artifact_id = uuid4().hex
+        self._turn_started = False  # 현재 LLM 턴의 첫 청크인지 (새 턴이면 아티팩트를 교체)
+        self.events = 0  # 세션에 기록되는(부분 응답이 아닌) 이벤트 수
+
+    async def status(self, text: str, **metadata: Any) -> None:
+        await self.updater.update_status(
+            TaskState.working,
+            message=self.updater.new_agent_message([text_part(text)], metadata=metadata or None),
+        )
+
+    async def chunk(self, text: str) -> None:
+        await self.updater.add_artifact(
+            [text_part(text)],
+            artifact_id=self.artifact_id,
+            name=RESPONSE_ARTIFACT,
+            append=self._turn_started,
+            last_chunk=False,
+        )
+        self._turn_started = True
+
+    async def finish(self, text: str) -> None:
+        await self.updater.add_artifact(
+            [text_part(text)],
+            artifact_id=self.artifact_id,
+            name=RESPONSE_ARTIFACT,
+            append=False,
+            last_chunk=True,
+        )
+        await self.updater.complete()
+
+    async def relay(self, events: AsyncIterator[Any]) -> Optional[str]:
+        """ADK 이벤트 스트림을 A2A 이벤트로 중계하고 마지막 텍스트 응답을 반환"""
+        final_text: Optional[str] = None
+        async for event in events:
+            if getattr(event, "partial", False):
+                text = _text_of(event)
+                if text:
+                    await self.chunk(text)
+                continue
+
+            # 부분 응답이 끝난 턴 → 다음 턴의 첫 청크는 아티팩트를 새로 씀
+            self._turn_started = False
+            self.events += 1
+            for call in event.get_function_calls():
+                await self.status(f"툴 호출: {call.name}", tool_call=call.name)
+            for response in event.get_function_responses():
+                await self.status(f"툴 완료: {response.name}", tool_result=response.name)
+            text = _text_of(event)
+            if text:
+                final_text = text
+        return final_text
@@ -0,0 +1,243 @@
+"""
+에이전트 서버 입장 제어 (동시 실행 제한 + 대기열 + 우선순위)
+
+A2A 실행 요청(message/send, message/stream)만 제한하고, 에이전트 카드/통계 GET 요청과
+tasks/get·tasks/cancel 같은 제어 요청은 대기열 없이 바로 통과시킨다 (취소 요청이 줄을 서지 않도록).
+- 동시에 실행하는 요청은 max_concurrent개까지, 나머지는 lane별 대기열에서 기다림
+- lane: X-Priority 헤더 "interactive"(기본) | "batch". 자리가 나면 interactive 대기열부터 입장
+- 대기열이 가득 찼거나 max_wait 안에 입장하지 못하면 바로 429 + Retry-After (예상 대기 시간)
+- 제한은 워커 프로세스 단위 (AGENT_WORKERS=N 이면 에이전트 전체로는 N배)
+- stats(): 실행 중/대기 중 요청 수, 입장/거절 수, 대기 시간 (p50/p95)
+- 대기열 깊이는 agent 라벨로 /metrics에도 기록 (utils.metrics)
+"""
+import asyncio
+import json
+import logging
+import math
+import os
+import time
+from collections import deque
+from contextvars import ContextVar
+from typing import Any, Deque, Dict
+
+from utils.metrics import QUEUE_DEPTH
+from utils.runtime_stats import register_stats
+
+logger = logging.getLogger(__name__)
+
+PRIORITY_HEADER = "x-priority"
+LANES = ("interactive", "batch")
+LIMITED_METHODS = {"message/send", "message/stream"}
+
+# 현재 요청의 lane (오케스트레이터가 하위 에이전트를 호출할 때 같은 lane으로 전달)
+current_priority: ContextVar[str] = ContextVar("current_priority", default="interactive")
+
+
+class AdmissionRejected(Exception):
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+def _percentile(values, q: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class AdmissionController:
+    def __init__(
+        self,
+        max_concurrent: int = 8,
+        max_queue: int = 32,
+        max_wait: float = 30.0,
+        batch_queue_share: float = 0.5,
+        agent: str = "",
+    ):
+        self.max_concurrent = max_concurrent
+        # 지표 라벨 (in-process 호출은 호출한 쪽 컨텍스트에서 acquire하므로 current_agent 대신 고정)
+        self.agent = agent
+        self.max_wait = max_wait
+        # batch 요청이 대기열을 다 차지하지 못하도록 lane별 상한을 따로 둠
+        self.queue_limits = {"interactive": max_queue, "batch": max(1, int(max_queue * batch_queue_share))}
+        self.in_flight = 0
+        self._waiters: Dict[str, Deque[asyncio.Future]] = {lane: deque() for lane in LANES}
+        self._waits_ms: Deque[float] = deque(maxlen=1000)
+        self._service_time = 1.0  # 요청 처리 시간 EWMA(초), Retry-After 계산용
+        self.counters: Dict[str, int] = {
+            "admitted": 0, "queued": 0, "rejected_queue_full": 0, "rejected_timeout": 0,
+        }
+
+    @classmethod
+    def from_env(cls, agent: str = "") -> "AdmissionController":
+        return cls(
+            max_concurrent=int(os.getenv("ADMISSION_MAX_CONCURRENT", "8")),
+            max_queue=int(os.getenv("ADMISSION_MAX_QUEUE", "32")),
+            max_wait=float(os.getenv("ADMISSION_MAX_WAIT", "30")),
+            batch_queue_share=float(os.getenv("ADMISSION_BATCH_QUEUE_SHARE", "0.5")),
+            agent=agent,
+        )
+
+    def queue_depth(self) -> int:
+        return sum(len(q) for q in self._waiters.values())
+
+    def retry_after(self) -> int:
+        """지금 줄을 서면 예상되는 대기 시간(초)"""
+        backlog = self.queue_depth() + 1
+        return max(1, math.ceil(self._service_time * backlog / self.max_concurrent))
+
+    async def acquire(self, lane: str) -> None:
+        lane = lane if lane in self._waiters else "interactive"
+        if self.in_flight < self.max_concurrent and not self.queue_depth():
+            self.in_flight += 1
+            self.counters["admitted"] += 1
+            self._waits_ms.append(0.0)
+            return
+
+        queue = self._waiters[lane]
+        if len(queue) >= self.queue_limits[lane]:
+            self.counters["rejected_queue_full"] += 1
+            raise AdmissionRejected("queue_full", self.retry_after())
+
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+        queue.append(future)
+        self.counters["queued"] += 1
+        depth = QUEUE_DEPTH.labels(self.agent, lane)
+        depth.inc()
+        started = time.monotonic()
+        try:
+            # 입장하면 release()가 자리를 넘겨주면서 future를 완료시킴 (in_flight는 그대로 유지)
+            await asyncio.wait_for(asyncio.shield(future), timeout=self.max_wait)
+        except (asyncio.TimeoutError, asyncio.CancelledError) as e:
+            if future.done() and not future.cancelled():
+                # 타임아웃과 동시에 자리를 받은 경우 → 받은 자리를 반납
+                self.release(0.0)
+            else:
+                future.cancel()
+                if future in queue:
+                    queue.remove(future)
+            if isinstance(e, asyncio.CancelledError):
+                raise
+            self.counters["rejected_timeout"] += 1
+            raise AdmissionRejected("wait_timeout", self.retry_after())
+        finally:
+            depth.dec()
+        self.counters["admitted"] += 1
+        self._waits_ms.append((time.monotonic() - started) * 1000)
+
+    def release(self, service_time: float) -> None:
+        if service_time > 0:
+            self._service_time = 0.8 * self._service_time + 0.2 * service_time
+        for lane in LANES:
+            queue = self._waiters[lane]
+            while queue:
+                future = queue.popleft()
+                if not future.done():
+                    future.set_result(None)  # 자리를 그대로 넘김
+                    return
+        self.in_flight -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        waits = list(self._waits_ms)
+        return {
+            "in_flight": self.in_flight,
+            "max_concurrent": self.max_concurrent,
+            "queue_depth": {lane: len(q) for lane, q in self._waiters.items()},
+            "queue_limits": self.queue_limits,
+            **self.counters,
+            "wait_ms_p50": round(_percentile(waits, 0.50), 1),
+            "wait_ms_p95": round(_percentile(waits, 0.95), 1),
+            "service_time_ewma_s": round(self._service_time, 3),
+        }
+
+
+async def _buffer_body(receive):
+    """요청 본문을 미리 읽고, 같은 본문을 다시 넘겨주는 receive를 반환"""
+    chunks = []
+    while True:
+        message = await receive()
+        if message["type"] != "http.request":
+            return b"", receive
+        chunks.append(message.get("body", b""))
+        if not message.get("more_body"):
+            break
+    body = b"".join(chunks)
+    replayed = False
+
+    async def replay():
+        nonlocal replayed
+        if not replayed:
+            replayed = True
+            return {"type": "http.request", "body": body, "more_body": False}
+        return await receive()
+
+    return body, replay
+
+
+def _rpc_method(body: bytes) -> str:
+    try:
+        return json.loads(body).get("method", "")
+    except (ValueError, AttributeError):
+        return "message/send"  # 해석할 수 없으면 실행 요청으로 보고 제한
+
+
+class AdmissionMiddleware:
+    """POST 요청을 AdmissionController로 제한하는 ASGI 미들웨어 (SSE 스트림은 끝날 때까지 자리를 차지)"""
+
+    def __init__(self, app, controller: AdmissionController):
+        self.app = app
+        self.controller = controller
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "POST":
+            await self.app(scope, receive, send)
+            return
+
+        body, receive = await _buffer_body(receive)
+        method = _rpc_method(body)
+        # utils.metrics 미들웨어가 요청 지표를 JSON-RPC 메서드별로 집계할 때 사용
+        scope.setdefault("state", {})["rpc_method"] = method
+        if method not in LIMITED_METHODS:
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope.get("headers") or [])
+        lane = headers.get(PRIORITY_HEADER.encode(), b"interactive").decode().lower()
+        try:
+            await self.controller.acquire(lane)
+        except AdmissionRejected as e:
+            logger.warning(f"요청 거절 ({e.reason}, lane={lane}, retry_after={e.retry_after}s)")
+            await self._reject(send, e)
+            return
+
+        token = current_priority.set(lane)
+        started = time.monotonic()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            current_priority.reset(token)
+            self.controller.release(time.monotonic() - started)
+
+    @staticmethod
+    async def _reject(send, error: AdmissionRejected) -> None:
+        body = json.dumps({"error": "server busy", "reason": error.reason, "retry_after": error.retry_after}).encode()
+        await send({
+            "type": "http.response.start",
+            "status": 429,
+            "headers": [
+                (b"content-type", b"application/json"),
+                (b"retry-after", str(error.retry_after).encode()),
+                (b"content-length", str(len(body)).encode()),
+            ],
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+def add_admission_control(app, agent: str = "") -> AdmissionController:
+    """앱에 입장 제어 미들웨어를 붙이고 /stats 에 등록 (ADMISSION_MAX_CONCURRENT 등 환경변수로 설정)"""
+    controller = AdmissionController.from_env(agent)
+    app.add_middleware(AdmissionMiddleware, controller=controller)
+    register_stats("admission", controller.stats)
+    return controller
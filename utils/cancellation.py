@@ -0,0 +1,100 @@
+"""
+실행 중인 A2A 태스크 취소
+
+- execute()는 track(task_id) 안에서 실행되고, cancel()은 같은 task_id의 asyncio 태스크를 바로 취소한다
+  → 진행 중인 LLM 호출/툴 실행/하위 에이전트 호출이 CancelledError로 중단되고 세션·입장 슬롯이 즉시 반환됨
+- 워커가 여러 개면 tasks/cancel 요청이 다른 워커로 갈 수 있으므로, TASK_STORE_BACKEND=redis 일 때는
+  Redis pub/sub(a2a:cancel:{namespace})으로 취소 요청을 모든 워커에 전달한다
+- requested(task_id): 이 취소가 tasks/cancel 요청에서 온 것인지("local"/"remote") 구분
+  (워커 종료 등 다른 이유의 취소는 None → execute()에서 그대로 전파)
+"""
+import asyncio
+import logging
+import os
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, Optional
+
+from utils.redis_stores import get_state_client
+
+logger = logging.getLogger(__name__)
+
+
+class TaskCancellation:
+    def __init__(self, namespace: str, client: Optional[Any] = None):
+        self.channel = f"a2a:cancel:{namespace}"
+        self.client = client  # redis.asyncio 클라이언트 (None이면 워커 내부에서만 취소)
+        self._running: Dict[str, asyncio.Task] = {}
+        self._requested: Dict[str, str] = {}  # task_id → "local" | "remote" (tasks/cancel로 취소한 태스크)
+        self._listener: Optional[asyncio.Task] = None
+        self.counters: Dict[str, int] = {
+            "requests": 0, "cancelled_local": 0, "cancelled_remote": 0, "forwarded": 0, "not_found": 0,
+        }
+
+    @classmethod
+    def from_env(cls, namespace: str) -> "TaskCancellation":
+        client = None
+        if os.getenv("TASK_STORE_BACKEND", "memory").lower() == "redis":
+            client = get_state_client()
+        return cls(namespace, client)
+
+    @contextmanager
+    def track(self, task_id: str) -> Iterator[None]:
+        """현재 asyncio 태스크를 task_id로 등록 (execute 전체를 감쌈)"""
+        self._ensure_listener()
+        self._running[task_id] = asyncio.current_task()
+        try:
+            yield
+        finally:
+            self._running.pop(task_id, None)
+            self._requested.pop(task_id, None)
+
+    def requested(self, task_id: str) -> Optional[str]:
+        """tasks/cancel로 취소됐으면 "local"(이 워커의 cancel()) 또는 "remote"(다른 워커에서 전달), 아니면 None"""
+        return self._requested.get(task_id)
+
+    async def cancel(self, task_id: str) -> bool:
+        """이 워커에서 실행 중이면 바로 취소, 아니면 다른 워커에 전달 (전달했으면 True)"""
+        self.counters["requests"] += 1
+        if self._cancel_local(task_id):
+            return True
+        if self.client is not None:
+            try:
+                await self.client.publish(self.channel, task_id)
+                self.counters["forwarded"] += 1
+                return True
+            except Exception as e:
+                logger.warning(f"취소 요청 전달 실패 ({task_id}): {e}")
+        self.counters["not_found"] += 1
+        return False
+
+    def _cancel_local(self, task_id: str, remote: bool = False) -> bool:
+        task = self._running.get(task_id)
+        if task is None or task.done():
+            return False
+        self._requested[task_id] = "remote" if remote else "local"
+        task.cancel()
+        self.counters["cancelled_remote" if remote else "cancelled_local"] += 1
+        logger.info(f"태스크 취소: {task_id}")
+        return True
+
+    def _ensure_listener(self) -> None:
+        if self.client is not None and self._listener is None:
+            self._listener = asyncio.get_running_loop().create_task(self._listen())
+
+    async def _listen(self) -> None:
+        while True:
+            try:
+                pubsub = self.client.pubsub()
+                await pubsub.subscribe(self.channel)
+                async for message in pubsub.listen():
+                    if message.get("type") == "message":
+                        data = message["data"]
+                        self._cancel_local(data.decode() if isinstance(data, bytes) else data, remote=True)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.warning(f"취소 채널 구독 오류, 재연결: {e}")
+                await asyncio.sleep(1.0)
+
+    def stats(self) -> Dict[str, Any]:
+        return {"running": len(self._running), **self.counters}
@@ -0,0 +1,266 @@
+"""
+엔티티 쓰기 변경 이벤트(CDC) 스트림
+
+- 쓰기 툴은 해시를 바꾸는 같은 트랜잭션 안에서 emit_change()로 이벤트를 남긴다
+  (스트림 cdc:{entity}, 필드: entity, id, key, version, changed(JSON), ts)
+- version은 해시 키별로 1씩 증가 (cdc:versions:{entity} 해시)
+- 소비자는 ChangeConsumer(consumer group)로 읽고 ack로 체크포인트하며,
+  replay()/rewind_group()으로 과거 이벤트를 다시 처리할 수 있다
+- max_deliveries번 전달해도 처리에 실패한 이벤트는 cdc:dead:{entity} 스트림으로 옮기고 ack
+  (한 이벤트가 계속 실패해도 뒤 이벤트 처리가 막히지 않음)
+"""
+import json
+import logging
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Union
+
+import redis
+from redis.client import Pipeline
+
+logger = logging.getLogger(__name__)
+
+STREAM_MAXLEN = 100_000
+
+# KEYS[1]=stream, KEYS[2]=version hash
+# ARGV: maxlen, entity, id, key, changed(JSON), ts
+_EMIT_LUA = """
+local version = redis.call('HINCRBY', KEYS[2], ARGV[4], 1)
+local event_id = redis.call('XADD', KEYS[1], 'MAXLEN', '~', ARGV[1], '*',
+    'entity', ARGV[2], 'id', ARGV[3], 'key', ARGV[4],
+    'version', version, 'changed', ARGV[5], 'ts', ARGV[6])
+return {event_id, version}
+"""
+
+_emit_script = None
+
+
+def stream_key(entity: str) -> str:
+    return f"cdc:{entity}"
+
+
+def version_key(entity: str) -> str:
+    return f"cdc:versions:{entity}"
+
+
+def dead_letter_key(entity: str) -> str:
+    return f"cdc:dead:{entity}"
+
+
+def _get_emit_script(client: Union[redis.Redis, Pipeline]):
+    global _emit_script
+    if _emit_script is None:
+        _emit_script = client.register_script(_EMIT_LUA)
+    return _emit_script
+
+
+def emit_change(
+    client: Union[redis.Redis, Pipeline],
+    entity: str,
+    ident: str,
+    changed: Dict[str, Any],
+    key: Optional[str] = None,
+) -> Any:
+    """
+    변경 이벤트 1건 기록. client가 트랜잭션 파이프라인이면 해시 쓰기와 원자적으로 기록된다.
+    - changed: {필드: 새 값} (삭제된 필드는 None)
+    - key: 변경된 해시 키 (기본값 f"{entity}:{ident}")
+    """
+    key = key or f"{entity}:{ident}"
+    payload = json.dumps(changed, ensure_ascii=False, separators=(",", ":"))
+    return _get_emit_script(client)(
+        keys=[stream_key(entity), version_key(entity)],
+        args=[STREAM_MAXLEN, entity, ident, key, payload, f"{time.time():.6f}"],
+        client=client,
+    )
+
+
+# ---------- 소비자 ----------
+
+@dataclass
+class ChangeEvent:
+    stream: str
+    event_id: str
+    entity: str
+    id: str
+    key: str
+    version: int
+    changed: Dict[str, Any]
+    ts: float
+
+    @classmethod
+    def from_entry(cls, stream: str, event_id: str, fields: Dict[str, str]) -> "ChangeEvent":
+        return cls(
+            stream=stream,
+            event_id=event_id,
+            entity=fields.get("entity", ""),
+            id=fields.get("id", ""),
+            key=fields.get("key", ""),
+            version=int(fields.get("version", 0)),
+            changed=json.loads(fields.get("changed") or "{}"),
+            ts=float(fields.get("ts", 0)),
+        )
+
+
+def replay(
+    client: redis.Redis,
+    entity: str,
+    start: str = "-",
+    end: str = "+",
+    page_size: int = 1000,
+) -> Iterator[ChangeEvent]:
+    """스트림의 과거 이벤트를 XRANGE로 순서대로 다시 읽는다 (consumer group과 무관)"""
+    stream = stream_key(entity)
+    cursor = start
+    while True:
+        entries = client.xrange(stream, min=cursor, max=end, count=page_size)
+        if not entries:
+            return
+        for event_id, fields in entries:
+            yield ChangeEvent.from_entry(stream, event_id, fields)
+        if len(entries) < page_size:
+            return
+        cursor = f"({entries[-1][0]}"
+
+
+def rewind_group(client: redis.Redis, group: str, entity: str, to_id: str = "0") -> None:
+    """consumer group의 체크포인트를 to_id로 되돌려 그 이후 이벤트를 다시 전달받게 한다"""
+    client.xgroup_setid(stream_key(entity), group, to_id)
+
+
+class ChangeConsumer:
+    """
+    consumer group 기반 변경 이벤트 소비자.
+    - 처리 후 ack 한 이벤트까지가 체크포인트 (재시작하면 미처리/미ack 이벤트부터 이어서)
+    - start_id: 그룹을 새로 만들 때 시작 위치 ("$"=이후 이벤트만, "0"=처음부터)
+    - max_deliveries: 이 횟수만큼 전달돼도 실패하면 dead-letter 스트림으로 옮김 (0이면 무한 재시도)
+    """
+
+    def __init__(
+        self,
+        client: redis.Redis,
+        group: str,
+        consumer: str,
+        entities: Iterable[str],
+        start_id: str = "$",
+        max_deliveries: int = 5,
+    ):
+        self.client = client
+        self.group = group
+        self.consumer = consumer
+        self.entities = {stream_key(e): e for e in entities}
+        self.streams = list(self.entities)
+        self.start_id = start_id
+        self.max_deliveries = max_deliveries
+        self._pending_drained = False
+        self.ensure_group()
+
+    def ensure_group(self) -> None:
+        for stream in self.streams:
+            try:
+                self.client.xgroup_create(stream, self.group, id=self.start_id, mkstream=True)
+            except redis.ResponseError as e:
+                if "BUSYGROUP" not in str(e):
+                    raise
+
+    def read(self, count: int = 100, block_ms: Optional[int] = 5000) -> List[ChangeEvent]:
+        """
+        이벤트 읽기. 먼저 이 consumer에 전달됐지만 ack 안 된 이벤트(재시작 전 처리 중이던 것)를
+        모두 돌려준 뒤, 새 이벤트를 읽는다.
+        """
+        if not self._pending_drained:
+            response = self.client.xreadgroup(
+                self.group, self.consumer, {s: "0" for s in self.streams}, count=count
+            )
+            events = self._parse(response)
+            if events:
+                return events
+            self._pending_drained = True
+        response = self.client.xreadgroup(
+            self.group, self.consumer, {s: ">" for s in self.streams}, count=count, block=block_ms
+        )
+        return self._parse(response)
+
+    def ack(self, events: Iterable[ChangeEvent]) -> int:
+        by_stream: Dict[str, List[str]] = {}
+        for event in events:
+            by_stream.setdefault(event.stream, []).append(event.event_id)
+        acked = 0
+        for stream, ids in by_stream.items():
+            acked += self.client.xack(stream, self.group, *ids)
+        return acked
+
+    def claim_stale(self, min_idle_ms: int = 60_000, count: int = 100) -> List[ChangeEvent]:
+        """죽은 consumer가 잡고 있던 미처리 이벤트를 가져온다"""
+        events: List[ChangeEvent] = []
+        for stream in self.streams:
+            _, entries, *_ = self.client.xautoclaim(
+                stream, self.group, self.consumer, min_idle_time=min_idle_ms, start_id="0-0", count=count
+            )
+            events.extend(ChangeEvent.from_entry(stream, eid, fields) for eid, fields in entries if fields)
+        return events
+
+    def deliveries(self, event: ChangeEvent) -> int:
+        """이벤트가 이 그룹에 전달된 횟수 (XPENDING, pending이 아니면 0)"""
+        entries = self.client.xpending_range(event.stream, self.group, min=event.event_id, max=event.event_id, count=1)
+        return int(entries[0]["times_delivered"]) if entries else 0
+
+    def dead_letter(self, event: ChangeEvent, error: Exception) -> None:
+        """처리할 수 없는 이벤트를 dead-letter 스트림에 복사하고 ack (같은 트랜잭션)"""
+        entity = self.entities.get(event.stream, event.entity)
+        pipe = self.client.pipeline(transaction=True)
+        pipe.xadd(dead_letter_key(entity), {
+            "stream": event.stream, "event_id": event.event_id, "group": self.group,
+            "entity": event.entity, "id": event.id, "key": event.key, "version": event.version,
+            "changed": json.dumps(event.changed, ensure_ascii=False, separators=(",", ":")),
+            "ts": f"{event.ts:.6f}", "error": repr(error)[:500],
+        }, maxlen=STREAM_MAXLEN, approximate=True)
+        pipe.xack(event.stream, self.group, event.event_id)
+        pipe.execute()
+
+    def run(
+        self,
+        handler: Callable[[ChangeEvent], None],
+        count: int = 100,
+        block_ms: int = 5000,
+        stop: Optional[threading.Event] = None,
+        retry_delay: float = 1.0,
+    ) -> None:
+        """
+        이벤트마다 handler를 호출하고 성공한 것만 ack (실패한 이벤트는 pending으로 남아 재시도)
+        max_deliveries번 실패한 이벤트는 dead-letter 스트림으로 옮김
+        """
+        while stop is None or not stop.is_set():
+            events = self.read(count=count, block_ms=block_ms)
+            done: List[ChangeEvent] = []
+            retry = False
+            for event in events:
+                try:
+                    handler(event)
+                    done.append(event)
+                except Exception as e:
+                    attempts = self.deliveries(event)
+                    if self.max_deliveries and attempts >= self.max_deliveries:
+                        logger.exception(
+                            f"변경 이벤트 처리 {attempts}회 실패, dead-letter로 이동: {event.stream} {event.event_id}"
+                        )
+                        self.dead_letter(event, e)
+                    else:
+                        logger.exception(f"변경 이벤트 처리 실패 ({attempts}회): {event.stream} {event.event_id}")
+                        retry = True
+            if done:
+                self.ack(done)
+            if retry:
+                # 실패 이벤트는 pending 재처리 경로로
+                self._pending_drained = False
+                time.sleep(retry_delay)
+
+    @staticmethod
+    def _parse(response) -> List[ChangeEvent]:
+        events: List[ChangeEvent] = []
+        for stream, entries in response or []:
+            for event_id, fields in entries:
+                if fields:
+                    events.append(ChangeEvent.from_entry(stream, event_id, fields))
+        return events
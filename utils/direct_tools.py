@@ -0,0 +1,71 @@
+"""
+구조화된 툴 호출(DataPart) 직접 실행
+
+오케스트레이터가 이미 필요한 툴을 알고 있으면 자연어 대신
+DataPart {"tool": "get_vehicle_status", "args": {"vehicle_id": "V001"}} 를 보낸다.
+에이전트 executor는 LLM 루프 없이 등록된 FunctionTool 함수를 바로 실행하고
+결과를 DataPart {"tool": ..., "result": ...} (실패 시 {"tool": ..., "error": ...}) 로 돌려준다.
+"""
+import asyncio
+import inspect
+import json
+import logging
+from typing import Any, Dict, Iterable, Optional, Tuple
+
+from google.adk.tools import FunctionTool
+
+from utils.metrics import tool_call
+
+logger = logging.getLogger(__name__)
+
+
+class ToolCallError(Exception):
+    """직접 툴 호출 요청이 잘못된 경우 (없는 툴, 잘못된 인자 등)"""
+
+
+def build_tool_registry(agent) -> Dict[str, FunctionTool]:
+    """
+    에이전트에 등록된 FunctionTool 중 직접 호출 가능한 것만 {이름: 툴} 으로 반환.
+    tool_context가 필요한 툴은 ADK 실행 컨텍스트 없이 부를 수 없으므로 제외한다.
+    """
+    registry: Dict[str, FunctionTool] = {}
+    for tool in getattr(agent, "tools", None) or []:
+        if not isinstance(tool, FunctionTool):
+            continue
+        if "tool_context" in inspect.signature(tool.func).parameters:
+            continue
+        registry[tool.name] = tool
+    return registry
+
+
+def parse_tool_call(parts: Iterable[Any]) -> Optional[Tuple[str, Dict[str, Any]]]:
+    """메시지 parts에서 {"tool", "args"} DataPart를 찾아 (툴 이름, 인자) 반환. 없으면 None"""
+    for part in parts or []:
+        data = getattr(getattr(part, "root", part), "data", None)
+        if isinstance(data, dict) and isinstance(data.get("tool"), str):
+            return data["tool"], data.get("args") or {}
+    return None
+
+
+async def run_tool_call(registry: Dict[str, FunctionTool], name: str, args: Dict[str, Any]) -> Any:
+    """
+    등록된 툴 함수를 직접 실행. 동기 툴(Redis 조회 등)은 이벤트 루프를 막지 않도록 스레드에서 실행한다.
+    """
+    tool = registry.get(name)
+    if tool is None:
+        raise ToolCallError(f"알 수 없는 툴: {name} (사용 가능: {', '.join(sorted(registry))})")
+    if not isinstance(args, dict):
+        raise ToolCallError("args는 객체(dict)여야 합니다.")
+    try:
+        inspect.signature(tool.func).bind(**args)
+    except TypeError as e:
+        raise ToolCallError(f"{name} 인자 오류: {e}") from e
+
+    # LLM 경로(MetricsPlugin)와 같은 툴 지연/Redis 명령 지표로 집계
+    with tool_call(name):
+        if inspect.iscoroutinefunction(tool.func):
+            result = await tool.func(**args)
+        else:
+            result = await asyncio.to_thread(tool.func, **args)
+    # DataPart는 JSON 객체만 담을 수 있으므로 직렬화 불가 값은 문자열로
+    return json.loads(json.dumps(result, ensure_ascii=False, default=str))
@@ -0,0 +1,161 @@
+"""
+대화 히스토리 압축 (LLM 호출 직전, Runner 플러그인)
+
+세션 이벤트는 그대로 두고 LLM에 보내는 요청(llm_request.contents)만 줄인다.
+- 최근 keep_turns 턴은 그대로 유지
+- 그 이전 턴의 큰 툴 결과(tool_output_budget 토큰 초과)는 요약본으로 교체
+  (목록은 앞 몇 개만 남기고 개수만 표시, 긴 문자열은 자름 → 필요하면 툴을 다시 호출)
+- 그래도 전체가 history_budget 토큰을 넘으면 가장 오래된 턴부터 제외
+토큰 수는 문자 수 기반 추정치 (정확한 토크나이저 없이 모델 공통으로 동작)
+"""
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional
+
+from google.adk.plugins.base_plugin import BasePlugin
+from google.genai import types
+
+logger = logging.getLogger(__name__)
+
+CHARS_PER_TOKEN = 3  # 한글/JSON 혼합 기준 보수적 추정
+LIST_HEAD = 3
+STRING_HEAD = 200
+
+
+def estimate_tokens(value: Any) -> int:
+    if isinstance(value, str):
+        return len(value) // CHARS_PER_TOKEN + 1
+    return len(json.dumps(value, ensure_ascii=False, default=str)) // CHARS_PER_TOKEN + 1
+
+
+def _content_tokens(content: types.Content) -> int:
+    total = 0
+    for part in content.parts or []:
+        if part.text:
+            total += estimate_tokens(part.text)
+        elif part.function_call:
+            total += estimate_tokens(part.function_call.args or {})
+        elif part.function_response:
+            total += estimate_tokens(part.function_response.response or {})
+    return total
+
+
+def summarize_value(value: Any, depth: int = 0) -> Any:
+    """구조는 유지하면서 목록/문자열/깊은 중첩을 줄인 요약본"""
+    if isinstance(value, dict):
+        if depth >= 3:
+            return f"<{len(value)}개 필드 생략>"
+        return {k: summarize_value(v, depth + 1) for k, v in value.items()}
+    if isinstance(value, list):
+        head = [summarize_value(v, depth + 1) for v in value[:LIST_HEAD]]
+        if len(value) > LIST_HEAD:
+            head.append(f"<외 {len(value) - LIST_HEAD}건 생략>")
+        return head
+    if isinstance(value, str) and len(value) > STRING_HEAD:
+        return value[:STRING_HEAD] + f"...<{len(value) - STRING_HEAD}자 생략>"
+    return value
+
+
+def _is_turn_start(content: types.Content) -> bool:
+    """사용자 텍스트 메시지 = 새 턴의 시작 (툴 응답은 role=user 여도 턴 시작이 아님)"""
+    return content.role == "user" and any(p.text for p in content.parts or [])
+
+
+def _split_turns(contents: List[types.Content]) -> List[List[types.Content]]:
+    turns: List[List[types.Content]] = []
+    for content in contents:
+        if _is_turn_start(content) or not turns:
+            turns.append([])
+        turns[-1].append(content)
+    return turns
+
+
+def _compact_content(content: types.Content, budget: int) -> types.Content:
+    parts = []
+    changed = False
+    for part in content.parts or []:
+        response = part.function_response
+        if response is not None and estimate_tokens(response.response or {}) > budget:
+            summary = {
+                "compacted": True,
+                "original_tokens": estimate_tokens(response.response or {}),
+                "note": "이전 턴의 큰 툴 결과라 요약됨. 전체 데이터가 필요하면 툴을 다시 호출할 것.",
+                "summary": summarize_value(response.response or {}),
+            }
+            parts.append(types.Part(function_response=types.FunctionResponse(
+                id=response.id, name=response.name, response=summary,
+            )))
+            changed = True
+        else:
+            parts.append(part)
+    return types.Content(role=content.role, parts=parts) if changed else content
+
+
+def compact_contents(
+    contents: List[types.Content],
+    keep_turns: int = 3,
+    tool_output_budget: int = 500,
+    history_budget: int = 6000,
+) -> List[types.Content]:
+    turns = _split_turns(contents)
+    if len(turns) <= keep_turns:
+        return contents
+    old, recent = turns[:-keep_turns], turns[-keep_turns:]
+    old = [[_compact_content(c, tool_output_budget) for c in turn] for turn in old]
+
+    # 전체 예산 초과 시 오래된 턴부터 제외 (턴 단위라 function_call/response 짝은 유지됨)
+    total = sum(_content_tokens(c) for turn in old + recent for c in turn)
+    dropped = 0
+    while old and total > history_budget:
+        total -= sum(_content_tokens(c) for c in old[0])
+        old.pop(0)
+        dropped += 1
+    result = [c for turn in old + recent for c in turn]
+    if not dropped and all(a is b for a, b in zip(result, contents)):
+        return contents
+    if dropped:
+        note = types.Content(role="user", parts=[types.Part(text=f"(이전 대화 {dropped}턴은 길이 제한으로 생략됨)")])
+        result.insert(0, note)
+    return result
+
+
+class HistoryCompactionPlugin(BasePlugin):
+    """모든 LLM 호출 전에 요청 히스토리를 압축하는 Runner 플러그인"""
+
+    def __init__(self, keep_turns: int = 3, tool_output_budget: int = 500, history_budget: int = 6000):
+        super().__init__(name="history_compaction")
+        self.keep_turns = keep_turns
+        self.tool_output_budget = tool_output_budget
+        self.history_budget = history_budget
+        self.counters: Dict[str, int] = {"requests": 0, "compacted": 0, "tokens_before": 0, "tokens_after": 0}
+
+    @classmethod
+    def from_env(cls) -> "HistoryCompactionPlugin":
+        return cls(
+            keep_turns=int(os.getenv("HISTORY_KEEP_TURNS", "3")),
+            tool_output_budget=int(os.getenv("HISTORY_TOOL_OUTPUT_TOKENS", "500")),
+            history_budget=int(os.getenv("HISTORY_TOKEN_BUDGET", "6000")),
+        )
+
+    async def before_model_callback(self, *, callback_context, llm_request) -> Optional[Any]:
+        contents = llm_request.contents or []
+        before = sum(_content_tokens(c) for c in contents)
+        compacted = compact_contents(contents, self.keep_turns, self.tool_output_budget, self.history_budget)
+        after = before if compacted is contents else sum(_content_tokens(c) for c in compacted)
+        self.counters["requests"] += 1
+        self.counters["tokens_before"] += before
+        self.counters["tokens_after"] += after
+        if compacted is not contents:
+            self.counters["compacted"] += 1
+            llm_request.contents = compacted
+            logger.debug(f"히스토리 압축: 추정 {before} → {after} 토큰")
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        requests = self.counters["requests"]
+        return {
+            **self.counters,
+            "avg_prompt_tokens_before": round(self.counters["tokens_before"] / requests, 1) if requests else 0.0,
+            "avg_prompt_tokens_after": round(self.counters["tokens_after"] / requests, 1) if requests else 0.0,
+        }
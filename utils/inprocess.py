@@ -0,0 +1,123 @@
+"""
+같은 프로세스에 떠 있는 에이전트 호출용 A2A 전송 계층 (host_all.py 전용)
+
+- create_app()이 register_local_agent()로 자기 카드/요청 핸들러를 등록해 둔다
+- 오케스트레이터의 RemoteAgentPool은 카드 이름이 등록돼 있으면 HTTP 대신 InProcessTransport를 쓴다
+  → JSON 직렬화/소켓 없이 요청 핸들러를 바로 호출 (pydantic 객체를 그대로 전달)
+- 등록되지 않은 에이전트(다른 호스트)는 기존처럼 HTTP로 호출
+- 입장 제어(utils.admission)는 HTTP 미들웨어 대신 여기서 같은 컨트롤러로 적용
+"""
+import time
+from collections.abc import AsyncGenerator
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from a2a.client import ClientConfig
+from a2a.client.base_client import BaseClient
+from a2a.client.transports.base import ClientTransport
+from a2a.server.request_handlers import RequestHandler
+from a2a.types import (
+    AgentCard,
+    GetTaskPushNotificationConfigParams,
+    Message,
+    MessageSendParams,
+    Task,
+    TaskArtifactUpdateEvent,
+    TaskIdParams,
+    TaskPushNotificationConfig,
+    TaskQueryParams,
+    TaskStatusUpdateEvent,
+)
+
+from utils.admission import AdmissionController, current_priority
+
+
+@dataclass
+class LocalAgent:
+    card: AgentCard
+    handler: RequestHandler
+    admission: Optional[AdmissionController] = None
+
+
+_local_agents: Dict[str, LocalAgent] = {}
+
+
+def register_local_agent(
+    card: AgentCard, handler: RequestHandler, admission: Optional[AdmissionController] = None
+) -> None:
+    _local_agents[card.name] = LocalAgent(card, handler, admission)
+
+
+def local_agent(name: str) -> Optional[LocalAgent]:
+    return _local_agents.get(name)
+
+
+def local_cards() -> Dict[str, AgentCard]:
+    return {name: agent.card for name, agent in _local_agents.items()}
+
+
+class InProcessTransport(ClientTransport):
+    """A2A 클라이언트 요청을 같은 프로세스의 RequestHandler로 바로 전달"""
+
+    def __init__(self, agent: LocalAgent):
+        self.agent = agent
+
+    async def _admit(self) -> None:
+        if self.agent.admission is not None:
+            await self.agent.admission.acquire(current_priority.get())
+
+    def _release(self, started: float) -> None:
+        if self.agent.admission is not None:
+            self.agent.admission.release(time.monotonic() - started)
+
+    async def send_message(self, request: MessageSendParams, *, context=None) -> Task | Message:
+        await self._admit()
+        started = time.monotonic()
+        try:
+            return await self.agent.handler.on_message_send(request)
+        finally:
+            self._release(started)
+
+    async def send_message_streaming(
+        self, request: MessageSendParams, *, context=None
+    ) -> AsyncGenerator[Message | Task | TaskStatusUpdateEvent | TaskArtifactUpdateEvent]:
+        await self._admit()
+        started = time.monotonic()
+        try:
+            async for event in self.agent.handler.on_message_send_stream(request):
+                yield event
+        finally:
+            self._release(started)
+
+    async def get_task(self, request: TaskQueryParams, *, context=None) -> Task:
+        return await self.agent.handler.on_get_task(request)
+
+    async def cancel_task(self, request: TaskIdParams, *, context=None) -> Task:
+        return await self.agent.handler.on_cancel_task(request)
+
+    async def set_task_callback(
+        self, request: TaskPushNotificationConfig, *, context=None
+    ) -> TaskPushNotificationConfig:
+        return await self.agent.handler.on_set_task_push_notification_config(request)
+
+    async def get_task_callback(
+        self, request: GetTaskPushNotificationConfigParams, *, context=None
+    ) -> TaskPushNotificationConfig:
+        return await self.agent.handler.on_get_task_push_notification_config(request)
+
+    async def resubscribe(
+        self, request: TaskIdParams, *, context=None
+    ) -> AsyncGenerator[Task | Message | TaskStatusUpdateEvent | TaskArtifactUpdateEvent]:
+        async for event in self.agent.handler.on_resubscribe_to_task(request):
+            yield event
+
+    async def get_card(self, *, context=None) -> AgentCard:
+        return self.agent.card
+
+    async def close(self) -> None:
+        return
+
+
+def make_local_client(agent: LocalAgent, streaming: bool) -> Any:
+    """HTTP 클라이언트와 같은 인터페이스(send_message, cancel_task …)의 in-process 클라이언트"""
+    return BaseClient(agent.card, ClientConfig(streaming=streaming), InProcessTransport(agent), [], [])
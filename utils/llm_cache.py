@@ -0,0 +1,309 @@
+"""
+LLM 응답 캐시 (Runner 플러그인, 히스토리 압축 다음에 실행)
+
+- 키: 모델 + 시스템 프롬프트 + 툴 선언 + 생성 설정 + 정규화한 대화 내용
+  (공백/유니코드 정규화, function call id처럼 호출마다 바뀌는 값은 제외)
+- 적중하면 LLM을 호출하지 않고 저장된 응답을 그대로 돌려준다 (TTL, 개수 제한 LRU)
+- 데이터 변경 무효화: 툴 결과 없이 만든 최종 답변은 CDC 스트림(cdc:{entity})의 마지막 이벤트 ID가
+  바뀌면 폐기. 툴 호출 계획(function call)과 툴 결과가 키에 들어간 답변은 데이터가 바뀌면 키가 달라지므로 유지
+  CDC 위치를 아직 한 번도 읽지 못했으면(Redis 연결 불가) 이런 답변은 저장하지 않음 (경고 로그 한 번)
+- 유사 질문(선택, LLM_CACHE_SEMANTIC=true): 첫 턴 질문만 해시 TF-IDF 코사인 유사도로 비교하고,
+  숫자가 들어간 토큰(ORD0042, V001 …)이 정확히 같을 때만 재사용
+- stats(): 적중/미스/만료/무효화 수, 적중률
+"""
+import hashlib
+import json
+import logging
+import math
+import os
+import re
+import time
+import unicodedata
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import redis.asyncio as aioredis
+from google.adk.models.llm_response import LlmResponse
+from google.adk.plugins.base_plugin import BasePlugin
+from google.genai import types
+
+from utils.text_vectors import cosine, hash_counts
+
+logger = logging.getLogger(__name__)
+
+_SPACES = re.compile(r"\s+")
+_ID_TOKEN = re.compile(r"\w*\d\w*")
+
+
+def normalize_text(text: str) -> str:
+    return _SPACES.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+def question_vector(text: str) -> Dict[int, float]:
+    counts = hash_counts(text)
+    norm = math.sqrt(sum(c * c for c in counts.values()))
+    return {i: c / norm for i, c in counts.items()} if norm else {}
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, sort_keys=True, separators=(",", ":"), default=str)
+
+
+def _part_key(part: types.Part) -> Any:
+    if part.text:
+        return {"t": normalize_text(part.text)}
+    if part.function_call:
+        return {"c": part.function_call.name, "a": part.function_call.args or {}}
+    if part.function_response:
+        return {"r": part.function_response.name, "v": part.function_response.response or {}}
+    return None
+
+
+def _contents_key(contents: List[types.Content]) -> List[Any]:
+    out = []
+    for content in contents:
+        parts = [p for p in (_part_key(part) for part in content.parts or []) if p is not None]
+        if parts:
+            out.append([content.role, parts])
+    return out
+
+
+def request_key(llm_request: Any) -> str:
+    config = llm_request.config
+    tools = [t.model_dump(mode="json", exclude_none=True) for t in (config.tools or [])] if config else []
+    settings = (
+        config.model_dump(mode="json", exclude_none=True, exclude={"tools", "system_instruction", "http_options"})
+        if config else {}
+    )
+    system = config.system_instruction if config else None
+    if isinstance(system, types.Content):
+        system = [p.text for p in system.parts or [] if p.text]
+    payload = {
+        "model": llm_request.model,
+        "system": system,
+        "tools": sorted(tools, key=_dumps),
+        "settings": settings,
+        "contents": _contents_key(llm_request.contents or []),
+    }
+    return hashlib.sha256(_dumps(payload).encode()).hexdigest()
+
+
+def _single_question(llm_request: Any) -> Optional[str]:
+    """대화 이력 없는 첫 턴 질문이면 그 텍스트 (유사 질문 비교 대상)"""
+    contents = [c for c in llm_request.contents or [] if c.parts]
+    if len(contents) != 1 or contents[0].role != "user":
+        return None
+    texts = [p.text for p in contents[0].parts if p.text]
+    return normalize_text(" ".join(texts)) if texts else None
+
+
+def _strip_call_ids(response: LlmResponse) -> LlmResponse:
+    """저장본의 function call id 제거 (재사용 시 ADK가 새 id를 붙임)"""
+    response = response.model_copy(deep=True)
+    for part in (response.content.parts if response.content else None) or []:
+        if part.function_call:
+            part.function_call.id = None
+    response.usage_metadata = None
+    return response
+
+
+@dataclass
+class CacheEntry:
+    response: LlmResponse
+    expires_at: float
+    epoch: Optional[Tuple[str, ...]]  # 데이터에 의존하는 답변이면 저장 시점의 CDC 위치
+    question: Optional[str] = None
+    vector: Optional[Dict[int, float]] = None
+    scope: str = ""  # 유사 질문 비교 범위 (모델/시스템/툴이 같아야 함)
+
+
+class LlmCachePlugin(BasePlugin):
+    def __init__(
+        self,
+        ttl: float = 300.0,
+        max_entries: int = 1000,
+        cdc_entities: Tuple[str, ...] = ("delivery", "item", "quality", "vehicle"),
+        epoch_interval: float = 1.0,
+        semantic: bool = False,
+        semantic_threshold: float = 0.85,
+        redis_client: Optional[aioredis.Redis] = None,
+        enabled: bool = True,
+    ):
+        super().__init__(name="llm_cache")
+        self.enabled = enabled
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.cdc_entities = cdc_entities
+        self.epoch_interval = epoch_interval
+        self.semantic = semantic
+        self.semantic_threshold = semantic_threshold
+        self.redis = redis_client
+        self._entries: "OrderedDict[str, CacheEntry]" = OrderedDict()
+        # invocation_id → 응답을 기다리는 요청 (key, grounded, question, scope)
+        self._pending: Dict[str, Tuple[str, bool, Optional[str], str]] = {}
+        self._epoch: Optional[Tuple[str, ...]] = None
+        self._epoch_checked = 0.0
+        self._epoch_missing_logged = False
+        self.counters: Dict[str, int] = {
+            "hits": 0, "semantic_hits": 0, "misses": 0, "stores": 0,
+            "expired": 0, "invalidated": 0, "evicted": 0, "skipped_no_epoch": 0,
+        }
+
+    @classmethod
+    def from_env(cls) -> "LlmCachePlugin":
+        return cls(
+            enabled=os.getenv("LLM_CACHE_ENABLED", "true").lower() == "true",
+            ttl=float(os.getenv("LLM_CACHE_TTL", "300")),
+            max_entries=int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000")),
+            cdc_entities=tuple(
+                e.strip() for e in os.getenv("LLM_CACHE_CDC_ENTITIES", "delivery,item,quality,vehicle").split(",")
+                if e.strip()
+            ),
+            semantic=os.getenv("LLM_CACHE_SEMANTIC", "false").lower() == "true",
+            semantic_threshold=float(os.getenv("LLM_CACHE_SEMANTIC_THRESHOLD", "0.85")),
+            redis_client=aioredis.Redis(
+                host=os.getenv("REDIS_HOST", "localhost"),
+                port=int(os.getenv("REDIS_PORT", "6379")),
+                db=0,
+                decode_responses=True,
+            ),
+        )
+
+    # --- 데이터 변경 감지 ---
+    async def _data_epoch(self) -> Optional[Tuple[str, ...]]:
+        """엔티티별 CDC 스트림의 마지막 이벤트 ID (epoch_interval 동안은 이전 값 재사용)"""
+        now = time.monotonic()
+        if self.redis is None or now - self._epoch_checked < self.epoch_interval:
+            return self._epoch
+        self._epoch_checked = now
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            for entity in self.cdc_entities:
+                pipe.xrevrange(f"cdc:{entity}", count=1)
+            results = await pipe.execute()
+            self._epoch = tuple(entries[0][0] if entries else "0" for entries in results)
+            if self._epoch_missing_logged:
+                self._epoch_missing_logged = False
+                logger.info("LLM 캐시: CDC 위치 조회 복구, 모든 답변 캐시 재개")
+        except Exception as e:
+            logger.debug(f"CDC 위치 조회 실패 (이전 값 사용): {e}")
+        return self._epoch
+
+    # --- 조회/저장 ---
+    def _get(self, key: str, epoch: Optional[Tuple[str, ...]]) -> Optional[CacheEntry]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        if entry.expires_at < time.monotonic():
+            self._entries.pop(key)
+            self.counters["expired"] += 1
+            return None
+        if entry.epoch is not None and entry.epoch != epoch:
+            self._entries.pop(key)
+            self.counters["invalidated"] += 1
+            return None
+        self._entries.move_to_end(key)
+        return entry
+
+    def _similar(self, scope: str, question: str, epoch: Optional[Tuple[str, ...]]) -> Optional[CacheEntry]:
+        ids = set(_ID_TOKEN.findall(question))
+        vector = question_vector(question)
+        best, best_score = None, self.semantic_threshold
+        for key, entry in list(self._entries.items()):
+            if entry.scope != scope or entry.vector is None:
+                continue
+            if set(_ID_TOKEN.findall(entry.question or "")) != ids:
+                continue
+            score = cosine(vector, entry.vector)
+            if score >= best_score and self._get(key, epoch) is not None:
+                best, best_score = entry, score
+        return best
+
+    async def before_model_callback(self, *, callback_context, llm_request) -> Optional[LlmResponse]:
+        if not self.enabled:
+            return None
+        key = request_key(llm_request)
+        epoch = await self._data_epoch()
+        entry = self._get(key, epoch)
+        if entry is None and self.semantic:
+            question = _single_question(llm_request)
+            if question:
+                entry = self._similar(self._scope(llm_request), question, epoch)
+                if entry is not None:
+                    self.counters["semantic_hits"] += 1
+        if entry is None:
+            self.counters["misses"] += 1
+            # 한 invocation 안의 LLM 호출은 순차적이므로 invocation_id로 응답과 짝지음
+            self._pending[callback_context.invocation_id] = (
+                key, _is_grounded(llm_request), _single_question(llm_request), self._scope(llm_request),
+            )
+            return None
+        self.counters["hits"] += 1
+        return entry.response.model_copy(deep=True)
+
+    async def after_model_callback(self, *, callback_context, llm_response) -> Optional[LlmResponse]:
+        if llm_response.partial:
+            return None
+        pending = self._pending.pop(callback_context.invocation_id, None)
+        if pending is None or llm_response.error_code or not llm_response.content:
+            return None
+        key, grounded, question, scope = pending
+        parts = llm_response.content.parts or []
+        if not parts or key in self._entries:
+            return None
+        # 툴 결과 없이 만든 답변만 데이터 변경 시 무효화
+        needs_epoch = not grounded and not any(p.function_call for p in parts)
+        if needs_epoch and self._epoch is None:
+            # 무효화 기준이 없으면 저장해도 다음 조회에서 바로 버려지므로 저장하지 않음
+            self.counters["skipped_no_epoch"] += 1
+            if not self._epoch_missing_logged:
+                self._epoch_missing_logged = True
+                logger.warning("LLM 캐시: CDC 위치를 읽을 수 없어 툴 결과 없는 답변은 캐시하지 않습니다 (Redis 연결 확인)")
+            return None
+        self._entries[key] = CacheEntry(
+            response=_strip_call_ids(llm_response),
+            expires_at=time.monotonic() + self.ttl,
+            epoch=self._epoch if needs_epoch else None,
+            question=question,
+            vector=question_vector(question) if self.semantic and question else None,
+            scope=scope,
+        )
+        self.counters["stores"] += 1
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+            self.counters["evicted"] += 1
+        return None
+
+    async def after_run_callback(self, *, invocation_context) -> None:
+        # 응답 없이 끝난 호출(오류/취소)의 대기 항목 정리
+        self._pending.pop(invocation_context.invocation_id, None)
+
+    @staticmethod
+    def _scope(llm_request: Any) -> str:
+        scoped = llm_request.model_copy()
+        scoped.contents = []
+        return request_key(scoped)
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.counters["hits"] + self.counters["misses"]
+        return {
+            "enabled": self.enabled,
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "ttl_seconds": self.ttl,
+            "semantic": self.semantic,
+            **self.counters,
+            "hit_rate": round(self.counters["hits"] / lookups, 4) if lookups else 0.0,
+        }
+
+
+def _is_grounded(llm_request: Any) -> bool:
+    """이번 턴에 툴 결과가 들어간 요청인지 (마지막 사용자 질문 이후 function_response가 있음)"""
+    for content in reversed(llm_request.contents or []):
+        for part in content.parts or []:
+            if part.function_response:
+                return True
+            if part.text and content.role == "user":
+                return False
+    return False
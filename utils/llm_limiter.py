@@ -0,0 +1,290 @@
+"""
+LLM 백엔드 호출 제한 (모든 에이전트/워커 공유, Redis)
+
+- 백엔드(gemini, ollama:{host})마다 토큰 버킷(초당 요청 수 + burst)과 동시 호출 수(세마포어)를 둔다
+- 호출 전에 acquire()로 자리를 받고 끝나면 release() → 429를 받기 전에 미리 속도를 맞춤
+- 공정 큐: 자리가 없어 기다리는 에이전트가 여럿이면 가장 오래전에 자리를 받은 에이전트 차례
+  (한 에이전트의 요청 폭주가 다른 에이전트를 굶기지 않음)
+- 동시 호출 자리는 lease(초) 뒤 자동 만료 → 프로세스가 죽어도 자리가 새지 않음
+- Redis에 닿지 않으면 잠시 동안 프로세스 내부 제한으로 대신함
+- max_wait 안에 자리를 못 받으면 LlmThrottled → 모델 라우터가 이번 요청만 다른 백엔드로 넘김
+
+설정 (기본은 꺼져 있음, 켜기 전에 API 키의 실제 쿼터를 확인해 값을 맞출 것)
+- LLM_LIMIT_ENABLED=true 로 켬 (utils.model_config.limit_llm)
+- LLM_LIMIT_{GEMINI|OLLAMA|공급자}_RPS / _BURST / _CONCURRENCY: 백엔드별 초당 요청 수, burst, 동시 호출 수 (0이면 제한 없음)
+  (그 밖의 LiteLLM 공급자는 모델 이름의 '/' 앞부분, 예: LLM_LIMIT_OPENAI_RPS, 기본값은 제한 없음)
+- LLM_LIMIT_MAX_WAIT: 자리를 기다리는 최대 시간(초), LLM_LIMIT_LEASE: 동시 호출 자리 만료(초)
+- LLM_LIMIT_BACKEND=local 이면 Redis 없이 프로세스 안에서만 제한
+"""
+import asyncio
+import logging
+import os
+import random
+import time
+from contextvars import ContextVar
+from typing import Any, AsyncGenerator, Dict, List, Optional, Tuple
+from uuid import uuid4
+
+from google.adk.models.base_llm import BaseLlm, LlmCapabilities
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+from utils.redis_stores import get_state_client
+from utils.runtime_stats import register_stats
+
+logger = logging.getLogger(__name__)
+
+# 지금 LLM을 호출하는 에이전트 (executor.execute()에서 설정, 공정 큐 단위)
+current_agent: ContextVar[str] = ContextVar("current_agent", default="default")
+
+# KEYS: bucket(hash), slots(zset), waiters(zset), served(hash), seq
+# ARGV: agent, lease_id, rate, burst, max_concurrent, lease_ms, wait_ttl_ms
+# 반환: {1, 0, "ok"} 또는 {0, 다시 시도할 ms, 사유}
+_ACQUIRE_LUA = """
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+local agent, lease_id = ARGV[1], ARGV[2]
+local rate, burst = tonumber(ARGV[3]), tonumber(ARGV[4])
+local max_concurrent, lease_ms, wait_ttl = tonumber(ARGV[5]), tonumber(ARGV[6]), tonumber(ARGV[7])
+
+redis.call('ZREMRANGEBYSCORE', KEYS[2], '-inf', now)
+redis.call('ZREMRANGEBYSCORE', KEYS[3], '-inf', now)
+redis.call('ZADD', KEYS[3], now + wait_ttl, agent)
+redis.call('PEXPIRE', KEYS[3], wait_ttl)
+
+local turn, turn_seq = agent, nil
+for _, waiter in ipairs(redis.call('ZRANGE', KEYS[3], 0, -1)) do
+  local seq = tonumber(redis.call('HGET', KEYS[4], waiter) or '0')
+  if turn_seq == nil or seq < turn_seq then turn, turn_seq = waiter, seq end
+end
+if turn ~= agent then return {0, 20, 'fair'} end
+
+if max_concurrent > 0 and redis.call('ZCARD', KEYS[2]) >= max_concurrent then
+  return {0, 50, 'concurrency'}
+end
+
+if rate > 0 then
+  local bucket = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+  local tokens = tonumber(bucket[1]) or burst
+  local ts = tonumber(bucket[2]) or now
+  tokens = math.min(burst, tokens + (now - ts) * rate / 1000)
+  if tokens < 1 then
+    redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+    return {0, math.ceil((1 - tokens) * 1000 / rate), 'rate'}
+  end
+  redis.call('HSET', KEYS[1], 'tokens', tostring(tokens - 1), 'ts', now)
+  redis.call('PEXPIRE', KEYS[1], math.ceil(burst * 1000 / rate) + 60000)
+end
+
+redis.call('ZADD', KEYS[2], now + lease_ms, lease_id)
+redis.call('PEXPIRE', KEYS[2], lease_ms)
+redis.call('ZREM', KEYS[3], agent)
+redis.call('HSET', KEYS[4], agent, redis.call('INCR', KEYS[5]))
+redis.call('PEXPIRE', KEYS[4], 86400000)
+return {1, 0, 'ok'}
+"""
+
+
+class LlmThrottled(Exception):
+    """제한 때문에 max_wait 안에 호출하지 못함 (백엔드 장애가 아니므로 라우터는 백엔드를 제외하지 않음)"""
+
+    throttled = True
+
+    def __init__(self, backend: str, reason: str, waited: float):
+        super().__init__(f"{backend} LLM 호출 제한 ({reason}, {waited:.1f}초 대기)")
+        self.backend = backend
+        self.reason = reason
+
+
+class LlmRateLimiter:
+    def __init__(
+        self,
+        backend: str,
+        rate: float = 0.0,
+        burst: int = 1,
+        max_concurrent: int = 0,
+        max_wait: float = 30.0,
+        lease: float = 300.0,
+        client: Optional[Any] = None,
+    ):
+        self.backend = backend
+        self.rate = rate  # 초당 요청 수 (0이면 제한 없음)
+        self.burst = max(1, burst)
+        self.max_concurrent = max_concurrent  # 동시 호출 수 (0이면 제한 없음)
+        self.max_wait = max_wait
+        self.lease = lease
+        self.client = client  # redis.asyncio 클라이언트 (None이면 프로세스 내부 제한만)
+        self._prefix = f"llm:limit:{backend}"
+        self._script = client.register_script(_ACQUIRE_LUA) if client is not None else None
+        self._redis_retry_at = 0.0
+        self._held: Dict[str, bool] = {}  # lease_id → Redis에서 받은 자리인지
+        # 프로세스 내부 제한 상태 (Redis 장애 시)
+        self._local_tokens = float(self.burst)
+        self._local_ts = time.monotonic()
+        self._local_slots = 0
+        self._local_waiters: Dict[str, float] = {}
+        self._local_served: Dict[str, int] = {}
+        self._local_seq = 0
+        self._waits: List[float] = []
+        self.counters: Dict[str, int] = {
+            "acquired": 0, "throttled": 0, "rejected": 0, "local_fallback": 0,
+            "waited_rate": 0, "waited_concurrency": 0, "waited_fair": 0,
+        }
+
+    @classmethod
+    def from_env(cls, name: str, backend: str, rate: float, burst: int, max_concurrent: int) -> "LlmRateLimiter":
+        """LLM_LIMIT_{NAME}_RPS / _BURST / _CONCURRENCY 로 기본값을 덮어씀 (LLM_LIMIT_BACKEND=local 이면 Redis 미사용)"""
+        prefix = f"LLM_LIMIT_{name.upper()}"
+        use_redis = os.getenv("LLM_LIMIT_BACKEND", "redis").lower() == "redis"
+        return cls(
+            backend,
+            rate=float(os.getenv(f"{prefix}_RPS", str(rate))),
+            burst=int(os.getenv(f"{prefix}_BURST", str(burst))),
+            max_concurrent=int(os.getenv(f"{prefix}_CONCURRENCY", str(max_concurrent))),
+            max_wait=float(os.getenv("LLM_LIMIT_MAX_WAIT", "30")),
+            lease=float(os.getenv("LLM_LIMIT_LEASE", "300")),
+            client=get_state_client() if use_redis else None,
+        )
+
+    @property
+    def enabled(self) -> bool:
+        return self.rate > 0 or self.max_concurrent > 0
+
+    # --- 자리 받기 ---
+    async def _try_redis(self, agent: str, lease_id: str) -> Tuple[bool, int, str]:
+        p = self._prefix
+        ok, retry_ms, reason = await self._script(
+            keys=[f"{p}:bucket", f"{p}:slots", f"{p}:waiters", f"{p}:served", f"{p}:seq"],
+            args=[agent, lease_id, self.rate, self.burst, self.max_concurrent, int(self.lease * 1000), 1000],
+        )
+        return bool(ok), int(retry_ms), reason.decode() if isinstance(reason, bytes) else reason
+
+    def _try_local(self, agent: str) -> Tuple[bool, int, str]:
+        """_ACQUIRE_LUA와 같은 규칙의 프로세스 내부 버전"""
+        now = time.monotonic()
+        self._local_waiters = {a: exp for a, exp in self._local_waiters.items() if exp > now}
+        self._local_waiters[agent] = now + 1.0
+        turn = min(self._local_waiters, key=lambda a: self._local_served.get(a, 0))
+        if turn != agent:
+            return False, 20, "fair"
+        if self.max_concurrent > 0 and self._local_slots >= self.max_concurrent:
+            return False, 50, "concurrency"
+        if self.rate > 0:
+            self._local_tokens = min(self.burst, self._local_tokens + (now - self._local_ts) * self.rate)
+            self._local_ts = now
+            if self._local_tokens < 1:
+                return False, int((1 - self._local_tokens) * 1000 / self.rate) + 1, "rate"
+            self._local_tokens -= 1
+        self._local_slots += 1
+        self._local_waiters.pop(agent, None)
+        self._local_seq += 1
+        self._local_served[agent] = self._local_seq
+        return True, 0, "ok"
+
+    async def _try(self, agent: str, lease_id: str) -> Tuple[bool, int, str]:
+        if self._script is not None and time.monotonic() >= self._redis_retry_at:
+            try:
+                ok, retry_ms, reason = await self._try_redis(agent, lease_id)
+                if ok:
+                    self._held[lease_id] = True
+                return ok, retry_ms, reason
+            except Exception as e:
+                logger.warning(f"LLM 호출 제한 Redis 오류, 10초간 프로세스 내부 제한 사용: {e}")
+                self._redis_retry_at = time.monotonic() + 10.0
+        if self._script is not None:
+            self.counters["local_fallback"] += 1
+        ok, retry_ms, reason = self._try_local(agent)
+        if ok:
+            self._held[lease_id] = False
+        return ok, retry_ms, reason
+
+    async def acquire(self, agent: str) -> Optional[str]:
+        """자리를 받을 때까지 대기 후 lease_id 반환 (제한이 없으면 None)"""
+        if not self.enabled:
+            return None
+        lease_id = uuid4().hex
+        started = time.monotonic()
+        first_reason = None
+        while True:
+            ok, retry_ms, reason = await self._try(agent, lease_id)
+            if ok:
+                break
+            if first_reason is None:
+                first_reason = reason
+                self.counters["throttled"] += 1
+                self.counters[f"waited_{reason}"] += 1
+            waited = time.monotonic() - started
+            if waited + retry_ms / 1000 > self.max_wait:
+                self.counters["rejected"] += 1
+                raise LlmThrottled(self.backend, reason, waited)
+            # 공정 큐 순번은 자주 확인해야 하므로 최대 0.25초 간격으로 재시도 (jitter 포함)
+            await asyncio.sleep(min(retry_ms / 1000, 0.25) * random.uniform(0.8, 1.2))
+        self.counters["acquired"] += 1
+        self._waits.append(time.monotonic() - started)
+        if len(self._waits) > 1000:
+            self._waits = self._waits[-500:]
+        return lease_id
+
+    async def release(self, lease_id: Optional[str]) -> None:
+        if lease_id is None:
+            return
+        if self._held.pop(lease_id, False):
+            try:
+                await self.client.zrem(f"{self._prefix}:slots", lease_id)
+            except Exception as e:
+                logger.debug(f"LLM 호출 자리 반환 실패 (lease 만료로 정리됨): {e}")
+        else:
+            self._local_slots = max(0, self._local_slots - 1)
+
+    def _wait_ms(self, q: float) -> float:
+        waits = sorted(self._waits)
+        return round(waits[min(len(waits) - 1, int(q * len(waits)))] * 1000, 1) if waits else 0.0
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "rps": self.rate,
+            "burst": self.burst,
+            "max_concurrent": self.max_concurrent,
+            "shared": self.client is not None and time.monotonic() >= self._redis_retry_at,
+            "held": len(self._held),
+            **self.counters,
+            "wait_p50_ms": self._wait_ms(0.5),
+            "wait_p95_ms": self._wait_ms(0.95),
+        }
+
+
+_limiters: Dict[str, LlmRateLimiter] = {}
+
+
+def get_llm_limiter(name: str, backend: str, rate: float, burst: int, max_concurrent: int) -> LlmRateLimiter:
+    """백엔드별 제한기 (프로세스당 하나, 같은 백엔드를 쓰는 모델/에이전트가 공유)"""
+    if backend not in _limiters:
+        _limiters[backend] = LlmRateLimiter.from_env(name, backend, rate, burst, max_concurrent)
+    register_stats("llm_limiter", _all_stats)
+    return _limiters[backend]
+
+
+def _all_stats() -> Dict[str, Any]:
+    return {backend: limiter.stats() for backend, limiter in _limiters.items()}
+
+
+class RateLimitedLlm(BaseLlm):
+    """호출 전에 백엔드 제한기에서 자리를 받는 모델 래퍼 (model 이름은 원래 모델과 같음)"""
+
+    inner: BaseLlm
+    limiter: LlmRateLimiter
+
+    @property
+    def capabilities(self) -> LlmCapabilities:
+        return self.inner.capabilities
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        lease_id = await self.limiter.acquire(current_agent.get())
+        try:
+            async for response in self.inner.generate_content_async(llm_request, stream=stream):
+                yield response
+        finally:
+            # 취소되더라도 자리는 반환
+            await asyncio.shield(self.limiter.release(lease_id))
@@ -0,0 +1,250 @@
+"""
+Prometheus 지표 (모든 에이전트 공통 계측 모듈, GET /metrics)
+
+- add_metrics(app, agent): /metrics 라우트 + HTTP 요청 수/지연/처리 중 요청 수 미들웨어
+  (A2A POST는 JSON-RPC 메서드별, GET은 등록된 경로별로 집계)
+- MetricsPlugin: Runner 플러그인 → LLM 호출 지연/토큰 수(모델별), 툴 호출 지연/오류(툴별)
+  LLM 응답 캐시 적중은 실제 모델 호출이 아니므로 집계하지 않음 (플러그인 목록에서 llm_cache 뒤,
+  결과를 바꿔서 뒤 플러그인의 after_tool을 건너뛰게 하는 tool_shaping 앞에 둠)
+- tool_call(tool): 툴 실행 구간 (DataPart 직접 툴 호출도 같은 지표로 집계)
+- InstrumentedRedis: 툴 모듈의 Redis 클라이언트, 명령 수를 실행 중인 툴별로 집계 (파이프라인 포함)
+- track_task(agent): 실행 중인 A2A 태스크 수, admission 대기열 깊이는 utils.admission에서 기록
+- 에이전트 구분은 utils.llm_limiter.current_agent (host_all.py로 한 프로세스에 올려도 섞이지 않음)
+- PROMETHEUS_MULTIPROC_DIR: AGENT_WORKERS>1 일 때 워커 지표를 합산해서 반환 (serve()가 기동 시 디렉토리 정리)
+"""
+import atexit
+import os
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar, Token
+from typing import Any, Dict, Iterator, Optional, Set, Tuple
+
+import redis
+from google.adk.plugins.base_plugin import BasePlugin
+from prometheus_client import CONTENT_TYPE_LATEST, REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, generate_latest
+from prometheus_client import multiprocess
+from redis.client import Pipeline
+
+from utils.llm_limiter import current_agent
+
+# 지금 실행 중인 툴 (Redis 명령 집계용, 툴 밖이면 "none")
+current_tool: ContextVar[str] = ContextVar("current_tool", default="none")
+
+HTTP_BUCKETS = (0.01, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60, 120)
+LLM_BUCKETS = (0.1, 0.25, 0.5, 1, 2, 4, 8, 15, 30, 60, 120)
+TOOL_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30)
+# 라벨 값이 클라이언트 입력으로 무한히 늘지 않도록 A2A 메서드만 그대로 쓰고 나머지는 other
+A2A_METHODS = {
+    "message/send", "message/stream", "tasks/get", "tasks/cancel", "tasks/resubscribe",
+    "tasks/pushNotificationConfig/set", "tasks/pushNotificationConfig/get",
+    "tasks/pushNotificationConfig/list", "tasks/pushNotificationConfig/delete",
+    "agent/getAuthenticatedExtendedCard",
+}
+
+HTTP_REQUESTS = Counter("agent_http_requests_total", "HTTP 요청 수", ["agent", "method", "status"])
+HTTP_LATENCY = Histogram(
+    "agent_http_request_duration_seconds", "HTTP 요청 처리 시간 (SSE는 스트림 종료까지)",
+    ["agent", "method"], buckets=HTTP_BUCKETS,
+)
+HTTP_IN_FLIGHT = Gauge("agent_http_requests_in_flight", "처리 중인 HTTP 요청 수", ["agent"], multiprocess_mode="livesum")
+TASKS_IN_FLIGHT = Gauge("agent_tasks_in_flight", "실행 중인 A2A 태스크 수", ["agent"], multiprocess_mode="livesum")
+QUEUE_DEPTH = Gauge(
+    "agent_admission_queue_depth", "입장 대기열에서 기다리는 요청 수", ["agent", "lane"], multiprocess_mode="livesum"
+)
+LLM_LATENCY = Histogram("llm_request_duration_seconds", "LLM 호출 시간", ["agent", "model"], buckets=LLM_BUCKETS)
+LLM_ERRORS = Counter("llm_request_errors_total", "LLM 호출 오류 수", ["agent", "model"])
+LLM_TOKENS = Counter("llm_tokens_total", "LLM 토큰 수 (prompt / completion)", ["agent", "model", "type"])
+TOOL_LATENCY = Histogram("tool_call_duration_seconds", "툴 실행 시간", ["agent", "tool"], buckets=TOOL_BUCKETS)
+TOOL_ERRORS = Counter("tool_call_errors_total", "툴 실행 오류 수", ["agent", "tool"])
+REDIS_COMMANDS = Counter("redis_commands_total", "툴 모듈 Redis 명령 수", ["agent", "tool", "command"])
+
+
+def _count_redis(command: Any) -> None:
+    name = command.decode() if isinstance(command, bytes) else str(command)
+    REDIS_COMMANDS.labels(current_agent.get(), current_tool.get(), name.split(" ")[0].upper()).inc()
+
+
+class _InstrumentedPipeline(Pipeline):
+    def execute(self, raise_on_error: bool = True):
+        for args, _ in self.command_stack:
+            _count_redis(args[0])
+        return super().execute(raise_on_error)
+
+
+class InstrumentedRedis(redis.Redis):
+    """명령 수를 실행 중인 툴별로 세는 동기 Redis 클라이언트 (툴 모듈용, redis.Redis와 같은 인자)"""
+
+    def execute_command(self, *args, **options):
+        _count_redis(args[0])
+        return super().execute_command(*args, **options)
+
+    def pipeline(self, transaction: bool = True, shard_hint: Optional[str] = None) -> Pipeline:
+        return _InstrumentedPipeline(self.connection_pool, self.response_callbacks, transaction, shard_hint)
+
+
+@contextmanager
+def tool_call(tool: str) -> Iterator[None]:
+    """툴 실행 구간: 지연/오류 기록 + 안에서 실행되는 Redis 명령을 이 툴로 집계"""
+    agent = current_agent.get()
+    token = current_tool.set(tool)
+    started = time.perf_counter()
+    try:
+        yield
+    except Exception:
+        TOOL_ERRORS.labels(agent, tool).inc()
+        raise
+    finally:
+        TOOL_LATENCY.labels(agent, tool).observe(time.perf_counter() - started)
+        current_tool.reset(token)
+
+
+@contextmanager
+def track_task(agent: str) -> Iterator[None]:
+    gauge = TASKS_IN_FLIGHT.labels(agent)
+    gauge.inc()
+    try:
+        yield
+    finally:
+        gauge.dec()
+
+
+class MetricsPlugin(BasePlugin):
+    """LLM 호출/툴 호출을 Prometheus 지표로 기록하는 Runner 플러그인"""
+
+    def __init__(self):
+        super().__init__(name="metrics")
+        self._llm_started: Dict[str, Tuple[float, str]] = {}  # invocation_id → (시작 시각, 요청 모델)
+        # function_call_id → (시작 시각, current_tool 토큰)
+        self._tool_started: Dict[str, Tuple[float, Token]] = {}
+
+    async def before_model_callback(self, *, callback_context, llm_request) -> None:
+        self._llm_started[callback_context.invocation_id] = (time.perf_counter(), llm_request.model or "unknown")
+        return None
+
+    async def after_model_callback(self, *, callback_context, llm_response) -> None:
+        if llm_response.partial:
+            return None
+        entry = self._llm_started.pop(callback_context.invocation_id, None)
+        if entry is None:
+            return None
+        started, model = entry
+        # 라우터/티어 모델이면 실제로 응답한 백엔드 모델 이름 (model_version)
+        model = llm_response.model_version or model
+        agent = callback_context.agent_name
+        LLM_LATENCY.labels(agent, model).observe(time.perf_counter() - started)
+        usage = llm_response.usage_metadata
+        if usage is not None:
+            LLM_TOKENS.labels(agent, model, "prompt").inc(usage.prompt_token_count or 0)
+            LLM_TOKENS.labels(agent, model, "completion").inc(usage.candidates_token_count or 0)
+        return None
+
+    async def on_model_error_callback(self, *, callback_context, llm_request, error) -> None:
+        entry = self._llm_started.pop(callback_context.invocation_id, None)
+        model = entry[1] if entry else (llm_request.model or "unknown")
+        LLM_ERRORS.labels(callback_context.agent_name, model).inc()
+        if entry is not None:
+            LLM_LATENCY.labels(callback_context.agent_name, model).observe(time.perf_counter() - entry[0])
+        return None
+
+    async def before_tool_callback(self, *, tool, tool_args, tool_context) -> None:
+        # 툴 함수는 이 콜백과 같은 컨텍스트(또는 그 복사본 스레드)에서 실행됨
+        token = current_tool.set(tool.name)
+        self._tool_started[tool_context.function_call_id] = (time.perf_counter(), token)
+        return None
+
+    def _finish_tool(self, tool, tool_context, failed: bool) -> None:
+        entry = self._tool_started.pop(tool_context.function_call_id, None)
+        agent = tool_context.agent_name
+        if failed:
+            TOOL_ERRORS.labels(agent, tool.name).inc()
+        if entry is None:
+            return
+        started, token = entry
+        # 이전 값으로 되돌림 (중첩 호출이어도 바깥 툴 이름이 유지됨)
+        try:
+            current_tool.reset(token)
+        except ValueError:
+            # 다른 컨텍스트에서 만든 토큰 → 이 컨텍스트의 값만 정리
+            current_tool.set("none")
+        TOOL_LATENCY.labels(agent, tool.name).observe(time.perf_counter() - started)
+
+    async def after_tool_callback(self, *, tool, tool_args, tool_context, result) -> None:
+        self._finish_tool(tool, tool_context, failed=isinstance(result, dict) and result.get("status") == "error")
+        return None
+
+    async def on_tool_error_callback(self, *, tool, tool_args, tool_context, error) -> None:
+        self._finish_tool(tool, tool_context, failed=True)
+        return None
+
+
+class MetricsMiddleware:
+    """
+    HTTP 요청 수/지연/처리 중 요청 수 (admission보다 바깥에 두어 대기 시간과 429도 포함)
+    A2A POST의 JSON-RPC 메서드는 본문을 다시 읽지 않고 admission 미들웨어가 scope에 남긴 값을 사용
+    """
+
+    def __init__(self, app, agent: str):
+        self.app = app
+        self.agent = agent
+        self._paths: Optional[Set[str]] = None
+
+    def _label(self, scope) -> str:
+        rpc_method = scope.get("state", {}).get("rpc_method")
+        if rpc_method:
+            return rpc_method if rpc_method in A2A_METHODS else "other"
+        if self._paths is None:
+            routes = getattr(scope.get("app"), "routes", [])
+            self._paths = {getattr(route, "path", "") for route in routes}
+        path = scope.get("path", "")
+        return f"{scope['method']} {path if path in self._paths else 'other'}"
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = {"code": 500}
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status["code"] = message["status"]
+            await send(message)
+
+        token = current_agent.set(self.agent)
+        in_flight = HTTP_IN_FLIGHT.labels(self.agent)
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            in_flight.dec()
+            method = self._label(scope)
+            HTTP_LATENCY.labels(self.agent, method).observe(time.perf_counter() - started)
+            HTTP_REQUESTS.labels(self.agent, method, str(status["code"])).inc()
+            current_agent.reset(token)
+
+
+if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+    # 종료한 워커의 gauge(처리 중 요청 수 등)가 합산에 남지 않도록 정리
+    atexit.register(multiprocess.mark_process_dead, os.getpid())
+
+
+def _registry():
+    if os.getenv("PROMETHEUS_MULTIPROC_DIR"):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return registry
+    return REGISTRY
+
+
+async def metrics_endpoint(request) -> Any:
+    """Starlette 라우트 핸들러: GET /metrics (Prometheus text format)"""
+    from starlette.responses import Response
+
+    return Response(generate_latest(_registry()), media_type=CONTENT_TYPE_LATEST)
+
+
+def add_metrics(app, agent: str) -> None:
+    """앱에 /metrics 라우트와 HTTP 지표 미들웨어를 붙임 (add_admission_control 다음에 호출해야 바깥에서 측정)"""
+    app.add_route("/metrics", metrics_endpoint, methods=["GET"])
+    app.add_middleware(MetricsMiddleware, agent=agent)
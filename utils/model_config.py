@@ -1,11 +1,22 @@
 """
 모델 설정 및 fallback 로직을 담당하는 유틸리티 모듈
 """
+import importlib
 import os
 import logging
-from typing import Optional, Any
+import re
+import sys
+import time
+from typing import Optional, Any, List, Tuple
+import httpx
 from dotenv import load_dotenv, find_dotenv
-from google.adk.models.lite_llm import LiteLlm
+from google.adk.models.base_llm import BaseLlm
+from google.adk.models.google_llm import Gemini
+from google.adk.models.registry import LLMRegistry
+from utils.llm_limiter import RateLimitedLlm, get_llm_limiter
+from utils.model_router import ModelBackend, ModelRouter, RoutedLlm
+from utils.model_tiers import SYNTHESIZER, TieredLlm
+from utils.runtime_stats import register_stats
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +44,8 @@ def load_env_from_root():
 
 # 모듈 로드시 자동으로 .env 파일 로드 (Docker 환경에서는 선택적)
 load_env_from_root()
+# litellm import 시 원격 모델 가격표를 받느라 기동이 느려지지 않도록 패키지에 포함된 가격표 사용
+os.environ.setdefault("LITELLM_LOCAL_MODEL_COST_MAP", "True")
 
 def get_model_with_fallback() -> Any:
     """
@@ -54,8 +67,12 @@ def get_model_with_fallback() -> Any:
             
             # Gemini 모델 사용 - Google ADK 문서에 따라 직접 문자열로 전달
             model_name = get_gemini_model("gemini-2.0-flash")
+            # 로컬 LLM도 쓸 수 있으면 런타임 라우터로 감싸서 장애/지연 시 자동 전환
+            if fallback_to_local and os.getenv("MODEL_ROUTER_ENABLED", "true").lower() == "true":
+                logger.info(f"모델 라우터 사용: {model_name} → 로컬 LLM")
+                return get_routed_model(model_name)
             logger.info(f"Gemini 모델을 사용합니다: {model_name}")
-            return model_name
+            return limit_llm(LLMRegistry.new_llm(model_name))
             
         except Exception as e:
             logger.error(f"Gemini 모델 설정 실패: {e}")
@@ -68,16 +85,204 @@ def get_model_with_fallback() -> Any:
         logger.info("USE_GEMINI가 false로 설정되어 있습니다. 로컬 LLM을 사용합니다.")
         return get_local_model()
 
-def get_local_model() -> LiteLlm:
+def get_local_model() -> BaseLlm:
     """
     로컬 Ollama 모델 인스턴스 반환
     """
-    ollama_host = os.getenv("OLLAMA_HOST", "localhost")
-    return LiteLlm(
+    from google.adk.models.lite_llm import LiteLlm
+
+    return limit_llm(LiteLlm(
         model="ollama_chat/gpt-oss:20b",
-        api_base=f"http://{ollama_host}:11434",
+        api_base=_ollama_api_base(),
         temperature=0.7,
+    ))
+
+def _ollama_api_base() -> str:
+    return f"http://{os.getenv('OLLAMA_HOST', 'localhost')}:11434"
+
+
+def limit_llm(llm: BaseLlm) -> BaseLlm:
+    """
+    Gemini/Ollama 모델을 백엔드 공유 호출 제한(utils.llm_limiter)으로 감쌈 (기본은 끔, LLM_LIMIT_ENABLED=true 일 때만)
+    - 아래 기본값은 켰을 때만 적용되며 실제 키의 쿼터에 맞게 LLM_LIMIT_* 로 조정
+    - gemini: 같은 API 키를 쓰는 모든 에이전트가 초당 요청 수/동시 호출 수를 나눠 씀
+    - ollama: 같은 Ollama 호스트의 동시 호출 수를 제한 (CPU 서버 과부하 방지)
+    - 그 밖의 LiteLLM 공급자(openai/..., anthropic/...): 공급자별 제한기, LLM_LIMIT_{공급자}_* 를 지정했을 때만 제한
+    """
+    if os.getenv("LLM_LIMIT_ENABLED", "false").lower() != "true":
+        return llm
+    if llm.model.startswith("gemini"):
+        limiter = get_llm_limiter("gemini", "gemini", rate=2.0, burst=10, max_concurrent=8)
+    elif llm.model.startswith("ollama"):
+        limiter = get_llm_limiter("ollama", f"ollama:{os.getenv('OLLAMA_HOST', 'localhost')}", 0.0, 1, 2)
+    elif "/" in llm.model:
+        provider = llm.model.split("/", 1)[0]
+        limiter = get_llm_limiter(re.sub(r"\W", "_", provider), provider, 0.0, 1, 0)
+    else:
+        return llm
+    return RateLimitedLlm(model=llm.model, inner=llm, limiter=limiter) if limiter.enabled else llm
+
+_router: Optional[ModelRouter] = None
+
+
+def get_routed_model(gemini_model: str = "gemini-2.0-flash") -> RoutedLlm:
+    """
+    Gemini(우선) + 로컬 LLM을 묶은 라우터 모델 반환 (프로세스당 라우터 하나를 모든 에이전트가 공유)
+    """
+    global _router
+    if _router is None:
+        _router = ModelRouter.from_env([
+            ModelBackend("gemini", limit_llm(Gemini(model=gemini_model)), probe=_gemini_probe(gemini_model)),
+            ModelBackend("local", get_local_model(), probe=_ollama_probe(_ollama_api_base())),
+        ])
+    register_stats("model_router", _router.stats)
+    return RoutedLlm(model=f"routed/{gemini_model}", router=_router)
+
+
+def _gemini_probe(model_name: str):
+    """모델 메타데이터 조회로 API 도달 여부 확인 (토큰 소비 없음, Vertex AI는 생략)"""
+    if os.getenv("GOOGLE_GENAI_USE_VERTEXAI", "FALSE").upper() == "TRUE":
+        return None
+
+    async def probe() -> None:
+        async with httpx.AsyncClient(timeout=5.0) as client:
+            response = await client.get(
+                f"https://generativelanguage.googleapis.com/v1beta/models/{model_name}",
+                headers={"x-goog-api-key": os.getenv("GOOGLE_API_KEY", "")},
+            )
+            response.raise_for_status()
+
+    return probe
+
+
+def _ollama_probe(api_base: str):
+    async def probe() -> None:
+        async with httpx.AsyncClient(timeout=5.0) as client:
+            response = await client.get(f"{api_base}/api/tags")
+            response.raise_for_status()
+
+    return probe
+
+
+def _is_lite_llm(llm: BaseLlm) -> bool:
+    # lite_llm 모듈이 아직 로드되지 않았으면 LiteLlm 인스턴스도 없음 (확인하려고 import하지 않음)
+    module = sys.modules.get("google.adk.models.lite_llm")
+    return module is not None and isinstance(llm, module.LiteLlm)
+
+
+def _model_parts(model: Any) -> Tuple[List[ModelRouter], List[Tuple[BaseLlm, bool]]]:
+    """티어/라우터/호출 제한 래퍼를 풀어 (라우터 목록, [(실제 모델, 라우터 소속 여부)]) 반환"""
+    routers: List[ModelRouter] = []
+    leaves: List[Tuple[BaseLlm, bool]] = []
+
+    def walk(llm: Any, routed: bool) -> None:
+        if isinstance(llm, TieredLlm):
+            walk(llm.planner, routed)
+            walk(llm.synthesizer, routed)
+        elif isinstance(llm, RoutedLlm):
+            if all(r is not llm.router for r in routers):
+                routers.append(llm.router)
+                for backend in llm.router.backends:
+                    walk(backend.llm, True)
+        elif isinstance(llm, RateLimitedLlm):
+            walk(llm.inner, routed)
+        elif isinstance(llm, BaseLlm) and all(l is not llm for l, _ in leaves):
+            leaves.append((llm, routed))
+
+    walk(model, False)
+    return routers, leaves
+
+
+def preload_model_clients(model: Any) -> None:
+    """
+    첫 요청이 LLM 클라이언트 초기화를 기다리지 않도록 앱 팩토리에서 미리 준비 (이벤트 루프 시작 전, 동기)
+    - LiteLlm: 첫 호출 때 로드되는 litellm 패키지(수 초) import
+      (스레드로 돌리면 import 중 설치되는 litellm 로깅 필터가 메인 스레드 import와 엉켜 멈출 수 있음)
+    - Gemini: genai 클라이언트 생성
+    """
+    _, leaves = _model_parts(model)
+    if any(_is_lite_llm(llm) for llm, _ in leaves):
+        importlib.import_module("litellm")
+    for llm, _ in leaves:
+        if isinstance(llm, Gemini):
+            _ = llm.api_client  # cached_property: 첫 호출 때 만들어지는 genai 클라이언트
+
+
+async def warm_model(model: Any) -> None:
+    """
+    LLM 백엔드에 닿는지 확인 (readiness 필수 점검, 실패 시 예외)
+    - 라우터: 모든 백엔드 헬스 체크 후 정상 백엔드가 하나도 없으면 실패 (결과는 라우터 순서에도 반영)
+    - 라우터 밖의 단일 Gemini/Ollama 모델은 각자 프로브
+    """
+    routers, leaves = _model_parts(model)
+    for router in routers:
+        await router.probe_all()
+        if not any(b.healthy(time.monotonic()) for b in router.backends):
+            raise RuntimeError(
+                "모든 모델 백엔드 헬스 체크 실패: "
+                + ", ".join(f"{b.name}({b.last_error})" for b in router.backends)
+            )
+    for llm, routed in leaves:
+        if routed:
+            continue
+        if isinstance(llm, Gemini):
+            probe = _gemini_probe(llm.model)
+        elif _is_lite_llm(llm) and llm.model.startswith("ollama"):
+            probe = _ollama_probe(_ollama_api_base())
+        else:
+            probe = None
+        if probe is not None:
+            await probe()
+
+
+def get_tier_model_spec(agent: str, role: str) -> str:
+    """
+    역할별 모델 설정: MODEL_TIER_{AGENT}_{ROLE} → MODEL_TIER_{ROLE} 순서 (비어 있거나 default면 기본 모델)
+    예) MODEL_TIER_TOOL_CALLER=ollama_chat/qwen2.5:3b, MODEL_TIER_ORCHESTRATOR_ROUTER=gemini-2.0-flash-lite
+    """
+    role_key = role.upper()
+    spec = os.getenv(f"MODEL_TIER_{agent.upper()}_{role_key}") or os.getenv(f"MODEL_TIER_{role_key}", "")
+    return "" if spec.strip().lower() == "default" else spec.strip()
+
+
+def _llm_from_spec(spec: str, default: Any) -> BaseLlm:
+    """모델 설정 문자열 → ADK 모델 (ollama_chat/... 은 LiteLlm, gemini-... 은 ADK 레지스트리)"""
+    model = spec or default
+    if isinstance(model, BaseLlm):
+        return model
+    from google.adk.models.lite_llm import LiteLlm
+
+    if model.startswith("ollama"):
+        return limit_llm(LiteLlm(model=model, api_base=_ollama_api_base(), temperature=0.7))
+    if "/" in model:
+        return limit_llm(LiteLlm(model=model))
+    return limit_llm(LLMRegistry.new_llm(model))
+
+
+def get_tiered_model(agent: str, planner_role: str = "tool_caller") -> Any:
+    """
+    에이전트용 모델 반환. 역할별 티어 설정이 없으면 get_model_with_fallback()과 같음
+    - planner_role: 툴 결과 전 단계의 역할 (오케스트레이터는 router, 하위 에이전트는 tool_caller)
+    """
+    default = get_model_with_fallback()
+    planner_spec = get_tier_model_spec(agent, planner_role)
+    synthesizer_spec = get_tier_model_spec(agent, SYNTHESIZER)
+    if not planner_spec and not synthesizer_spec:
+        return default
+
+    planner = _llm_from_spec(planner_spec, default)
+    synthesizer = _llm_from_spec(synthesizer_spec, default)
+    tiered = TieredLlm(
+        model=f"tiered/{planner.model}+{synthesizer.model}",
+        planner=planner,
+        synthesizer=synthesizer,
+        planner_role=planner_role,
+        escalate_text=os.getenv("MODEL_TIER_ESCALATE_TEXT", "true").lower() == "true",
     )
+    logger.info(f"{agent} 모델 티어: {planner_role}={planner.model}, {SYNTHESIZER}={synthesizer.model}")
+    register_stats("model_tiers", tiered.stats)
+    return tiered
+
 
 def get_gemini_model(model_name: str = "gemini-2.0-flash") -> str:
     """
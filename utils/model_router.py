@@ -0,0 +1,293 @@
+"""
+런타임 모델 라우터 (Gemini ↔ 로컬 LLM 자동 전환)
+
+- 백엔드마다 첫 응답까지 지연(EWMA, 스트리밍/비스트리밍 따로)과 오류율(EWMA)을 기록
+- 요청마다 건강한 백엔드 중 점수(지연 × 오류 가중치, 보조 백엔드는 페널티)가 가장 낮은 것부터 시도
+- 응답 전에 실패하면 다음 백엔드로 바로 재시도(failover). 연속 실패 또는 429면 cooldown 동안 제외
+- 백그라운드 헬스 체크가 내려간 백엔드를 먼저 제외하고, 복구되면 다시 포함(failback)
+- 헤징: 첫 응답이 평소 지연의 몇 배를 넘기면 다음 백엔드에도 같은 요청을 보내 먼저 온 쪽을 사용
+- 프로세스당 라우터 하나를 모든 에이전트가 공유 (host_all.py에서는 5개 에이전트가 같은 통계를 씀)
+"""
+import asyncio
+import logging
+import os
+import time
+from dataclasses import dataclass, field
+from typing import Any, AsyncGenerator, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from google.adk.models.base_llm import BaseLlm, LlmCapabilities
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+
+logger = logging.getLogger(__name__)
+
+Probe = Callable[[], Awaitable[None]]
+
+
+def _status_code(exc: BaseException) -> Optional[int]:
+    for attr in ("code", "status_code"):
+        value = getattr(exc, attr, None)
+        if isinstance(value, int):
+            return value
+    return None
+
+
+@dataclass
+class ModelBackend:
+    name: str
+    llm: BaseLlm
+    probe: Optional[Probe] = None  # 예외 없이 끝나면 정상
+    latency: Dict[bool, float] = field(default_factory=dict)  # stream 여부 → 첫 응답 지연 EWMA(초)
+    error_rate: float = 0.0
+    consecutive_failures: int = 0
+    open_until: float = 0.0
+    open_reason: str = ""
+    counters: Dict[str, int] = field(default_factory=lambda: {
+        "requests": 0, "successes": 0, "failures": 0, "rate_limited": 0, "throttled": 0, "hedge_wins": 0,
+        "probe_failures": 0,
+    })
+    last_error: str = ""
+
+    def healthy(self, now: float) -> bool:
+        return self.open_until <= now
+
+    def stats(self, now: float) -> Dict[str, Any]:
+        return {
+            "model": self.llm.model,
+            "healthy": self.healthy(now),
+            "open_reason": self.open_reason if not self.healthy(now) else "",
+            "latency_ms": {("stream" if k else "unary"): round(v * 1000, 1) for k, v in self.latency.items()},
+            "error_rate": round(self.error_rate, 4),
+            **self.counters,
+            "last_error": self.last_error,
+        }
+
+
+class ModelRouter:
+    def __init__(
+        self,
+        backends: List[ModelBackend],
+        alpha: float = 0.2,
+        failure_threshold: int = 3,
+        cooldown: float = 30.0,
+        fallback_penalty: float = 1.5,
+        hedge: bool = True,
+        hedge_factor: float = 3.0,
+        hedge_min_delay: float = 2.0,
+        probe_interval: float = 15.0,
+    ):
+        if not backends:
+            raise ValueError("ModelRouter에는 백엔드가 하나 이상 필요합니다.")
+        self.backends = backends
+        self.alpha = alpha
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.fallback_penalty = fallback_penalty
+        self.hedge = hedge and len(backends) > 1
+        self.hedge_factor = hedge_factor
+        self.hedge_min_delay = hedge_min_delay
+        self.probe_interval = probe_interval
+        self._prober: Optional[asyncio.Task] = None
+        self.counters: Dict[str, int] = {"requests": 0, "failovers": 0, "hedges": 0, "exhausted": 0}
+
+    @classmethod
+    def from_env(cls, backends: List[ModelBackend]) -> "ModelRouter":
+        return cls(
+            backends,
+            failure_threshold=int(os.getenv("MODEL_ROUTER_FAILURE_THRESHOLD", "3")),
+            cooldown=float(os.getenv("MODEL_ROUTER_COOLDOWN", "30")),
+            fallback_penalty=float(os.getenv("MODEL_ROUTER_FALLBACK_PENALTY", "1.5")),
+            hedge=os.getenv("MODEL_ROUTER_HEDGE", "true").lower() == "true",
+            hedge_factor=float(os.getenv("MODEL_ROUTER_HEDGE_FACTOR", "3")),
+            hedge_min_delay=float(os.getenv("MODEL_ROUTER_HEDGE_MIN_DELAY", "2")),
+            probe_interval=float(os.getenv("MODEL_ROUTER_PROBE_INTERVAL", "15")),
+        )
+
+    # --- 상태 기록 ---
+    def _record_success(self, backend: ModelBackend, stream: bool, latency: float) -> None:
+        previous = backend.latency.get(stream)
+        backend.latency[stream] = latency if previous is None else previous + self.alpha * (latency - previous)
+        backend.error_rate *= 1 - self.alpha
+        backend.consecutive_failures = 0
+        backend.counters["successes"] += 1
+        if backend.open_until:
+            logger.info(f"모델 백엔드 복구: {backend.name}")
+            backend.open_until, backend.open_reason = 0.0, ""
+
+    def _record_failure(self, backend: ModelBackend, exc: BaseException) -> None:
+        if getattr(exc, "throttled", False):
+            # 호출 전 제한(utils.llm_limiter)에 걸린 것 → 백엔드 상태는 그대로 두고 이번 요청만 넘김
+            backend.counters["throttled"] += 1
+            return
+        backend.error_rate += self.alpha * (1 - backend.error_rate)
+        backend.consecutive_failures += 1
+        backend.counters["failures"] += 1
+        backend.last_error = f"{type(exc).__name__}: {exc}"[:200]
+        if _status_code(exc) == 429:
+            backend.counters["rate_limited"] += 1
+            self._open(backend, "rate_limited")
+        elif backend.consecutive_failures >= self.failure_threshold:
+            self._open(backend, "errors")
+
+    def _open(self, backend: ModelBackend, reason: str) -> None:
+        if backend.healthy(time.monotonic()):
+            logger.warning(f"모델 백엔드 제외 ({reason}, {self.cooldown:.0f}초): {backend.name} - {backend.last_error}")
+        backend.open_until = time.monotonic() + self.cooldown
+        backend.open_reason = reason
+
+    # --- 선택 ---
+    def candidates(self, stream: bool) -> List[ModelBackend]:
+        """시도 순서: 건강한 백엔드(점수순) → 제외된 백엔드(설정 순서, 최후 수단)"""
+        now = time.monotonic()
+
+        def score(item: Tuple[int, ModelBackend]) -> float:
+            index, backend = item
+            latency = backend.latency.get(stream)
+            if latency is None:  # 아직 측정 전이면 우선 백엔드만 먼저 시도
+                return 0.0 if index == 0 else float("inf")
+            return latency * (1 + 4 * backend.error_rate) * (1.0 if index == 0 else self.fallback_penalty)
+
+        indexed = list(enumerate(self.backends))
+        healthy = sorted((i for i in indexed if i[1].healthy(now)), key=lambda i: (score(i), i[0]))
+        return [b for _, b in healthy] + [b for b in self.backends if not b.healthy(now)]
+
+    def _hedge_delay(self, backend: ModelBackend, stream: bool) -> Optional[float]:
+        if not self.hedge:
+            return None
+        latency = backend.latency.get(stream)
+        return max(self.hedge_min_delay, self.hedge_factor * latency) if latency is not None else None
+
+    # --- 요청 ---
+    async def _pump(self, backend: ModelBackend, request: LlmRequest, stream: bool, queue: asyncio.Queue) -> None:
+        try:
+            async for response in backend.llm.generate_content_async(request, stream=stream):
+                await queue.put((backend, "response", response))
+            await queue.put((backend, "done", None))
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            await queue.put((backend, "error", e))
+
+    async def generate(self, llm_request: LlmRequest, stream: bool = False) -> AsyncGenerator[LlmResponse, None]:
+        self._ensure_prober()
+        self.counters["requests"] += 1
+        remaining = self.candidates(stream)
+        queue: asyncio.Queue = asyncio.Queue()
+        running: Dict[str, Tuple[asyncio.Task, float]] = {}
+
+        def launch() -> ModelBackend:
+            backend = remaining.pop(0)
+            request = llm_request.model_copy(deep=True)  # 백엔드가 요청을 수정하므로 시도마다 복사
+            request.model = backend.llm.model
+            backend.counters["requests"] += 1
+            running[backend.name] = (asyncio.create_task(self._pump(backend, request, stream, queue)), time.monotonic())
+            return backend
+
+        first = launch()
+        winner: Optional[ModelBackend] = None
+        try:
+            while True:
+                timeout = None
+                if winner is None and remaining and len(running) == 1 and first.name in running:
+                    delay = self._hedge_delay(first, stream)
+                    if delay is not None:
+                        timeout = max(0.0, running[first.name][1] + delay - time.monotonic())
+                try:
+                    backend, kind, payload = await asyncio.wait_for(queue.get(), timeout)
+                except asyncio.TimeoutError:
+                    hedged = launch()
+                    self.counters["hedges"] += 1
+                    logger.info(f"모델 헤징: {first.name} 응답 지연 → {hedged.name} 동시 요청")
+                    continue
+                if winner is not None and backend is not winner:
+                    continue
+                if kind == "error":
+                    running.pop(backend.name, None)
+                    self._record_failure(backend, payload)
+                    if winner is not None:
+                        raise payload  # 응답 도중 실패는 다른 백엔드로 이어 붙일 수 없음
+                    if running:
+                        continue  # 헤징 중인 다른 백엔드 응답을 기다림
+                    if remaining:
+                        self.counters["failovers"] += 1
+                        logger.warning(f"모델 failover: {backend.name} 실패 ({payload}) → {remaining[0].name}")
+                        first = launch()
+                        continue
+                    self.counters["exhausted"] += 1
+                    raise payload
+                if winner is None:
+                    winner = backend
+                    self._record_success(backend, stream, time.monotonic() - running[backend.name][1])
+                    if len(running) > 1:
+                        if backend is not first:
+                            backend.counters["hedge_wins"] += 1
+                        for name, (task, _) in list(running.items()):
+                            if name != backend.name:
+                                task.cancel()
+                                running.pop(name)
+                if kind == "done":
+                    return
+                yield payload
+        finally:
+            for task, _ in running.values():
+                task.cancel()
+
+    # --- 헬스 체크 ---
+    def _ensure_prober(self) -> None:
+        if self._prober is None and self.probe_interval > 0 and any(b.probe for b in self.backends):
+            self._prober = asyncio.get_running_loop().create_task(self._probe_loop())
+
+    async def probe_all(self) -> None:
+        for backend in self.backends:
+            if backend.probe is None:
+                continue
+            try:
+                await asyncio.wait_for(backend.probe(), timeout=5.0)
+            except Exception as e:
+                backend.counters["probe_failures"] += 1
+                backend.last_error = f"probe: {type(e).__name__}: {e}"[:200]
+                self._open(backend, "probe")
+                continue
+            # 헬스 체크 성공은 오류/프로브로 제외된 백엔드만 복구 (429는 cooldown까지 기다림)
+            if not backend.healthy(time.monotonic()) and backend.open_reason in ("errors", "probe"):
+                logger.info(f"모델 백엔드 헬스 체크 통과, 복구: {backend.name}")
+                backend.open_until, backend.open_reason = 0.0, ""
+                backend.consecutive_failures = 0
+
+    async def _probe_loop(self) -> None:
+        while True:
+            try:
+                await self.probe_all()
+            except Exception as e:
+                logger.warning(f"모델 헬스 체크 오류: {e}")
+            await asyncio.sleep(self.probe_interval)
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.monotonic()
+        return {
+            **self.counters,
+            "order": {
+                "unary": [b.name for b in self.candidates(False)],
+                "stream": [b.name for b in self.candidates(True)],
+            },
+            "backends": {b.name: b.stats(now) for b in self.backends},
+        }
+
+
+class RoutedLlm(BaseLlm):
+    """ModelRouter를 통해 호출하는 ADK 모델 (LlmAgent(model=...)에 그대로 전달)"""
+
+    router: ModelRouter
+
+    @property
+    def capabilities(self) -> LlmCapabilities:
+        # 어느 백엔드로 가도 동작하도록 공통으로 지원하는 기능만 보고
+        return LlmCapabilities(
+            output_schema_and_tools=all(b.llm.capabilities.output_schema_and_tools for b in self.router.backends)
+        )
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        async for response in self.router.generate(llm_request, stream=stream):
+            yield response
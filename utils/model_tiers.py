@@ -0,0 +1,114 @@
+"""
+역할별 모델 티어 (작은 모델로 라우팅/툴 선택, 큰 모델로 최종 답변)
+
+- 이번 턴에 아직 툴 결과가 없는 요청 → planner 역할(오케스트레이터: router, 하위 에이전트: tool_caller)
+  어떤 에이전트/툴을 부를지 고르는 분류 작업이라 작고 빠른 모델로 충분
+- 마지막 내용이 툴 결과(function_response)인 요청 → synthesizer 역할 (큰 모델이 답변 작성/추가 툴 호출)
+- planner가 툴을 부르지 않고 바로 답하면 그 답은 버리고 synthesizer에게 다시 요청 (escalate_text)
+- planner 모델이 실패하면 synthesizer로 대신 처리 (단, 응답을 이미 내보내기 시작했다면 재시도하지 않고 오류 전달)
+"""
+import logging
+import time
+from typing import Any, AsyncGenerator, Dict, List
+
+from google.adk.models.base_llm import BaseLlm, LlmCapabilities
+from google.adk.models.llm_request import LlmRequest
+from google.adk.models.llm_response import LlmResponse
+from pydantic import PrivateAttr
+
+logger = logging.getLogger(__name__)
+
+SYNTHESIZER = "synthesizer"
+
+
+def request_role(llm_request: LlmRequest, planner_role: str) -> str:
+    for content in reversed(llm_request.contents or []):
+        if content.parts:
+            return SYNTHESIZER if any(p.function_response for p in content.parts) else planner_role
+    return planner_role
+
+
+def _has_function_call(responses: List[LlmResponse]) -> bool:
+    return any(
+        part.function_call
+        for response in responses
+        for part in (response.content.parts if response.content else None) or []
+    )
+
+
+class TieredLlm(BaseLlm):
+    """요청마다 역할을 판단해 planner/synthesizer 모델 중 하나로 호출하는 ADK 모델"""
+
+    planner: BaseLlm
+    synthesizer: BaseLlm
+    planner_role: str = "tool_caller"
+    escalate_text: bool = True
+
+    _counters: Dict[str, Dict[str, float]] = PrivateAttr(default_factory=dict)
+
+    @property
+    def capabilities(self) -> LlmCapabilities:
+        return LlmCapabilities(
+            output_schema_and_tools=(
+                self.planner.capabilities.output_schema_and_tools
+                and self.synthesizer.capabilities.output_schema_and_tools
+            )
+        )
+
+    def _count(self, role: str, key: str, value: float = 1) -> None:
+        counters = self._counters.setdefault(role, {"calls": 0, "total_ms": 0.0, "escalations": 0, "failures": 0})
+        counters[key] += value
+
+    async def _call(
+        self, llm: BaseLlm, role: str, llm_request: LlmRequest, stream: bool
+    ) -> AsyncGenerator[LlmResponse, None]:
+        request = llm_request.model_copy(deep=True)
+        request.model = llm.model
+        started = time.monotonic()
+        self._count(role, "calls")
+        try:
+            async for response in llm.generate_content_async(request, stream=stream):
+                yield response
+        finally:
+            self._count(role, "total_ms", (time.monotonic() - started) * 1000)
+
+    async def generate_content_async(
+        self, llm_request: LlmRequest, stream: bool = False
+    ) -> AsyncGenerator[LlmResponse, None]:
+        role = request_role(llm_request, self.planner_role)
+        if role != SYNTHESIZER:
+            emitted = False
+            try:
+                if not self.escalate_text:
+                    async for response in self._call(self.planner, role, llm_request, stream):
+                        emitted = True
+                        yield response
+                    return
+                # 툴 호출인지 확인해야 하므로 planner 응답은 모아서 판단 (툴 호출 JSON은 사용자에게 스트리밍할 필요 없음)
+                responses = [r async for r in self._call(self.planner, role, llm_request, False)]
+                if _has_function_call(responses):
+                    for response in responses:
+                        yield response
+                    return
+                self._count(role, "escalations")
+            except Exception as e:
+                self._count(role, "failures")
+                if emitted:
+                    # 이미 일부 청크가 나간 뒤라 synthesizer로 다시 스트리밍하면 내용이 중복됨
+                    raise
+                logger.warning(f"{role} 모델({self.planner.model}) 실패, {self.synthesizer.model}로 처리: {e}")
+        async for response in self._call(self.synthesizer, SYNTHESIZER, llm_request, stream):
+            yield response
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "models": {self.planner_role: self.planner.model, SYNTHESIZER: self.synthesizer.model},
+            "escalate_text": self.escalate_text,
+            "roles": {
+                role: {
+                    **{k: int(v) for k, v in counters.items() if k != "total_ms"},
+                    "avg_ms": round(counters["total_ms"] / counters["calls"], 1) if counters["calls"] else 0.0,
+                }
+                for role, counters in self._counters.items()
+            },
+        }
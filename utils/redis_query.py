@@ -0,0 +1,424 @@
+"""
+엔티티 해시(vehicle/item/delivery/quality)에 대한 구조화 질의 엔진
+
+- 조건(filters), 정렬(sort_by), 개수 제한(limit), 필드 선택(fields)을 한 번에 처리
+- 상태/용량/창고/시간 보조 인덱스가 있으면 가장 선택도가 좋은 인덱스를 사용하고,
+  쓸 수 있는 인덱스가 없을 때만 파이프라인 SCAN으로 fallback
+"""
+import logging
+from datetime import datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+import redis
+
+from utils.redis_scan import fetch_hashes, scan_items
+
+logger = logging.getLogger(__name__)
+
+# ---------- 인덱스 정의 ----------
+
+# set  : idx:{entity}:{field}:{value}  → 해당 값을 가진 id 집합
+# zset : idx:{entity}:{field}          → score=숫자/타임스탬프, member=id
+INDEX_SPECS: Dict[str, Dict[str, str]] = {
+    "vehicle": {"status": "set", "capacity": "zset"},
+    "item": {"warehouse_id": "set", "quantity": "zset"},
+    "delivery": {"status": "set", "timestamp": "zset"},
+    "quality": {"inspection": "set", "qc_result": "set", "timestamp": "zset"},
+}
+
+SUPPORTED_OPS = ("==", "!=", ">", ">=", "<", "<=", "in", "contains")
+RANGE_OPS = (">", ">=", "<", "<=")
+
+DEFAULT_LIMIT = 50
+MAX_LIMIT = 500
+INDEX_WRITE_BATCH = 1000
+
+
+def index_registry_key(entity: str) -> str:
+    """구축된 인덱스 필드 목록을 담는 set 키"""
+    return f"idx:{entity}:_fields"
+
+
+def set_index_key(entity: str, field: str, value: str) -> str:
+    return f"idx:{entity}:{field}:{value}"
+
+
+def zset_index_key(entity: str, field: str) -> str:
+    return f"idx:{entity}:{field}"
+
+
+def to_score(value: Any) -> Optional[float]:
+    """숫자 또는 ISO 타임스탬프를 zset score로 변환 (불가하면 None)"""
+    if value is None:
+        return None
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        pass
+    try:
+        return datetime.fromisoformat(str(value)).timestamp()
+    except ValueError:
+        return None
+
+
+def entity_id(key: str) -> Optional[str]:
+    """'vehicle:V0001' → 'V0001' (quality:return:* 같은 보조 키는 None)"""
+    parts = key.split(":")
+    if len(parts) != 2:
+        return None
+    return parts[1]
+
+
+# ---------- 인덱스 유지 ----------
+
+def built_indexes(client: redis.Redis, entity: str) -> List[str]:
+    """현재 구축되어 있는 인덱스 필드 목록"""
+    return sorted(client.smembers(index_registry_key(entity)))
+
+
+def update_indexes(
+    client: redis.Redis,
+    entity: str,
+    ident: str,
+    old_fields: Dict[str, Any],
+    new_fields: Dict[str, Any],
+) -> None:
+    """
+    쓰기 경로에서 호출: 변경된 필드에 대해 보조 인덱스를 갱신.
+    인덱스가 구축되지 않은 필드는 건드리지 않는다.
+    new_fields 값이 None이면 해당 필드가 삭제된 것으로 본다.
+    """
+    specs = INDEX_SPECS.get(entity, {})
+    if not specs:
+        return
+    built = client.smembers(index_registry_key(entity))
+    pipe = client.pipeline(transaction=False)
+    for field, new_value in new_fields.items():
+        kind = specs.get(field)
+        if kind is None or field not in built:
+            continue
+        old_value = old_fields.get(field)
+        if kind == "set":
+            if old_value is not None:
+                pipe.srem(set_index_key(entity, field, old_value), ident)
+            if new_value is not None:
+                pipe.sadd(set_index_key(entity, field, new_value), ident)
+        else:
+            score = to_score(new_value)
+            if score is None:
+                pipe.zrem(zset_index_key(entity, field), ident)
+            else:
+                pipe.zadd(zset_index_key(entity, field), {ident: score})
+    pipe.execute()
+
+
+def rebuild_indexes(client: redis.Redis, entity: str) -> Dict[str, int]:
+    """entity 전체를 스캔해서 보조 인덱스를 처음부터 다시 구축"""
+    specs = INDEX_SPECS.get(entity, {})
+    if not specs:
+        raise ValueError(f"Unknown entity '{entity}'")
+
+    # 기존 인덱스 키 제거
+    stale = list(client.scan_iter(f"idx:{entity}:*", count=1000))
+    if stale:
+        client.delete(*stale)
+
+    indexed = 0
+    pipe = client.pipeline(transaction=False)
+    for ident, data in _pipelined_scan(client, entity, fields=list(specs)):
+        for field, kind in specs.items():
+            value = data.get(field)
+            if value is None:
+                continue
+            if kind == "set":
+                pipe.sadd(set_index_key(entity, field, value), ident)
+            else:
+                score = to_score(value)
+                if score is not None:
+                    pipe.zadd(zset_index_key(entity, field), {ident: score})
+        indexed += 1
+        if len(pipe) >= INDEX_WRITE_BATCH:
+            pipe.execute()
+    pipe.sadd(index_registry_key(entity), *specs.keys())
+    pipe.execute()
+    logger.info(f"{entity} 인덱스 재구축 완료: {indexed}건")
+    return {"entity": entity, "indexed": indexed}
+
+
+# ---------- 조건 평가 ----------
+
+def _coerce_pair(left: Any, right: Any) -> Tuple[Any, Any]:
+    """둘 다 숫자로 해석되면 숫자 비교, 아니면 문자열 비교"""
+    try:
+        return float(left), float(right)
+    except (TypeError, ValueError):
+        return str(left), str(right)
+
+
+def _equals(current: Any, value: Any) -> bool:
+    left, right = _coerce_pair(current, value)
+    return left == right
+
+
+def _match(data: Dict[str, str], flt: Dict[str, Any]) -> bool:
+    field, op, value = flt["field"], flt["op"], flt.get("value")
+    current = data.get(field)
+    if op == "!=":
+        return current is None or not _equals(current, value)
+    if current is None:
+        return False
+    if op == "==":
+        return _equals(current, value)
+    if op == "in":
+        return any(_equals(current, v) for v in value or [])
+    if op == "contains":
+        return str(value) in current
+    left, right = _coerce_pair(current, value)
+    try:
+        if op == ">":
+            return left > right
+        if op == ">=":
+            return left >= right
+        if op == "<":
+            return left < right
+        if op == "<=":
+            return left <= right
+    except TypeError:
+        return False
+    return False
+
+
+def _normalize_filters(filters: Optional[List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    normalized = []
+    for flt in filters or []:
+        field = flt.get("field")
+        op = flt.get("op", "==")
+        if op == "=":
+            op = "=="
+        if not field or op not in SUPPORTED_OPS:
+            raise ValueError(f"Invalid filter {flt}: field와 op({', '.join(SUPPORTED_OPS)})가 필요합니다.")
+        if op == "in" and not isinstance(flt.get("value"), list):
+            raise ValueError(f"Invalid filter {flt}: 'in' 연산자는 value로 리스트를 받아야 합니다.")
+        normalized.append({"field": field, "op": op, "value": flt.get("value")})
+    return normalized
+
+
+# ---------- 플래너 ----------
+
+def _score_range(filters: List[Dict[str, Any]], field: str) -> Tuple[str, str]:
+    """같은 필드의 범위 조건들을 ZRANGEBYSCORE min/max 인자로 합친다"""
+    low, high = "-inf", "+inf"
+    low_val, high_val = float("-inf"), float("inf")
+    for flt in filters:
+        if flt["field"] != field:
+            continue
+        score = to_score(flt["value"])
+        if score is None:
+            continue
+        if flt["op"] == "==":
+            if score >= low_val:
+                low_val, low = score, str(score)
+            if score <= high_val:
+                high_val, high = score, str(score)
+        elif flt["op"] in (">", ">=") and score >= low_val:
+            low_val = score
+            low = f"({score}" if flt["op"] == ">" else str(score)
+        elif flt["op"] in ("<", "<=") and score <= high_val:
+            high_val = score
+            high = f"({score}" if flt["op"] == "<" else str(score)
+    return low, high
+
+
+def plan_query(client: redis.Redis, entity: str, filters: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    사용 가능한 인덱스 후보들의 카디널리티를 한 번의 파이프라인으로 추정하고
+    가장 작은 후보 집합을 만드는 인덱스를 선택. 후보가 없으면 scan 계획을 반환.
+    """
+    specs = INDEX_SPECS.get(entity, {})
+    built = client.smembers(index_registry_key(entity)) if specs else set()
+
+    candidates: List[Dict[str, Any]] = []
+    for flt in filters:
+        field, op = flt["field"], flt["op"]
+        kind = specs.get(field)
+        if kind is None or field not in built:
+            continue
+        if kind == "set" and op == "==":
+            candidates.append({"kind": "set", "field": field, "keys": [set_index_key(entity, field, flt["value"])]})
+        elif kind == "set" and op == "in":
+            keys = [set_index_key(entity, field, v) for v in flt["value"]]
+            candidates.append({"kind": "set", "field": field, "keys": keys})
+        elif kind == "zset" and (op in RANGE_OPS or op == "==") and to_score(flt["value"]) is not None:
+            if any(c["field"] == field for c in candidates):
+                continue
+            low, high = _score_range(filters, field)
+            candidates.append({"kind": "zset", "field": field, "key": zset_index_key(entity, field), "min": low, "max": high})
+
+    if not candidates:
+        return {"strategy": "scan", "entity": entity}
+
+    pipe = client.pipeline(transaction=False)
+    for cand in candidates:
+        if cand["kind"] == "set":
+            for key in cand["keys"]:
+                pipe.scard(key)
+        else:
+            pipe.zcount(cand["key"], cand["min"], cand["max"])
+    counts = iter(pipe.execute())
+    for cand in candidates:
+        if cand["kind"] == "set":
+            cand["estimate"] = sum(next(counts) for _ in cand["keys"])
+        else:
+            cand["estimate"] = next(counts)
+
+    best = min(candidates, key=lambda c: c["estimate"])
+    return {"strategy": "index", "entity": entity, **best}
+
+
+# ---------- 실행 ----------
+
+def _entity_key_filter(key: str) -> bool:
+    return entity_id(key) is not None
+
+
+def _pipelined_scan(
+    client: redis.Redis,
+    entity: str,
+    predicate=None,
+    limit: Optional[int] = None,
+    fields: Optional[List[str]] = None,
+) -> Iterator[Tuple[str, Dict[str, str]]]:
+    """entity:* 엔티티 키만 스캔 (HGETALL/HMGET 배치 파이프라인)"""
+    for key, data in scan_items(
+        client, f"{entity}:*", predicate, limit, fields, key_filter=_entity_key_filter
+    ):
+        yield entity_id(key), data
+
+
+def _fetch_ids(
+    client: redis.Redis,
+    entity: str,
+    ids: Iterable[str],
+    fields: Optional[List[str]] = None,
+) -> Iterator[Tuple[str, Dict[str, str]]]:
+    for key, data in fetch_hashes(client, (f"{entity}:{ident}" for ident in ids), fields):
+        yield entity_id(key), data
+
+
+def _candidate_ids(
+    client: redis.Redis,
+    plan: Dict[str, Any],
+    ordered_limit: Optional[Tuple[bool, int]] = None,
+) -> List[str]:
+    if plan["kind"] == "set":
+        keys = plan["keys"]
+        return sorted(client.smembers(keys[0]) if len(keys) == 1 else client.sunion(keys))
+    if ordered_limit is not None:
+        descending, limit = ordered_limit
+        if descending:
+            return client.zrevrangebyscore(plan["key"], plan["max"], plan["min"], start=0, num=limit)
+        return client.zrangebyscore(plan["key"], plan["min"], plan["max"], start=0, num=limit)
+    return client.zrangebyscore(plan["key"], plan["min"], plan["max"])
+
+
+def _sort_key(field: str):
+    def key(row: Dict[str, str]):
+        value = row.get(field)
+        if value is None:
+            return (2, 0, "")
+        try:
+            return (0, float(value), "")
+        except ValueError:
+            return (1, 0, value)
+    return key
+
+
+def run_query(
+    client: redis.Redis,
+    entity: str,
+    filters: Optional[List[Dict[str, Any]]] = None,
+    sort_by: Optional[str] = None,
+    descending: bool = False,
+    limit: int = DEFAULT_LIMIT,
+    fields: Optional[List[str]] = None,
+) -> dict:
+    """
+    구조화 질의 실행.
+    - filters: [{"field": "capacity", "op": ">=", "value": 500}, ...] (AND 결합)
+    - 반환: { status, count, has_more, plan, data, total_matched(정렬시) }
+    """
+    try:
+        normalized = _normalize_filters(filters)
+    except ValueError as e:
+        return {"status": "error", "message": str(e)}
+    try:
+        limit = max(1, min(int(limit or DEFAULT_LIMIT), MAX_LIMIT))
+    except (TypeError, ValueError):
+        return {"status": "error", "message": f"limit은 숫자여야 합니다: {limit!r}"}
+
+    plan = plan_query(client, entity, normalized)
+
+    # 필드 선택이 있으면 조건/정렬에 필요한 필드까지만 HMGET으로 읽는다
+    read_fields = None
+    if fields:
+        read_fields = list(dict.fromkeys([*fields, *(f["field"] for f in normalized), *([sort_by] if sort_by else [])]))
+
+    def predicate(data: Dict[str, str]) -> bool:
+        return all(_match(data, f) for f in normalized)
+
+    # 정렬이 없으면 limit+1 개를 찾는 즉시 멈춘다 (더 있는지 여부만 확인)
+    stop_after = None if sort_by else limit + 1
+
+    total_matched = None
+    if plan["strategy"] == "index":
+        # 모든 조건이 같은 zset 인덱스의 점수 범위로 해결되고 정렬 필드도 같으면 Redis에서 바로 limit 적용
+        # (in/contains 는 범위에 들어가지 않으므로 제외)
+        pushdown = (
+            plan["kind"] == "zset"
+            and sort_by == plan["field"]
+            and all(f["field"] == plan["field"] and (f["op"] in RANGE_OPS or f["op"] == "==") for f in normalized)
+        )
+        # pushdown이면 limit+1 개만 읽어서 더 있는지 확인, 전체 건수는 계획 단계의 ZCOUNT 결과 사용
+        ids = _candidate_ids(client, plan, (descending, limit + 1) if pushdown else None)
+        rows_iter = (data for _, data in _fetch_ids(client, entity, ids, read_fields) if predicate(data))
+        matched = list(islice(rows_iter, stop_after))
+        plan_info = {"strategy": "index", "index": plan["field"], "candidates": len(ids), "pushdown": pushdown}
+        if pushdown:
+            total_matched = plan["estimate"]
+    else:
+        matched = [data for _, data in _pipelined_scan(client, entity, predicate, stop_after, read_fields)]
+        plan_info = {"strategy": "scan"}
+
+    if sort_by:
+        matched.sort(key=_sort_key(sort_by), reverse=descending)
+    has_more = len(matched) > limit
+    rows = matched[:limit]
+    if fields:
+        rows = [{f: row.get(f) for f in fields if f in row} for row in rows]
+
+    result = {
+        "status": "success",
+        "count": len(rows),
+        "has_more": has_more,
+        "plan": plan_info,
+        "data": rows,
+    }
+    if sort_by:
+        result["total_matched"] = len(matched) if total_matched is None else total_matched
+    return result
+
+
+if __name__ == "__main__":
+    # 사용법: python -m utils.redis_query  (프로젝트 루트에서 실행, 전체 인덱스 재구축)
+    import os
+
+    logging.basicConfig(level=logging.INFO)
+    client = redis.Redis(
+        host=os.getenv("REDIS_HOST", "localhost"),
+        port=int(os.getenv("REDIS_PORT", "6379")),
+        db=0,
+        decode_responses=True,
+    )
+    for name in INDEX_SPECS:
+        print(rebuild_indexes(client, name))
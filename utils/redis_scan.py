@@ -0,0 +1,125 @@
+"""
+Redis 해시 스캔 공용 엔진
+
+- SCAN(큰 COUNT)으로 키를 가져오고, HGETALL(또는 필요한 필드만 HMGET)을
+  배치 단위 파이프라인으로 실행해 왕복 횟수를 줄인다
+- 결과는 제너레이터로 하나씩 흘려보내며, predicate/limit 을 만족하면 즉시 스캔을 멈춘다
+"""
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple
+
+import redis
+
+SCAN_COUNT = 1000
+BATCH_SIZE = 500
+
+Predicate = Callable[[Dict[str, str]], bool]
+
+
+def field_equals(field: str, value: str) -> Predicate:
+    """data[field] == value 조건 predicate"""
+    return lambda data: data.get(field) == value
+
+
+def _fetch(
+    client: redis.Redis,
+    keys: Sequence[str],
+    fields: Optional[Sequence[str]],
+) -> List[Dict[str, str]]:
+    """키 배치를 한 번의 파이프라인으로 읽는다 (fields 지정시 HMGET)"""
+    pipe = client.pipeline(transaction=False)
+    for key in keys:
+        if fields:
+            pipe.hmget(key, fields)
+        else:
+            pipe.hgetall(key)
+    results = pipe.execute()
+    if not fields:
+        return results
+    return [
+        {f: v for f, v in zip(fields, values) if v is not None}
+        for values in results
+    ]
+
+
+def fetch_hashes(
+    client: redis.Redis,
+    keys: Iterable[str],
+    fields: Optional[Sequence[str]] = None,
+    batch_size: int = BATCH_SIZE,
+) -> Iterator[Tuple[str, Dict[str, str]]]:
+    """주어진 키들의 해시를 배치 파이프라인으로 읽어 (key, data)로 반환 (빈 해시는 건너뜀)"""
+    batch: List[str] = []
+    for key in keys:
+        batch.append(key)
+        if len(batch) >= batch_size:
+            for k, data in zip(batch, _fetch(client, batch, fields)):
+                if data:
+                    yield k, data
+            batch = []
+    if batch:
+        for k, data in zip(batch, _fetch(client, batch, fields)):
+            if data:
+                yield k, data
+
+
+def scan_items(
+    client: redis.Redis,
+    pattern: str,
+    predicate: Optional[Predicate] = None,
+    limit: Optional[int] = None,
+    fields: Optional[Sequence[str]] = None,
+    key_filter: Optional[Callable[[str], bool]] = None,
+    count: int = SCAN_COUNT,
+    batch_size: int = BATCH_SIZE,
+) -> Iterator[Tuple[str, Dict[str, str]]]:
+    """
+    pattern 에 맞는 해시를 (key, data)로 lazy 하게 반환.
+    - predicate: data를 받아 True인 것만 반환
+    - limit: 이 개수만큼 반환하면 스캔 종료
+    - fields: 지정하면 HMGET으로 해당 필드만 읽음
+    - key_filter: 키 이름으로 먼저 거르는 함수 (예: 보조 키 제외)
+    """
+    if limit is not None and limit <= 0:
+        return
+    matched = 0
+    cursor = 0
+    while True:
+        cursor, keys = client.scan(cursor=cursor, match=pattern, count=count)
+        if key_filter is not None:
+            keys = [k for k in keys if key_filter(k)]
+        for start in range(0, len(keys), batch_size):
+            batch = keys[start:start + batch_size]
+            for key, data in zip(batch, _fetch(client, batch, fields)):
+                if not data:
+                    continue
+                if predicate is not None and not predicate(data):
+                    continue
+                yield key, data
+                matched += 1
+                if limit is not None and matched >= limit:
+                    return
+        if cursor == 0:
+            return
+
+
+def scan_hashes(
+    client: redis.Redis,
+    pattern: str,
+    predicate: Optional[Predicate] = None,
+    limit: Optional[int] = None,
+    fields: Optional[Sequence[str]] = None,
+    key_filter: Optional[Callable[[str], bool]] = None,
+) -> Iterator[Dict[str, str]]:
+    """scan_items 와 같지만 data만 반환"""
+    for _, data in scan_items(client, pattern, predicate, limit, fields, key_filter):
+        yield data
+
+
+def scan_first(
+    client: redis.Redis,
+    pattern: str,
+    predicate: Optional[Predicate] = None,
+    fields: Optional[Sequence[str]] = None,
+) -> Optional[Dict[str, str]]:
+    """조건을 만족하는 첫 번째 해시 (없으면 None)"""
+    return next(scan_hashes(client, pattern, predicate, limit=1, fields=fields), None)
@@ -0,0 +1,314 @@
+"""
+Redis 기반 A2A 태스크 저장소 / ADK 세션 서비스
+
+여러 uvicorn 워커나 여러 컨테이너가 같은 태스크·세션 상태를 공유하고, 재시작해도 상태가 남도록 한다.
+- 키 (namespace = 에이전트 이름):
+    a2a:task:{ns}:{task_id}                    태스크 (TTL)
+    adk:session:{ns}:{app}:{user}:{sid}        세션 메타 해시 (state, last_update_time)
+    adk:events:{ns}:{app}:{user}:{sid}         이벤트 리스트 (최대 max_events개, TTL)
+    adk:sessions:{ns}:{app}:{user}             세션 ID 집합 (list_sessions 용)
+    adk:users:{ns}:{app}                       세션이 있는 사용자 ID 집합 (user_id 없는 list_sessions 용)
+    adk:state:{ns}:app:{app} / adk:state:{ns}:user:{app}:{user}   app:/user: 접두사 상태
+- 직렬화: exclude_none JSON, 1KB가 넘으면 zlib 압축 (첫 바이트로 구분)
+- SESSION_BACKEND / TASK_STORE_BACKEND = memory(기본) | redis 로 선택
+"""
+import json
+import logging
+import os
+import time
+import uuid
+import zlib
+from typing import Any, Dict, Optional
+
+import redis.asyncio as aioredis
+from a2a.server.tasks import InMemoryTaskStore, TaskStore
+from a2a.types import Task
+from google.adk.errors.already_exists_error import AlreadyExistsError
+from google.adk.events import Event
+from google.adk.sessions import BaseSessionService, InMemorySessionService, Session
+from google.adk.sessions.base_session_service import GetSessionConfig, ListSessionsResponse
+from google.adk.sessions.state import State
+
+logger = logging.getLogger(__name__)
+
+COMPRESS_MIN_BYTES = 1024
+
+# KEYS: session, events, index, users / ARGV: session_id, user_id
+# 사용자의 마지막 세션이면 사용자 집합에서도 뺀다 (같은 스크립트라 create_session과 엇갈리지 않음)
+_DELETE_SESSION_LUA = """
+redis.call('DEL', KEYS[1], KEYS[2])
+redis.call('SREM', KEYS[3], ARGV[1])
+if redis.call('SCARD', KEYS[3]) == 0 then
+  redis.call('SREM', KEYS[4], ARGV[2])
+end
+return 1
+"""
+
+_client: Optional[aioredis.Redis] = None
+
+
+def get_state_client() -> aioredis.Redis:
+    """태스크/세션 상태용 비동기 Redis 클라이언트 (프로세스당 하나, 물류 데이터와 다른 DB)"""
+    global _client
+    if _client is None:
+        _client = aioredis.Redis(
+            host=os.getenv("REDIS_HOST", "localhost"),
+            port=int(os.getenv("REDIS_PORT", "6379")),
+            db=int(os.getenv("REDIS_STATE_DB", "1")),
+            decode_responses=False,
+        )
+    return _client
+
+
+async def warm_state_client() -> None:
+    """redis 백엔드를 쓰는 워커는 기동 시 상태 저장소 연결을 미리 연다"""
+    if _client is not None:
+        await _client.ping()
+
+
+def pack(text: str) -> bytes:
+    data = text.encode("utf-8")
+    if len(data) >= COMPRESS_MIN_BYTES:
+        return b"z" + zlib.compress(data)
+    return b"j" + data
+
+
+def unpack(blob: bytes) -> str:
+    if blob[:1] == b"z":
+        return zlib.decompress(blob[1:]).decode("utf-8")
+    return blob[1:].decode("utf-8")
+
+
+# ---------- A2A 태스크 저장소 ----------
+
+class RedisTaskStore(TaskStore):
+    def __init__(self, client: aioredis.Redis, namespace: str, ttl: int = 86400):
+        self.client = client
+        self.namespace = namespace
+        self.ttl = ttl
+
+    def _key(self, task_id: str) -> str:
+        return f"a2a:task:{self.namespace}:{task_id}"
+
+    async def save(self, task: Task, context=None) -> None:
+        await self.client.set(self._key(task.id), pack(task.model_dump_json(exclude_none=True)), ex=self.ttl)
+
+    async def get(self, task_id: str, context=None) -> Optional[Task]:
+        blob = await self.client.get(self._key(task_id))
+        if blob is None:
+            return None
+        return Task.model_validate_json(unpack(blob))
+
+    async def delete(self, task_id: str, context=None) -> None:
+        await self.client.delete(self._key(task_id))
+
+
+# ---------- ADK 세션 서비스 ----------
+
+def _split_state(state: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """app:/user:/temp: 접두사별로 상태 분리 (temp:는 저장하지 않음)"""
+    out: Dict[str, Dict[str, Any]] = {"app": {}, "user": {}, "session": {}}
+    for key, value in (state or {}).items():
+        if key.startswith(State.APP_PREFIX):
+            out["app"][key[len(State.APP_PREFIX):]] = value
+        elif key.startswith(State.USER_PREFIX):
+            out["user"][key[len(State.USER_PREFIX):]] = value
+        elif not key.startswith(State.TEMP_PREFIX):
+            out["session"][key] = value
+    return out
+
+
+def _dumps(value: Any) -> str:
+    return json.dumps(value, ensure_ascii=False, separators=(",", ":"), default=str)
+
+
+class RedisSessionService(BaseSessionService):
+    def __init__(self, client: aioredis.Redis, namespace: str, ttl: int = 86400, max_events: int = 500):
+        self.client = client
+        self.namespace = namespace
+        self.ttl = ttl
+        self.max_events = max_events
+        self._delete_script = client.register_script(_DELETE_SESSION_LUA)
+
+    # --- 키 ---
+    def _session_key(self, app: str, user: str, sid: str) -> str:
+        return f"adk:session:{self.namespace}:{app}:{user}:{sid}"
+
+    def _events_key(self, app: str, user: str, sid: str) -> str:
+        return f"adk:events:{self.namespace}:{app}:{user}:{sid}"
+
+    def _index_key(self, app: str, user: str) -> str:
+        return f"adk:sessions:{self.namespace}:{app}:{user}"
+
+    def _users_key(self, app: str) -> str:
+        # user_id에 ':'가 들어갈 수 있으므로 키를 쪼개지 않고 집합 멤버로 보관
+        return f"adk:users:{self.namespace}:{app}"
+
+    def _app_state_key(self, app: str) -> str:
+        return f"adk:state:{self.namespace}:app:{app}"
+
+    def _user_state_key(self, app: str, user: str) -> str:
+        return f"adk:state:{self.namespace}:user:{app}:{user}"
+
+    # --- 공통 ---
+    def _write_state(self, pipe, app: str, user: str, delta: Dict[str, Dict[str, Any]]) -> None:
+        if delta["app"]:
+            pipe.hset(self._app_state_key(app), mapping={k: _dumps(v) for k, v in delta["app"].items()})
+        if delta["user"]:
+            pipe.hset(self._user_state_key(app, user), mapping={k: _dumps(v) for k, v in delta["user"].items()})
+
+    async def _merged_state(self, app: str, user: str, session_state: Dict[str, Any]) -> Dict[str, Any]:
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hgetall(self._app_state_key(app))
+        pipe.hgetall(self._user_state_key(app, user))
+        app_state, user_state = await pipe.execute()
+        state = dict(session_state)
+        for key, raw in app_state.items():
+            state[State.APP_PREFIX + key.decode()] = json.loads(raw)
+        for key, raw in user_state.items():
+            state[State.USER_PREFIX + key.decode()] = json.loads(raw)
+        return state
+
+    # --- BaseSessionService ---
+    async def create_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        state: Optional[Dict[str, Any]] = None,
+        session_id: Optional[str] = None,
+    ) -> Session:
+        session_id = (session_id or "").strip() or uuid.uuid4().hex
+        delta = _split_state(state or {})
+        now = time.time()
+        key = self._session_key(app_name, user_id, session_id)
+        created = await self.client.hsetnx(key, "state", _dumps(delta["session"]))
+        if not created:
+            raise AlreadyExistsError(f"Session with id {session_id} already exists.")
+        pipe = self.client.pipeline(transaction=True)
+        pipe.hset(key, "last_update_time", now)
+        pipe.expire(key, self.ttl)
+        pipe.sadd(self._index_key(app_name, user_id), session_id)
+        pipe.expire(self._index_key(app_name, user_id), self.ttl)
+        pipe.sadd(self._users_key(app_name), user_id)
+        pipe.expire(self._users_key(app_name), self.ttl)
+        self._write_state(pipe, app_name, user_id, delta)
+        await pipe.execute()
+        return Session(
+            id=session_id,
+            app_name=app_name,
+            user_id=user_id,
+            state=await self._merged_state(app_name, user_id, delta["session"]),
+            last_update_time=now,
+        )
+
+    async def get_session(
+        self,
+        *,
+        app_name: str,
+        user_id: str,
+        session_id: str,
+        config: Optional[GetSessionConfig] = None,
+    ) -> Optional[Session]:
+        key = self._session_key(app_name, user_id, session_id)
+        start = -config.num_recent_events if config and config.num_recent_events else 0
+        pipe = self.client.pipeline(transaction=False)
+        pipe.hgetall(key)
+        pipe.lrange(self._events_key(app_name, user_id, session_id), start, -1)
+        meta, raw_events = await pipe.execute()
+        if not meta:
+            return None
+        events = [Event.model_validate_json(unpack(blob)) for blob in raw_events]
+        if config and config.after_timestamp:
+            events = [e for e in events if e.timestamp >= config.after_timestamp]
+        session_state = json.loads(meta.get(b"state", b"{}"))
+        return Session(
+            id=session_id,
+            app_name=app_name,
+            user_id=user_id,
+            state=await self._merged_state(app_name, user_id, session_state),
+            events=events,
+            last_update_time=float(meta.get(b"last_update_time", 0)),
+        )
+
+    async def list_sessions(self, *, app_name: str, user_id: Optional[str] = None) -> ListSessionsResponse:
+        if user_id is None:
+            users = [user.decode() for user in await self.client.smembers(self._users_key(app_name))]
+        else:
+            users = [user_id]
+        sessions = []
+        for user in users:
+            ids = [sid.decode() for sid in await self.client.smembers(self._index_key(app_name, user))]
+            pipe = self.client.pipeline(transaction=False)
+            for sid in ids:
+                pipe.hget(self._session_key(app_name, user, sid), "last_update_time")
+            for sid, updated in zip(ids, await pipe.execute()):
+                if updated is None:  # TTL 만료된 세션
+                    continue
+                sessions.append(Session(
+                    id=sid, app_name=app_name, user_id=user, state={}, last_update_time=float(updated),
+                ))
+        sessions.sort(key=lambda s: s.last_update_time)
+        return ListSessionsResponse(sessions=sessions)
+
+    async def delete_session(self, *, app_name: str, user_id: str, session_id: str) -> None:
+        await self._delete_script(
+            keys=[
+                self._session_key(app_name, user_id, session_id),
+                self._events_key(app_name, user_id, session_id),
+                self._index_key(app_name, user_id),
+                self._users_key(app_name),
+            ],
+            args=[session_id, user_id],
+        )
+
+    async def append_event(self, session: Session, event: Event) -> Event:
+        if event.partial:
+            return event
+        # 메모리 세션 반영 (temp: 상태 처리 포함)은 기본 구현을 그대로 사용
+        event = await super().append_event(session=session, event=event)
+        delta = _split_state(event.actions.state_delta if event.actions else {})
+        app, user, sid = session.app_name, session.user_id, session.id
+        session_key = self._session_key(app, user, sid)
+        events_key = self._events_key(app, user, sid)
+
+        pipe = self.client.pipeline(transaction=True)
+        pipe.rpush(events_key, pack(event.model_dump_json(exclude_none=True)))
+        pipe.ltrim(events_key, -self.max_events, -1)
+        pipe.expire(events_key, self.ttl)
+        if delta["session"]:
+            session_state = {k: v for k, v in session.state.items() if not k.startswith(
+                (State.APP_PREFIX, State.USER_PREFIX, State.TEMP_PREFIX)
+            )}
+            pipe.hset(session_key, "state", _dumps(session_state))
+        pipe.hset(session_key, "last_update_time", event.timestamp)
+        pipe.expire(session_key, self.ttl)
+        pipe.expire(self._index_key(app, user), self.ttl)
+        # 사용자 집합도 같이 연장 (만료됐다면 다시 추가)
+        pipe.sadd(self._users_key(app), user)
+        pipe.expire(self._users_key(app), self.ttl)
+        self._write_state(pipe, app, user, delta)
+        await pipe.execute()
+        session.last_update_time = event.timestamp
+        return event
+
+
+# ---------- 백엔드 선택 ----------
+
+def make_session_service(namespace: str) -> BaseSessionService:
+    if os.getenv("SESSION_BACKEND", "memory").lower() == "redis":
+        logger.info(f"Redis 세션 서비스 사용 (namespace={namespace})")
+        return RedisSessionService(
+            get_state_client(),
+            namespace,
+            ttl=int(os.getenv("SESSION_TTL", "86400")),
+            max_events=int(os.getenv("SESSION_MAX_EVENTS", "500")),
+        )
+    return InMemorySessionService()
+
+
+def make_task_store(namespace: str) -> TaskStore:
+    if os.getenv("TASK_STORE_BACKEND", "memory").lower() == "redis":
+        logger.info(f"Redis 태스크 저장소 사용 (namespace={namespace})")
+        return RedisTaskStore(get_state_client(), namespace, ttl=int(os.getenv("TASK_TTL", "86400")))
+    return InMemoryTaskStore()
@@ -0,0 +1,47 @@
+"""
+런타임 통계 레지스트리
+
+각 모듈이 register_stats()로 통계 함수를 등록하면 /stats 엔드포인트에서 한 번에 JSON으로 조회할 수 있다.
+"""
+import logging
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator
+
+logger = logging.getLogger(__name__)
+
+_providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+_scope = ""
+
+
+def register_stats(name: str, provider: Callable[[], Dict[str, Any]]) -> None:
+    """통계 제공 함수 등록 (같은 이름이면 덮어씀)"""
+    _providers[f"{_scope}.{name}" if _scope else name] = provider
+
+
+@contextmanager
+def stats_scope(prefix: str) -> Iterator[None]:
+    """한 프로세스에 여러 에이전트를 올릴 때 통계 이름 앞에 에이전트 이름을 붙임 (host_all.py)"""
+    global _scope
+    previous, _scope = _scope, prefix
+    try:
+        yield
+    finally:
+        _scope = previous
+
+
+def collect_stats() -> Dict[str, Any]:
+    out: Dict[str, Any] = {}
+    for name, provider in list(_providers.items()):
+        try:
+            out[name] = provider()
+        except Exception as e:
+            logger.warning(f"통계 수집 실패 ({name}): {e}")
+            out[name] = {"error": str(e)}
+    return out
+
+
+async def stats_endpoint(request) -> Any:
+    """Starlette 라우트 핸들러: GET /stats"""
+    from starlette.responses import JSONResponse
+
+    return JSONResponse(collect_stats())
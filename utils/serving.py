@@ -0,0 +1,95 @@
+"""
+에이전트 서버 실행 (멀티 워커)
+
+각 에이전트는 app.py의 create_app() 팩토리로 앱을 만들고, __main__.py는 serve("app:create_app", ...)만 호출한다.
+- AGENT_HOST / AGENT_PORT: __main__.py 기본 주소 대신 사용할 주소 (벤치마크, 컨테이너 포트 변경용)
+- AGENT_WORKERS: uvicorn 워커 프로세스 수 (기본 1). 워커마다 팩토리가 따로 실행되므로
+  여러 워커가 공유해야 하는 상태는 프로세스 밖(SESSION_BACKEND/TASK_STORE_BACKEND=redis)에 둔다
+- AGENT_GRACEFUL_TIMEOUT: 종료 시 진행 중인 요청을 기다리는 시간(초)
+- AGENT_RELOAD=true: 개발용 코드 변경 자동 재시작 (워커 1개로 동작)
+- 멀티 워커 모드에서 SIGHUP을 보내면 워커를 하나씩 새로 띄워 무중단 재시작
+- 기동 프로파일/readiness는 utils.startup 참고 (/healthz, /readyz)
+- PROMETHEUS_MULTIPROC_DIR: 워커 여러 개의 /metrics 지표를 합산할 때 쓰는 디렉토리 (기동 시 이전 실행 파일 삭제)
+"""
+import glob
+import logging
+import os
+import time
+from contextlib import asynccontextmanager
+from typing import Awaitable, Callable, Sequence, Tuple
+
+import uvicorn
+
+logger = logging.getLogger(__name__)
+
+Hook = Callable[[], Awaitable[None]]
+
+
+def bind_address(default_host: str, default_port: int) -> Tuple[str, int]:
+    """환경변수로 지정된 주소 (serve()가 워커들에게 넘긴 주소, 팩토리에서 에이전트 카드 URL에 사용)"""
+    return os.getenv("AGENT_HOST", default_host), int(os.getenv("AGENT_PORT", str(default_port)))
+
+
+def warmup_lifespan(startup: Sequence[Hook] = (), shutdown: Sequence[Hook] = ()):
+    """워커별 warm-up / 정리 훅을 실행하는 Starlette lifespan (warm-up 실패는 기동을 막지 않음)"""
+
+    @asynccontextmanager
+    async def lifespan(app):
+        started = time.perf_counter()
+        for hook in startup:
+            try:
+                await hook()
+            except Exception as e:
+                logger.warning(f"warm-up 실패 ({getattr(hook, '__name__', hook)}): {e}")
+        logger.info(f"워커 {os.getpid()} 시작 (기동 훅 {(time.perf_counter() - started) * 1000:.0f}ms)")
+        yield
+        for hook in shutdown:
+            try:
+                await hook()
+            except Exception as e:
+                logger.warning(f"종료 정리 실패 ({getattr(hook, '__name__', hook)}): {e}")
+
+    return lifespan
+
+
+def serve(app_factory: str, host: str, port: int) -> None:
+    """app_factory("모듈:함수") 를 uvicorn 팩토리 모드로 실행"""
+    host, port = bind_address(host, port)
+    workers = max(1, int(os.getenv("AGENT_WORKERS", "1")))
+    reload = os.getenv("AGENT_RELOAD", "false").lower() == "true"
+    # 워커 프로세스는 환경변수를 물려받으므로 주소를 여기서 넘김
+    os.environ["AGENT_HOST"] = host
+    os.environ["AGENT_PORT"] = str(port)
+    # 워커의 기동 프로파일에서 프로세스 생성 ~ 앱 팩토리 호출 전까지 걸린 시간 계산용
+    os.environ["AGENT_SERVE_STARTED"] = str(time.time())
+    # 이전 실행에서 남은 워커 지표 파일이 합산되지 않도록 정리 (utils.metrics)
+    multiproc_dir = os.getenv("PROMETHEUS_MULTIPROC_DIR")
+    if multiproc_dir:
+        os.makedirs(multiproc_dir, exist_ok=True)
+        for path in glob.glob(os.path.join(multiproc_dir, "*.db")):
+            os.remove(path)
+
+    if workers > 1:
+        if reload:
+            logger.warning("AGENT_RELOAD는 워커 1개에서만 동작합니다. reload를 끕니다.")
+            reload = False
+        in_memory = [
+            name for name in ("SESSION_BACKEND", "TASK_STORE_BACKEND")
+            if os.getenv(name, "memory").lower() == "memory"
+        ]
+        if in_memory:
+            logger.warning(
+                f"{', '.join(in_memory)}=memory 상태로 워커 {workers}개를 띄웁니다. "
+                "워커마다 세션/태스크가 따로 저장되므로 redis 백엔드를 권장합니다."
+            )
+
+    logger.info(f"{app_factory} 실행: {host}:{port}, workers={workers}, reload={reload}")
+    uvicorn.run(
+        app_factory,
+        factory=True,
+        host=host,
+        port=port,
+        workers=workers if not reload else None,
+        reload=reload,
+        timeout_graceful_shutdown=int(os.getenv("AGENT_GRACEFUL_TIMEOUT", "30")),
+    )
@@ -0,0 +1,173 @@
+"""
+요청(대화)별 ADK 세션 풀
+
+- A2A context_id(대화 단위)마다 별도 세션을 쓰므로 동시 사용자끼리 히스토리를 공유하지 않는다
+- 살아 있는 세션 수는 max_sessions로 제한 (LRU 제거), idle_ttl 동안 안 쓴 세션도 제거
+- 같은 세션의 턴은 세션별 락으로 순서대로 실행, 사용 중인 세션은 제거하지 않음
+- stats(): 세션 수/재사용률/제거 수/세션당 이벤트 수 (세션 메모리 지표)
+- 외부 저장소(Redis) 세션은 다른 워커도 쓰므로 풀에서만 빼고 삭제하지 않는다 (TTL로 만료)
+- 풀 락은 LRU 장부만 보호하고, 세션 서비스 호출(조회/생성/삭제)은 락 밖에서 한다
+  (조회/생성은 세션별 락 안에서 → 느린 Redis 왕복이 다른 대화를 막지 않음)
+"""
+import asyncio
+import logging
+import os
+import time
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from dataclasses import dataclass, field
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+
+from google.adk.sessions import InMemorySessionService
+
+logger = logging.getLogger(__name__)
+
+
+@dataclass
+class SessionLease:
+    user_id: str
+    session_id: str
+    last_used: float = field(default_factory=time.monotonic)
+    turns: int = 0
+    events: int = 0
+    in_use: int = 0
+    loaded: bool = False  # 세션 서비스에서 조회/생성을 마쳤는지
+    deleted: Optional[asyncio.Future] = None  # 제거 후 세션 서비스 삭제 완료
+    lock: asyncio.Lock = field(default_factory=asyncio.Lock)
+
+    def record(self, events: int) -> None:
+        """이번 턴에 세션에 쌓인 이벤트 수 기록 (사용자 메시지 이벤트 1개 포함)"""
+        self.turns += 1
+        self.events += events + 1
+
+
+class SessionPool:
+    def __init__(
+        self,
+        session_service: Any,
+        app_name: str,
+        max_sessions: int = 1000,
+        idle_ttl: float = 1800.0,
+        delete_on_evict: bool = True,
+    ):
+        self.session_service = session_service
+        self.app_name = app_name
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.delete_on_evict = delete_on_evict
+        self._leases: "OrderedDict[Tuple[str, str], SessionLease]" = OrderedDict()
+        self._lock = asyncio.Lock()
+        # 제거되어 세션 서비스에서 삭제 중인 키 → 완료 future (같은 키가 다시 오면 삭제 후 조회)
+        self._deleting: Dict[Tuple[str, str], asyncio.Future] = {}
+        self.counters: Dict[str, int] = {"created": 0, "reused": 0, "evicted_lru": 0, "evicted_idle": 0}
+
+    @classmethod
+    def from_env(cls, session_service: Any, app_name: str) -> "SessionPool":
+        return cls(
+            session_service,
+            app_name,
+            max_sessions=int(os.getenv("SESSION_MAX_LIVE", "1000")),
+            idle_ttl=float(os.getenv("SESSION_IDLE_TTL", "1800")),
+            delete_on_evict=isinstance(session_service, InMemorySessionService),
+        )
+
+    @asynccontextmanager
+    async def session(self, user_id: str, session_id: str) -> AsyncIterator[SessionLease]:
+        """세션을 확보하고 (없으면 생성) 턴이 끝날 때까지 같은 세션의 다른 턴을 막는다"""
+        lease = await self._acquire(user_id, session_id)
+        try:
+            async with lease.lock:
+                if not lease.loaded:
+                    await self._load(lease)
+                yield lease
+        finally:
+            lease.in_use -= 1
+            lease.last_used = time.monotonic()
+
+    async def _acquire(self, user_id: str, session_id: str) -> SessionLease:
+        key = (user_id, session_id)
+        async with self._lock:
+            lease = self._leases.get(key)
+            if lease is not None:
+                self._leases.move_to_end(key)
+                self.counters["reused"] += 1
+            else:
+                lease = SessionLease(user_id, session_id)
+                self._leases[key] = lease
+            lease.in_use += 1
+            lease.last_used = time.monotonic()
+            evicted = self._evict()
+        # 요청이 취소되어도 삭제는 끝까지 (삭제 대기 중인 _load가 멈추지 않게)
+        await asyncio.shield(self._delete(evicted))
+        return lease
+
+    async def _load(self, lease: SessionLease) -> None:
+        """풀에 새로 들어온 세션을 세션 서비스에서 조회하고 없으면 생성 (세션별 락 안에서 호출)"""
+        deleting = self._deleting.get((lease.user_id, lease.session_id))
+        if deleting is not None:
+            await asyncio.shield(deleting)
+        existing = await self.session_service.get_session(
+            app_name=self.app_name, user_id=lease.user_id, session_id=lease.session_id
+        )
+        if existing is None:
+            await self.session_service.create_session(
+                app_name=self.app_name, user_id=lease.user_id, session_id=lease.session_id
+            )
+            self.counters["created"] += 1
+        else:
+            # 세션 서비스에는 남아 있던 세션 (풀에서만 제거됐거나 외부 저장소)
+            self.counters["reused"] += 1
+            lease.events = len(existing.events)
+        lease.loaded = True
+
+    def _evict(self) -> List[SessionLease]:
+        """풀에서 뺄 세션을 고른다 (풀 락 안에서 호출, 세션 서비스 삭제는 _delete에서)"""
+        now = time.monotonic()
+        evicted: List[SessionLease] = []
+        for key, lease in list(self._leases.items()):
+            if not lease.in_use and now - lease.last_used > self.idle_ttl:
+                evicted.append(self._drop(key, "evicted_idle"))
+        # 오래된 순서(LRU)부터 제거, 사용 중인 세션은 건너뜀
+        for key, lease in list(self._leases.items()):
+            if len(self._leases) <= self.max_sessions:
+                break
+            if not lease.in_use:
+                evicted.append(self._drop(key, "evicted_lru"))
+        return [lease for lease in evicted if lease.loaded and self.delete_on_evict]
+
+    def _drop(self, key: Tuple[str, str], reason: str) -> SessionLease:
+        lease = self._leases.pop(key)
+        self.counters[reason] += 1
+        if lease.loaded and self.delete_on_evict:
+            lease.deleted = asyncio.get_running_loop().create_future()
+            self._deleting[key] = lease.deleted
+        return lease
+
+    async def _delete(self, leases: List[SessionLease]) -> None:
+        for lease in leases:
+            key = (lease.user_id, lease.session_id)
+            try:
+                await self.session_service.delete_session(
+                    app_name=self.app_name, user_id=lease.user_id, session_id=lease.session_id
+                )
+            except Exception as e:
+                logger.warning(f"세션 삭제 실패 ({lease.session_id}): {e}")
+            finally:
+                lease.deleted.set_result(None)
+                if self._deleting.get(key) is lease.deleted:
+                    del self._deleting[key]
+
+    def stats(self) -> Dict[str, Any]:
+        events = [lease.events for lease in self._leases.values()]
+        lookups = self.counters["created"] + self.counters["reused"]
+        return {
+            "live_sessions": len(self._leases),
+            "max_sessions": self.max_sessions,
+            "idle_ttl_seconds": self.idle_ttl,
+            "in_use": sum(1 for lease in self._leases.values() if lease.in_use),
+            **self.counters,
+            "reuse_rate": round(self.counters["reused"] / lookups, 4) if lookups else 0.0,
+            "events_total": sum(events),
+            "events_max_per_session": max(events, default=0),
+            "events_avg_per_session": round(sum(events) / len(events), 2) if events else 0.0,
+        }
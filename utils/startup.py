@@ -0,0 +1,160 @@
+"""
+워커 기동 프로파일 + readiness / liveness
+
+- StartupProfile: 기동 단계(imports → agent → llm_clients → warmup)별 소요 시간 기록 → 로그 + /stats의 startup
+  STARTUP_IMPORT_BUDGET_MS: import 단계 예산 (넘으면 어떤 모듈이 무거운지 `python -X importtime` 안내 경고, 0이면 검사 안 함)
+- Readiness: 기동 후 warm-up 점검(Redis ping, LLM 백엔드 헬스 체크, 레지스트리 카드 적재)을 백그라운드로 실행
+  · GET /healthz: 이벤트 루프가 돌고 있으면 항상 200 (liveness, warm-up 중에도 응답)
+  · GET /readyz: 필수 점검이 모두 통과해야 200, 아니면 503 + 실패 사유 (readiness)
+  · 실패한 필수 점검은 /readyz 요청 때 READY_RECHECK_INTERVAL 초 간격으로 다시 시도
+"""
+import asyncio
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Any, Awaitable, Callable, Dict, Iterator, Optional, Sequence
+
+logger = logging.getLogger(__name__)
+
+Check = Callable[[], Awaitable[None]]
+
+
+def _check_name(check: Check) -> str:
+    return getattr(check, "__name__", None) or type(check).__name__
+
+
+class StartupProfile:
+    """기동 단계별 소요 시간 (ms)"""
+
+    def __init__(self, name: str, import_budget_ms: Optional[float] = None):
+        self.name = name
+        self.import_budget_ms = (
+            float(os.getenv("STARTUP_IMPORT_BUDGET_MS", "3000")) if import_budget_ms is None else import_budget_ms
+        )
+        self.phases: Dict[str, float] = {}
+        # serve()가 uvicorn을 띄운 시각 (워커 프로세스 생성/인터프리터 기동까지 포함한 시간 계산용)
+        serve_started = os.getenv("AGENT_SERVE_STARTED")
+        self.since_serve_ms = round((time.time() - float(serve_started)) * 1000) if serve_started else None
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = round((time.perf_counter() - started) * 1000, 1)
+            if name == "imports" and 0 < self.import_budget_ms < self.phases[name]:
+                logger.warning(
+                    f"{self.name} import {self.phases[name]:.0f}ms > 예산 {self.import_budget_ms:.0f}ms "
+                    "(python -X importtime 으로 무거운 모듈 확인)"
+                )
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "phases_ms": dict(self.phases),
+            "total_ms": round(sum(self.phases.values()), 1),
+            "import_budget_ms": self.import_budget_ms,
+            "before_factory_ms": self.since_serve_ms,
+        }
+
+
+class Readiness:
+    """warm-up 점검 결과로 /readyz 응답을 정하는 상태 (앱마다 하나, host_all.py에서도 서로 섞이지 않음)"""
+
+    def __init__(
+        self,
+        required: Sequence[Check],
+        profile: Optional[StartupProfile] = None,
+        recheck_interval: Optional[float] = None,
+        timeout: float = 30.0,
+    ):
+        self.required = list(required)
+        self.profile = profile
+        self.recheck_interval = (
+            float(os.getenv("READY_RECHECK_INTERVAL", "5")) if recheck_interval is None else recheck_interval
+        )
+        self.timeout = timeout
+        self.results: Dict[str, Dict[str, Any]] = {}
+        self.warmed = False
+        self._task: Optional[asyncio.Task] = None
+        self._last_recheck = 0.0
+        self._lock = asyncio.Lock()
+
+    @property
+    def ready(self) -> bool:
+        return self.warmed and all(self.results.get(_check_name(c), {}).get("ok") for c in self.required)
+
+    async def _run(self, check: Check) -> bool:
+        started = time.perf_counter()
+        try:
+            await asyncio.wait_for(check(), timeout=self.timeout)
+            error = ""
+        except Exception as e:
+            error = f"{type(e).__name__}: {e}"[:200]
+        elapsed = round((time.perf_counter() - started) * 1000, 1)
+        self.results[_check_name(check)] = {"ok": not error, "ms": elapsed, **({"error": error} if error else {})}
+        return not error
+
+    async def warm_up(self) -> None:
+        """모든 점검을 동시에 실행 (각 점검 결과는 results에 기록, 예외는 밖으로 내보내지 않음)"""
+        started = time.perf_counter()
+        await asyncio.gather(*(self._run(check) for check in self.required))
+        if self.profile is not None:
+            self.profile.phases["warmup"] = round((time.perf_counter() - started) * 1000, 1)
+        self.warmed = True
+        self._last_recheck = time.monotonic()
+        failed = [name for name, result in self.results.items() if not result["ok"]]
+        state = "ready" if self.ready else "not ready"
+        name = self.profile.name if self.profile is not None else "agent"
+        logger.info(
+            f"{name} warm-up 완료 ({state}, pid {os.getpid()}): "
+            + ", ".join(f"{n}={r['ms']:.0f}ms" for n, r in self.results.items())
+            + (f" / 실패: {', '.join(failed)}" if failed else "")
+        )
+        if self.profile is not None:
+            logger.info(f"{name} 기동 프로파일: {self.profile.stats()}")
+
+    async def start(self) -> None:
+        """lifespan 시작 훅: warm-up을 백그라운드로 돌려 그동안에도 /healthz에 응답"""
+        self._task = asyncio.get_running_loop().create_task(self.warm_up())
+
+    async def stop(self) -> None:
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+
+    async def check(self) -> bool:
+        """ready가 아니면 실패한 필수 점검만 recheck_interval 간격으로 다시 실행"""
+        if self.ready or not self.warmed:
+            return self.ready
+        async with self._lock:
+            if not self.ready and time.monotonic() - self._last_recheck >= self.recheck_interval:
+                self._last_recheck = time.monotonic()
+                failed = [c for c in self.required if not self.results.get(_check_name(c), {}).get("ok")]
+                await asyncio.gather(*(self._run(check) for check in failed))
+        return self.ready
+
+    async def healthz(self, request) -> Any:
+        """Starlette 라우트 핸들러: GET /healthz"""
+        from starlette.responses import JSONResponse
+
+        return JSONResponse({"status": "alive"})
+
+    async def readyz(self, request) -> Any:
+        """Starlette 라우트 핸들러: GET /readyz"""
+        from starlette.responses import JSONResponse
+
+        ready = await self.check()
+        status = "ready" if ready else ("warming_up" if not self.warmed else "not_ready")
+        return JSONResponse({"status": status, "checks": self.results}, status_code=200 if ready else 503)
+
+    def add_routes(self, app) -> None:
+        app.add_route("/healthz", self.healthz, methods=["GET"])
+        app.add_route("/readyz", self.readyz, methods=["GET"])
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "ready": self.ready,
+            "checks": self.results,
+            **(self.profile.stats() if self.profile is not None else {}),
+        }
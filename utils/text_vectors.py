@@ -0,0 +1,94 @@
+"""
+경량 텍스트 벡터 (CPU 전용, 외부 의존성 없음)
+
+- 단어 토큰 + 단어 내부 문자 n-gram(한글 조사/활용 대응)을 해시 버킷으로 매핑
+- TF-IDF 가중치 + L2 정규화된 희소 벡터, 코사인 유사도로 top-k 검색
+- 문서 수가 수십~수백 개 수준(에이전트 카드, 캐시 키 등)에서 쓰는 것을 전제로 함
+"""
+import math
+import re
+import zlib
+from collections import Counter
+from typing import Dict, Hashable, Iterable, List, Mapping, Optional, Tuple
+
+SparseVector = Dict[int, float]
+
+_WORD = re.compile(r"[0-9a-zA-Z]+|[가-힣]+")
+DEFAULT_DIM = 1 << 18
+
+
+def tokenize(text: str, ngram_range: Tuple[int, int] = (2, 3)) -> List[str]:
+    """소문자 단어 + 단어별 문자 n-gram (앞뒤 경계 표시 포함)"""
+    tokens: List[str] = []
+    lo, hi = ngram_range
+    for word in _WORD.findall(text.lower()):
+        tokens.append(f"w:{word}")
+        if len(word) < 2:
+            continue
+        padded = f"^{word}$"
+        for n in range(lo, hi + 1):
+            tokens.extend(f"c:{padded[i:i + n]}" for i in range(len(padded) - n + 1))
+    return tokens
+
+
+def _bucket(token: str, dim: int) -> int:
+    return zlib.crc32(token.encode("utf-8")) % dim
+
+
+def hash_counts(text: str, dim: int = DEFAULT_DIM) -> Counter:
+    return Counter(_bucket(t, dim) for t in tokenize(text))
+
+
+def cosine(a: SparseVector, b: SparseVector) -> float:
+    """L2 정규화된 희소 벡터끼리의 코사인 유사도"""
+    if len(a) > len(b):
+        a, b = b, a
+    return sum(w * b.get(i, 0.0) for i, w in a.items())
+
+
+def _normalize(vec: SparseVector) -> SparseVector:
+    norm = math.sqrt(sum(w * w for w in vec.values()))
+    return {i: w / norm for i, w in vec.items()} if norm else {}
+
+
+class HashingTfidfIndex:
+    """해시 TF-IDF 벡터 인덱스. fit() 후 query()로 top-k (key, score) 검색"""
+
+    def __init__(self, dim: int = DEFAULT_DIM):
+        self.dim = dim
+        self.idf: Dict[int, float] = {}
+        self.vectors: Dict[Hashable, SparseVector] = {}
+
+    def __len__(self) -> int:
+        return len(self.vectors)
+
+    def fit(self, docs: Mapping[Hashable, str]) -> "HashingTfidfIndex":
+        counts = {key: hash_counts(text, self.dim) for key, text in docs.items()}
+        df: Counter = Counter()
+        for c in counts.values():
+            df.update(c.keys())
+        n = len(counts)
+        # smooth idf (문서가 1개여도 0이 되지 않도록)
+        self.idf = {i: math.log((1 + n) / (1 + d)) + 1.0 for i, d in df.items()}
+        self.vectors = {key: self._weigh(c) for key, c in counts.items()}
+        return self
+
+    def vectorize(self, text: str) -> SparseVector:
+        return self._weigh(hash_counts(text, self.dim))
+
+    def _weigh(self, counts: Counter) -> SparseVector:
+        # 인덱스에 없는 특징은 유사도에 기여하지 않으므로 버림
+        return _normalize({
+            i: (1.0 + math.log(tf)) * self.idf[i] for i, tf in counts.items() if i in self.idf
+        })
+
+    def query(
+        self, text: str, k: int = 3, keys: Optional[Iterable[Hashable]] = None
+    ) -> List[Tuple[Hashable, float]]:
+        vec = self.vectorize(text)
+        if not vec:
+            return []
+        candidates = self.vectors if keys is None else {key: self.vectors[key] for key in keys if key in self.vectors}
+        scored = [(key, cosine(vec, doc)) for key, doc in candidates.items()]
+        scored.sort(key=lambda item: item[1], reverse=True)
+        return scored[:k]
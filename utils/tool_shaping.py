@@ -0,0 +1,279 @@
+"""
+툴 결과 크기 제한 (LLM에 들어가기 전, Runner 플러그인)
+
+- 툴 결과가 툴별 예산(추정 토큰)을 넘으면 top_k보다 긴 목록을 요약으로 교체
+  {"count", "aggregates"(필드별 숫자 min/max/avg/sum 또는 값별 개수), "sample"(앞 top_k건), "handle"}
+- 원본 목록은 잠시 보관하고, LLM이 fetch_tool_result(handle, offset, limit)로 나머지를 조회
+  (SESSION_BACKEND=redis 면 상태 Redis에 TTL로 보관 → 다른 워커가 fetch를 받아도 조회 가능, 아니면 프로세스 메모리)
+  (handle은 목록 내용의 해시 → 같은 데이터면 같은 handle이라 LLM 응답 캐시 키가 유지됨)
+- 그래도 예산을 넘으면 history_compaction.summarize_value로 한 번 더 줄임
+- DataPart 직접 툴 호출(utils.direct_tools)은 Runner를 거치지 않으므로 원본 그대로 반환
+"""
+import hashlib
+import json
+import logging
+import os
+import time
+from collections import Counter, OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.adk.plugins.base_plugin import BasePlugin
+
+from utils.history_compaction import estimate_tokens, summarize_value
+from utils.redis_stores import get_state_client, pack, unpack
+
+logger = logging.getLogger(__name__)
+
+FETCH_PAGE_MAX = 50
+MAX_AGGREGATE_FIELDS = 12
+MAX_CATEGORY_VALUES = 8
+
+
+def _handle(tool: str, path: str, items: List[Any]) -> str:
+    digest = hashlib.sha256(
+        json.dumps([tool, path, items], ensure_ascii=False, sort_keys=True, default=str).encode()
+    ).hexdigest()
+    return f"res_{digest[:16]}"
+
+
+class ShapedResultStore:
+    """요약된 목록의 원본 보관소 (프로세스 메모리, TTL + 개수 제한 LRU)"""
+
+    backend = "memory"
+
+    def __init__(self, ttl: float = 600.0, max_entries: int = 200):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[float, List[Any]]]" = OrderedDict()
+
+    async def put(self, tool: str, path: str, items: List[Any]) -> str:
+        handle = _handle(tool, path, items)
+        self._entries[handle] = (time.monotonic() + self.ttl, items)
+        self._entries.move_to_end(handle)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return handle
+
+    async def get(self, handle: str) -> Optional[List[Any]]:
+        entry = self._entries.get(handle)
+        if entry is None:
+            return None
+        if entry[0] < time.monotonic():
+            self._entries.pop(handle)
+            return None
+        return entry[1]
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.backend, "handles": len(self._entries)}
+
+
+class RedisShapedResultStore:
+    """요약된 목록의 원본 보관소 (상태 Redis, 키 tool:result:{handle}, TTL 만료)
+
+    handle이 내용 해시라 에이전트/워커 구분 없이 같은 키를 써도 됨
+    """
+
+    backend = "redis"
+
+    def __init__(self, client: Any, ttl: float = 600.0):
+        self.client = client
+        self.ttl = ttl
+        self.stored = 0
+
+    @staticmethod
+    def _key(handle: str) -> str:
+        return f"tool:result:{handle}"
+
+    async def put(self, tool: str, path: str, items: List[Any]) -> str:
+        handle = _handle(tool, path, items)
+        await self.client.set(
+            self._key(handle), pack(json.dumps(items, ensure_ascii=False, default=str)), ex=max(1, int(self.ttl))
+        )
+        self.stored += 1
+        return handle
+
+    async def get(self, handle: str) -> Optional[List[Any]]:
+        blob = await self.client.get(self._key(handle))
+        return json.loads(unpack(blob)) if blob is not None else None
+
+    def stats(self) -> Dict[str, Any]:
+        return {"backend": self.backend, "stored": self.stored}
+
+
+_store: Optional[Any] = None
+
+
+def get_result_store() -> Any:
+    """원본 보관소 (프로세스당 하나, SESSION_BACKEND=redis 면 Redis)"""
+    global _store
+    if _store is None:
+        ttl = float(os.getenv("TOOL_OUTPUT_HANDLE_TTL", "600"))
+        if os.getenv("SESSION_BACKEND", "memory").lower() == "redis":
+            _store = RedisShapedResultStore(get_state_client(), ttl=ttl)
+        else:
+            _store = ShapedResultStore(ttl=ttl, max_entries=int(os.getenv("TOOL_OUTPUT_HANDLE_MAX", "200")))
+    return _store
+
+
+_fetch_counters: Dict[str, int] = {"fetches": 0, "fetch_misses": 0}
+
+
+async def fetch_tool_result(handle: str, offset: int = 0, limit: int = 20) -> dict:
+    """
+    크기 제한 때문에 요약된 툴 결과 목록의 원본 항목을 나눠서 조회한다.
+    요약 결과의 handle 값을 그대로 넘기고, offset부터 limit건(최대 50건)을 가져온다.
+    """
+    try:
+        items = await get_result_store().get(handle)
+    except Exception as e:
+        logger.warning(f"툴 결과 원본 조회 실패 ({handle}): {e}")
+        return {"status": "error", "message": f"'{handle}' 결과를 지금 조회할 수 없습니다. 원래 툴을 다시 호출하세요."}
+    if items is None:
+        _fetch_counters["fetch_misses"] += 1
+        return {"status": "error", "message": f"'{handle}' 결과가 만료되었거나 없습니다. 원래 툴을 다시 호출하세요."}
+    _fetch_counters["fetches"] += 1
+    offset = max(0, offset)
+    page = items[offset:offset + max(1, min(limit, FETCH_PAGE_MAX))]
+    next_offset = offset + len(page)
+    return {
+        "status": "success",
+        "handle": handle,
+        "total": len(items),
+        "offset": offset,
+        "items": page,
+        "next_offset": next_offset if next_offset < len(items) else None,
+    }
+
+
+def _as_number(value: Any) -> Optional[float]:
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            return None
+    return None
+
+
+def aggregate(items: List[Any]) -> Dict[str, Any]:
+    """목록 요약 통계: dict 항목이면 필드별(숫자는 min/max/avg/sum, 값 종류가 적으면 값별 개수, 많으면 종류 수)"""
+    dicts = [item for item in items if isinstance(item, dict)]
+    if not dicts:
+        distinct = Counter(json.dumps(item, ensure_ascii=False, default=str) for item in items)
+        return {"distinct": len(distinct)}
+    fields: List[str] = []
+    for item in dicts:
+        fields.extend(k for k in item if k not in fields)
+    out: Dict[str, Any] = {}
+    for field in fields[:MAX_AGGREGATE_FIELDS]:
+        values = [item[field] for item in dicts if item.get(field) not in (None, "")]
+        if not values or any(isinstance(v, (dict, list)) for v in values):
+            continue
+        numbers = [_as_number(v) for v in values]
+        if all(n is not None for n in numbers):
+            out[field] = {
+                "min": min(numbers), "max": max(numbers),
+                "avg": round(sum(numbers) / len(numbers), 2), "sum": round(sum(numbers), 2),
+            }
+            continue
+        counts = Counter(str(v) for v in values)
+        out[field] = dict(counts.most_common()) if len(counts) <= MAX_CATEGORY_VALUES else {"distinct": len(counts)}
+    return out
+
+
+class ToolOutputShaper(BasePlugin):
+    """툴 결과가 예산을 넘으면 목록을 개수/집계/샘플/handle로 바꾸는 Runner 플러그인"""
+
+    def __init__(
+        self,
+        budget: int = 1500,
+        budgets: Optional[Dict[str, int]] = None,
+        top_k: int = 5,
+        store: Optional[Any] = None,
+    ):
+        super().__init__(name="tool_output_shaping")
+        self.budget = budget
+        self.budgets = budgets or {}  # 툴 이름 → 예산 (기본값 덮어쓰기, 0이면 제한 없음)
+        self.top_k = top_k
+        self.store = store or get_result_store()
+        self.counters: Dict[str, int] = {
+            "calls": 0, "shaped": 0, "lists_shaped": 0, "summarized": 0, "tokens_before": 0, "tokens_after": 0,
+        }
+        self.per_tool: Dict[str, Dict[str, int]] = {}
+
+    @classmethod
+    def from_env(cls) -> "ToolOutputShaper":
+        """TOOL_OUTPUT_BUDGETS=get_all_deliveries=800,query_items=3000 형식으로 툴별 예산 지정"""
+        budgets = {}
+        for entry in os.getenv("TOOL_OUTPUT_BUDGETS", "").split(","):
+            name, _, value = entry.partition("=")
+            if name.strip() and value.strip():
+                budgets[name.strip()] = int(value)
+        return cls(
+            budget=int(os.getenv("TOOL_OUTPUT_BUDGET", "1500")),
+            budgets=budgets,
+            top_k=int(os.getenv("TOOL_OUTPUT_TOP_K", "5")),
+        )
+
+    async def _shape(self, tool: str, value: Any, path: str) -> Tuple[Any, int]:
+        """top_k보다 긴 목록을 요약으로 교체 (반환: 결과, 교체한 목록 수)"""
+        if isinstance(value, dict):
+            shaped, count = {}, 0
+            for key, item in value.items():
+                shaped[key], n = await self._shape(tool, item, f"{path}.{key}")
+                count += n
+            return shaped, count
+        if isinstance(value, list) and len(value) > self.top_k:
+            return {
+                "count": len(value),
+                "aggregates": aggregate(value),
+                "sample": value[:self.top_k],
+                "handle": await self.store.put(tool, path, value),
+                "note": f"{len(value)}건 중 {self.top_k}건만 표시. 나머지는 fetch_tool_result(handle, offset, limit)로 조회",
+            }, 1
+        return value, 0
+
+    async def after_tool_callback(self, *, tool, tool_args, tool_context, result) -> Optional[dict]:
+        if tool.name == fetch_tool_result.__name__ or not isinstance(result, dict):
+            return None
+        budget = self.budgets.get(tool.name, self.budget)
+        self.counters["calls"] += 1
+        before = estimate_tokens(result)
+        if budget <= 0 or before <= budget:
+            return None
+
+        try:
+            shaped, lists = await self._shape(tool.name, result, "$")
+        except Exception as e:
+            # 원본을 보관하지 못하면 handle로 조회할 수 없으므로 목록 교체 없이 요약만
+            logger.warning(f"툴 결과 원본 보관 실패 ({tool.name}): {e}")
+            shaped, lists = result, 0
+        if estimate_tokens(shaped) > budget:
+            shaped = summarize_value(shaped)
+            self.counters["summarized"] += 1
+        after = estimate_tokens(shaped)
+        self.counters["shaped"] += 1
+        self.counters["lists_shaped"] += lists
+        self.counters["tokens_before"] += before
+        self.counters["tokens_after"] += after
+        tool_stats = self.per_tool.setdefault(tool.name, {"shaped": 0, "tokens_before": 0, "tokens_after": 0})
+        tool_stats["shaped"] += 1
+        tool_stats["tokens_before"] += before
+        tool_stats["tokens_after"] += after
+        logger.debug(f"툴 결과 축소 ({tool.name}): 추정 {before} → {after} 토큰")
+        return shaped
+
+    def stats(self) -> Dict[str, Any]:
+        before = self.counters["tokens_before"]
+        return {
+            "budget": self.budget,
+            "top_k": self.top_k,
+            **self.counters,
+            "reduction": round(1 - self.counters["tokens_after"] / before, 4) if before else 0.0,
+            "handles": self.store.stats(),
+            **_fetch_counters,
+            "tools": self.per_tool,
+        }